@@ -1,6 +1,176 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.contrib.postgres.search import SearchRank
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db.models import F, Q, QuerySet
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.urls import path, reverse
+from django.utils.functional import cached_property
 
-from .models import Book
+from .counts import get_book_count
+from .filters import get_search_query
+from .models import Author, Book, BookFacetCount, Language
+from .replicas import enable_replica_reads
+
+
+CURSOR_VAR = "after"
+# * The orderings the changelist can seek by (the default one is "-pk").
+KEYSET_LOOKUPS = {"-pk": "lt", "pk": "gt"}
+
+
+class FacetSummaryListFilter(admin.SimpleListFilter):
+    """
+    List filter drawing its choices from the BookFacetCount summary.
+
+    Unlike the field filters it never scans the Book table for the
+    distinct values: the most common ones are read from the summary the
+    database triggers keep up to date.
+    """
+
+    facet = None
+
+    def lookups(
+        self, request: HttpRequest, model_admin: admin.ModelAdmin
+    ) -> list[tuple[str, str]]:
+        """Returns the most common values of the facet with their counts."""
+        rows = list(
+            BookFacetCount.objects.filter(
+                facet=self.facet, value__isnull=False
+            )
+            .order_by("-count", "value")
+            .values_list("value", "count")[
+                : settings.BOOK_ADMIN_FILTER_CHOICES
+            ]
+        )
+        choices = [(value, f"{value} ({count})") for value, count in rows]
+        # * A value picked outside the top ones must stay selectable.
+        if self.value() is not None and self.value() not in dict(rows):
+            choices.append((self.value(), self.value()))
+        return choices
+
+    def queryset(
+        self, request: HttpRequest, queryset: QuerySet
+    ) -> QuerySet | None:
+        """Returns the books with the selected value."""
+        if self.value() is None:
+            return None
+        return queryset.filter(
+            **{f"{self.parameter_name}__name": self.value()}
+        )
+
+
+class AuthorListFilter(FacetSummaryListFilter):
+    """Author filter with the top authors and an autocomplete input."""
+
+    title = "author"
+    parameter_name = "author"
+    facet = "author"
+    template = "admin/book/author_filter.html"
+
+    def choices(self, changelist: ChangeList):
+        """Yields the choices, with the autocomplete URL on the first one."""
+        for number, choice in enumerate(super().choices(changelist)):
+            if number == 0:
+                choice["autocomplete_url"] = reverse(
+                    "admin:book_book_author_autocomplete"
+                )
+            yield choice
+
+
+class LanguageListFilter(FacetSummaryListFilter):
+    """Language filter with the most common languages."""
+
+    title = "language"
+    parameter_name = "language"
+    facet = "language"
+
+
+class BookAdminPaginator(Paginator):
+    """Paginator counting the books by the (cached) estimate."""
+
+    @cached_property
+    def count(self) -> int:
+        """Returns the exact or estimated number of the books."""
+        count, self.count_exact = get_book_count(self.object_list)
+        return count
+
+
+class BookChangeList(ChangeList):
+    """
+    Changelist paginating the default ordering by keyset.
+
+    Pages of the default (primary key) ordering seek past the last book
+    of the previous page (?after=<id>), so every page costs the same no
+    matter how deep it is. Other orderings fall back to the page numbers.
+    """
+
+    def get_filters_params(self, params: dict = None) -> dict:
+        """Returns the filter params without the keyset cursor."""
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(
+        self, new_params: dict = None, remove: list = None
+    ) -> str:
+        """Returns the query string, starting from the first page."""
+        if not new_params or CURSOR_VAR not in new_params:
+            remove = [*(remove or []), CURSOR_VAR]
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request: HttpRequest) -> None:
+        """Sets the results of the page, by keyset if the ordering allows."""
+        self.keyset = tuple(self.queryset.query.order_by) in {
+            (ordering,) for ordering in KEYSET_LOOKUPS
+        }
+        if not self.keyset:
+            return super().get_results(request)
+
+        try:
+            cursor = request.GET.get(CURSOR_VAR)
+            cursor = int(cursor) if cursor else None
+        except ValueError:
+            raise IncorrectLookupParameters
+        queryset = self.queryset
+        if cursor is not None:
+            lookup = KEYSET_LOOKUPS[self.queryset.query.order_by[0]]
+            queryset = queryset.filter(**{f"pk__{lookup}": cursor})
+        # * One extra row tells whether there is a next page.
+        rows = list(queryset[: self.list_per_page + 1])
+        result_list = queryset[: self.list_per_page]
+        result_list._result_cache = rows[: self.list_per_page]
+
+        self.paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        self.result_count = self.paginator.count
+        self.result_list = result_list
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = len(rows) > self.list_per_page or cursor is not None
+        self.first_page_url = (
+            self.get_query_string() if cursor is not None else None
+        )
+        self.next_page_url = (
+            self.get_query_string({CURSOR_VAR: rows[-2].pk})
+            if len(rows) > self.list_per_page
+            else None
+        )
+
+
+@admin.register(Author, Language)
+class NameAdmin(admin.ModelAdmin):
+    """Admin class for the Author and Language models."""
+
+    list_display = ("name",)
+    search_fields = ("name",)
+    ordering = ("name",)
+    show_full_result_count = False
 
 
 @admin.register(Book)
@@ -15,6 +185,68 @@ class BookAdmin(admin.ModelAdmin):
         "language",
         "published_date",
     )
-    search_fields = ("title", "author", "isbn")
+    list_select_related = ("author", "language")
+    search_fields = ("title", "author__name", "isbn")
     search_help_text = "Search by title, author, or ISBN."
-    list_filter = ("author", "published_date", "language")
+    list_filter = (AuthorListFilter, "published_date", LanguageListFilter)
+    autocomplete_fields = ("author", "language")
+    paginator = BookAdminPaginator
+    show_full_result_count = False
+
+    def get_urls(self) -> list:
+        """Returns the admin URLs with the author autocomplete."""
+        return [
+            path(
+                "autocomplete/author/",
+                self.admin_site.admin_view(self.author_autocomplete_view),
+                name="book_book_author_autocomplete",
+            ),
+            *super().get_urls(),
+        ]
+
+    def author_autocomplete_view(self, request: HttpRequest) -> JsonResponse:
+        """Returns the most common authors starting with the ?term."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        term = request.GET.get("term", "").strip()
+        authors = BookFacetCount.objects.filter(
+            facet="author", value__istartswith=term
+        ).order_by("-count", "value")[: settings.BOOK_ADMIN_FILTER_CHOICES]
+        return JsonResponse(
+            {
+                "results": [
+                    {
+                        "id": author.value,
+                        "text": f"{author.value} ({author.count})",
+                    }
+                    for author in authors
+                ]
+            }
+        )
+
+    def get_changelist(self, request: HttpRequest, **kwargs) -> type:
+        """Returns the keyset paginating changelist class."""
+        return BookChangeList
+
+    def changelist_view(
+        self, request: HttpRequest, extra_context: dict = None
+    ) -> HttpResponse:
+        """Returns the changelist, read from the replicas (unless actions)."""
+        if request.method == "GET":
+            enable_replica_reads()
+        return super().changelist_view(request, extra_context)
+
+    def get_search_results(
+        self, request: HttpRequest, queryset: QuerySet, search_term: str
+    ) -> tuple[QuerySet, bool]:
+        """Returns the books matching the search by the full-text index."""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        query = get_search_query(search_term)
+        queryset = queryset.annotate(
+            rank=SearchRank(F("search_vector"), query)
+        ).filter(Q(search_vector=query) | Q(isbn=search_term))
+        if ORDER_VAR not in request.GET:
+            queryset = queryset.order_by("-rank", *queryset.query.order_by)
+        return queryset, False
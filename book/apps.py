@@ -6,3 +6,7 @@ class BookConfig(AppConfig):
 
     name = "book"
     default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self) -> None:
+        """Connects the signal receivers and checks of the 'book' app."""
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,104 @@
+from typing import Optional
+
+from django.conf import settings
+from django.db import OperationalError, connections, transaction
+from django.db.models import Exists, OuterRef, QuerySet
+from django.db.models.functions import Collate, Upper
+from rest_framework.exceptions import APIException
+
+from .models import PREFIX_COLLATION, Author, Book
+
+
+# * The SQLSTATE of a statement canceled by the statement_timeout.
+QUERY_CANCELED = "57014"
+# * The UTF-16 surrogates, code points with no UTF-8 encoding.
+SURROGATES = (0xD800, 0xDFFF)
+
+
+class AutocompleteTimeout(APIException):
+    """Exception for an autocomplete over its time budget."""
+
+    status_code = 503
+    default_detail = "The autocomplete took too long, type more characters."
+    default_code = "autocomplete_timeout"
+
+
+def get_prefix_range(key: str) -> tuple[str, Optional[str]]:
+    """
+    Returns the [low, high) key range of the (uppercased) prefix key.
+
+    The keys are compared by bytes (the "C" collation), so the keys
+    starting with the prefix are the ones from the prefix up to the
+    prefix with its last character incremented (past the surrogates,
+    which can't be encoded).
+    """
+    last = ord(key[-1])
+    if last == 0x10FFFF:
+        return key, None
+    following = last + 1
+    if SURROGATES[0] <= following <= SURROGATES[1]:
+        following = SURROGATES[1] + 1
+    return key, key[:-1] + chr(following)
+
+
+def filter_prefix(queryset: QuerySet, field: str, key: str) -> QuerySet:
+    """
+    Returns the rows with the field starting with the key, in order.
+
+    The key is the prefix uppercased by the database, as Python's upper()
+    differs for some characters (e.g. "ß").
+    """
+    low, high = get_prefix_range(key)
+    queryset = queryset.annotate(
+        prefix_key=Collate(Upper(field), PREFIX_COLLATION)
+    ).filter(prefix_key__gte=low)
+    if high is not None:
+        queryset = queryset.filter(prefix_key__lt=high)
+    return queryset.order_by("prefix_key", "id")
+
+
+def get_autocomplete(alias: str, prefix: str, limit: int) -> dict:
+    """
+    Returns the first titles and authors starting with the prefix.
+
+    Case-insensitive, in alphabetical order, at most `limit` of each.
+    Both are range scans of the prefix indexes stopped at the limit, run
+    under BOOK_AUTOCOMPLETE_TIMEOUT_MS (raises AutocompleteTimeout).
+    """
+    try:
+        with transaction.atomic(using=alias):
+            with connections[alias].cursor() as cursor:
+                # * The prefix is uppercased like the indexed keys.
+                cursor.execute(
+                    "SELECT set_config('statement_timeout', %s, true), "
+                    "UPPER(%s)",
+                    [f"{settings.BOOK_AUTOCOMPLETE_TIMEOUT_MS}ms", prefix],
+                )
+                key = cursor.fetchone()[1]
+            titles = list(
+                filter_prefix(Book.objects.using(alias), "title", key).values(
+                    "id", "title", "author__name"
+                )[:limit]
+            )
+            authors = list(
+                filter_prefix(Author.objects.using(alias), "name", key)
+                .filter(Exists(Book.objects.filter(author=OuterRef("pk"))))
+                .values("id", "name")[:limit]
+            )
+            # * Nothing to commit, the rollback also resets the timeout.
+            transaction.set_rollback(True, using=alias)
+    except OperationalError as error:
+        if getattr(error.__cause__, "pgcode", None) == QUERY_CANCELED:
+            raise AutocompleteTimeout()
+        raise
+    return {
+        "titles": [
+            {
+                "id": row["id"],
+                "title": row["title"],
+                "author": row["author__name"],
+            }
+            for row in titles
+        ],
+        "authors": authors,
+    }
@@ -0,0 +1,114 @@
+import hashlib
+import math
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from .snapshot import BookMirror
+
+
+class BloomFilter:
+    """
+    Bloom filter over strings: no false negatives, few false positives.
+
+    Sized for the capacity at the error rate; the bit positions are
+    derived from one BLAKE2b digest per value (double hashing).
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        """Initializes the empty filter for the capacity and error rate."""
+        self.capacity = max(capacity, 1)
+        self.size = max(
+            int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8
+        )
+        self.hashes = max(round(self.size / self.capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, value: str) -> None:
+        """Adds the value to the filter."""
+        for position in self._get_positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        """Returns whether the value may have been added."""
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._get_positions(value)
+        )
+
+    def _get_positions(self, value: str) -> list[int]:
+        """Returns the bit positions of the value."""
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [
+            (first + number * second) % self.size
+            for number in range(self.hashes)
+        ]
+
+
+class BookISBNFilter(BookMirror):
+    """
+    In-process Bloom filter of the book ISBNs.
+
+    An ISBN not in the filter was not in the catalog at the last sync, so
+    the lookups of unknown ISBNs skip the database. The filter is synced
+    on a version bump, and at most BOOK_ISBN_FILTER_MAX_AGE seconds after
+    the last sync: a book committed by another process or host is found
+    once its bump reaches the cache, or after that window. It can't forget
+    the deleted or replaced ISBNs (they only raise the false positives):
+    it is rebuilt, with twice the books as capacity, once the ISBNs added
+    since the last build exceed its capacity.
+    """
+
+    def get_max_age(self) -> int:
+        """Returns the seconds the negatives are trusted without a bump."""
+        return settings.BOOK_ISBN_FILTER_MAX_AGE
+
+    def clear(self) -> None:
+        """Empties the filter."""
+        self.bloom = None
+
+    def needs_reload(self) -> bool:
+        """Returns whether the filter is over its capacity."""
+        return self.bloom is not None and (
+            self.bloom.count > self.bloom.capacity
+        )
+
+    def apply(self, books: QuerySet, removed: list[int]) -> int:
+        """Adds the ISBNs of the books (building the filter at first)."""
+        isbns = books.values_list("isbn", flat=True)
+        if self.bloom is None:
+            bloom = BloomFilter(
+                max(books.count() * 2, settings.BOOK_ISBN_FILTER_MIN_CAPACITY),
+                settings.BOOK_ISBN_FILTER_ERROR_RATE,
+            )
+            for isbn in isbns.iterator(
+                chunk_size=settings.BOOK_EXPORT_CHUNK_SIZE
+            ):
+                bloom.add(isbn)
+            with self.lock:
+                self.bloom = bloom
+            return bloom.count
+        isbns = list(isbns)
+        with self.lock:
+            for isbn in isbns:
+                self.bloom.add(isbn)
+        return len(isbns)
+
+    def may_contain(self, isbn: str) -> bool:
+        """Returns whether the ISBN may be in the catalog."""
+        with self.lock:
+            return self.bloom is None or isbn in self.bloom
+
+
+book_isbn_filter = BookISBNFilter()
+
+
+def get_isbn_filter(version: int) -> BookISBNFilter:
+    """Returns the ISBN filter of the process, synced to the version."""
+    if not book_isbn_filter.is_fresh(version):
+        book_isbn_filter.sync(version)
+    return book_isbn_filter
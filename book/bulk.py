@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import QuerySet
+
+from .cache import bump_books_version
+from .models import Author, Book, Language
+
+
+def upsert_books(items: list[dict]) -> list[tuple[Book, bool]]:
+    """
+    Creates or updates (by ISBN) the books of the validated items.
+
+    Runs one INSERT ... ON CONFLICT (plus the few queries of
+    resolve_lookups), whatever the size of the batch. Returns the
+    (book, created) pairs in the items order.
+    """
+    db = router.db_for_write(Book)
+    connection = connections[db]
+    fields = [
+        field
+        for field in Book._meta.concrete_fields
+        if not field.primary_key and field.editable
+    ]
+    columns = ", ".join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+    updates = ", ".join(
+        f"{connection.ops.quote_name(field.column)} = "
+        f"EXCLUDED.{connection.ops.quote_name(field.column)}"
+        for field in fields
+        if field.name in get_upsert_fields()
+    )
+    with transaction.atomic(using=db):
+        books = [Book(**item) for item in resolve_lookups(items)]
+        placeholders = ", ".join(
+            f"({', '.join(['%s'] * len(fields))})" for _ in books
+        )
+        params = [
+            field.get_db_prep_save(getattr(book, field.attname), connection)
+            for book in books
+            for field in fields
+        ]
+        with connection.cursor() as cursor:
+            # * The created flags come from the upsert itself (xmax = 0
+            # * only for the freshly inserted rows), so concurrent writers
+            # * can't make them wrong.
+            cursor.execute(
+                f"INSERT INTO {Book._meta.db_table} ({columns}) "
+                f"VALUES {placeholders} "
+                f"ON CONFLICT (isbn) DO UPDATE SET {updates} "
+                f"RETURNING id, (xmax = 0)",
+                params,
+            )
+            rows = cursor.fetchall()
+        transaction.on_commit(bump_books_version, using=db)
+    # * The rows come back in the VALUES order.
+    upserted = []
+    for book, (pk, created) in zip(books, rows):
+        book.pk = pk
+        book._state.adding = False
+        book._state.db = db
+        upserted.append((book, created))
+    return upserted
+
+
+def delete_books(ids: list[int]) -> list[int]:
+    """Deletes the books by ids in one query and returns the deleted ids."""
+    db = router.db_for_write(Book)
+    with transaction.atomic(using=db):
+        with connections[db].cursor() as cursor:
+            # * QuerySet.delete() would fetch the rows and send signals
+            # * for each of them, so the batch goes in a single statement.
+            cursor.execute(
+                f"DELETE FROM {Book._meta.db_table} "
+                f"WHERE id = ANY(%s) RETURNING id",
+                [ids],
+            )
+            deleted = [row[0] for row in cursor.fetchall()]
+        transaction.on_commit(bump_books_version, using=db)
+    return deleted
+
+
+def lookup_books(queryset: QuerySet, field: str, values: list) -> dict:
+    """
+    Returns the .values() rows of the books by the unique field values.
+
+    Runs one IN (...) query (against the unique index) per
+    BOOK_LOOKUP_CHUNK_SIZE values. The queryset must fetch the field.
+    """
+    rows = {}
+    chunk_size = settings.BOOK_LOOKUP_CHUNK_SIZE
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start : start + chunk_size]
+        rows.update(
+            (row[field], row)
+            for row in queryset.filter(**{f"{field}__in": chunk})
+        )
+    return rows
+
+
+def resolve_lookups(items: list[dict]) -> list[dict]:
+    """
+    Returns the validated items with the author and language instances.
+
+    The {"name": ...} values of the serializer are replaced by the Author
+    and Language rows, looked up (and created) for the whole batch at once.
+    """
+    lookups = {"author": Author, "language": Language}
+    rows = {
+        field: model.objects.get_by_names(
+            item[field]["name"] for item in items if field in item
+        )
+        for field, model in lookups.items()
+        if any(field in item for item in items)
+    }
+    return [
+        {
+            **item,
+            **{
+                field: rows[field][item[field]["name"]]
+                for field in lookups
+                if field in item
+            },
+        }
+        for item in items
+    ]
+
+
+def get_upsert_fields() -> list[str]:
+    """Returns the Book fields overwritten when the ISBN already exists."""
+    return [
+        field.name
+        for field in Book._meta.concrete_fields
+        if not field.primary_key and field.editable and field.name != "isbn"
+    ]
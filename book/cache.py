@@ -0,0 +1,217 @@
+import hashlib
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .compression import encode_entry, encode_entry_response
+from .replicas import reads_from_replicas
+
+
+BOOKS_VERSION_KEY = "book:version"
+BOOKS_LAST_MODIFIED_KEY = "book:last-modified"
+
+
+def get_books_version() -> int:
+    """Returns the current version of the Book data."""
+    # * A time-based start never reuses keys after the counter is evicted.
+    return cache.get_or_set(BOOKS_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_books_version() -> None:
+    """
+    Bumps the version of the Book data, invalidating cached values.
+
+    The version is shared through the default cache, which must be shared
+    by every host (see check_shared_cache).
+    """
+    # * A new value per bump instead of incr(), which most backends run as
+    # * a get and a set: concurrent bumps could collapse into one.
+    cache.set(BOOKS_VERSION_KEY, time.time_ns(), timeout=None)
+    cache.set(BOOKS_LAST_MODIFIED_KEY, int(time.time()), timeout=None)
+
+
+async def aget_books_version() -> int:
+    """Returns the current version of the Book data, asynchronously."""
+    return await cache.aget_or_set(
+        BOOKS_VERSION_KEY, time.time_ns(), timeout=None
+    )
+
+
+def get_books_last_modified() -> int:
+    """Returns the timestamp of the last Book write (as far as known)."""
+    return cache.get_or_set(
+        BOOKS_LAST_MODIFIED_KEY, int(time.time()), timeout=None
+    )
+
+
+async def aget_books_last_modified() -> int:
+    """Returns the timestamp of the last Book write, asynchronously."""
+    return await cache.aget_or_set(
+        BOOKS_LAST_MODIFIED_KEY, int(time.time()), timeout=None
+    )
+
+
+def is_cacheable_read(last_modified: int) -> bool:
+    """
+    Returns whether the values read by the request can be cached.
+
+    Values read from a replica within BOOK_REPLICA_PIN_SECONDS of the last
+    Book write may predate it, so they aren't stored under the new
+    version (where they would outlive the replica lag).
+    """
+    return (
+        not reads_from_replicas()
+        or time.time() - last_modified >= settings.BOOK_REPLICA_PIN_SECONDS
+    )
+
+
+class CachedReadMixin:
+    """
+    ViewSet mixin caching the rendered list/retrieve responses.
+
+    Entries are keyed by the Book data version, so any Book write makes
+    them unreachable, and replica reads right after a write aren't stored
+    (see is_cacheable_read). Responses carry a strong ETag and
+    Last-Modified and conditional requests get 304 Not Modified. The
+    entries keep the compressed bodies too, so a hit isn't compressed
+    again.
+    """
+
+    def list(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """Returns the (cached) list response."""
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """Returns the (cached) retrieve response."""
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    async def alist(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """Returns the (cached) list response, asynchronously."""
+        return await self.aget_cached_response(
+            super().alist, request, *args, **kwargs
+        )
+
+    async def aretrieve(
+        self, request: Request, *args, **kwargs
+    ) -> HttpResponse:
+        """Returns the (cached) retrieve response, asynchronously."""
+        return await self.aget_cached_response(
+            super().aretrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(
+        self, handler: Callable, request: Request, *args, **kwargs
+    ) -> HttpResponse:
+        """Returns the cached response or caches the handler's response."""
+        key = self._get_response_cache_key(request, get_books_version())
+        entry = cache.get(key)
+        if entry is not None:
+            response = self._get_entry_response(entry)
+            if encode_entry(entry, request):
+                # * Stored compressed once per encoding, not per hit.
+                cache.set(key, entry, settings.BOOK_RESPONSE_CACHE_TIMEOUT)
+        else:
+            last_modified = get_books_last_modified()
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            entry = self._render(request, response, last_modified)
+            encode_entry(entry, request)
+            if is_cacheable_read(last_modified):
+                cache.set(key, entry, settings.BOOK_RESPONSE_CACHE_TIMEOUT)
+        return encode_entry_response(
+            request,
+            self._get_conditional_response(request, response, entry),
+            entry,
+        )
+
+    async def aget_cached_response(
+        self, handler: Callable, request: Request, *args, **kwargs
+    ) -> HttpResponse:
+        """Returns the response like get_cached_response, asynchronously."""
+        key = self._get_response_cache_key(request, await aget_books_version())
+        entry = await cache.aget(key)
+        if entry is not None:
+            response = self._get_entry_response(entry)
+            if encode_entry(entry, request):
+                await cache.aset(
+                    key, entry, settings.BOOK_RESPONSE_CACHE_TIMEOUT
+                )
+        else:
+            last_modified = await aget_books_last_modified()
+            response = await handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            entry = self._render(request, response, last_modified)
+            encode_entry(entry, request)
+            if is_cacheable_read(last_modified):
+                await cache.aset(
+                    key, entry, settings.BOOK_RESPONSE_CACHE_TIMEOUT
+                )
+        return encode_entry_response(
+            request,
+            self._get_conditional_response(request, response, entry),
+            entry,
+        )
+
+    def _get_response_cache_key(self, request: Request, version: int) -> str:
+        """Returns the cache key of the normalized request."""
+        # * Only the keys are sorted, as the value order can matter.
+        params = sorted(request.query_params.lists())
+        raw_key = repr(
+            (
+                self.action,
+                sorted(self.kwargs.items()),
+                params,
+                request.accepted_media_type,
+                request.build_absolute_uri("/"),
+            )
+        )
+        digest = hashlib.md5(raw_key.encode()).hexdigest()
+        return f"book:response:{version}:{digest}"
+
+    @staticmethod
+    def _get_entry_response(entry: dict) -> HttpResponse:
+        """Returns the response of the cache entry."""
+        return HttpResponse(
+            entry["content"], content_type=entry["content_type"]
+        )
+
+    @staticmethod
+    def _get_conditional_response(
+        request: Request, response: HttpResponse, entry: dict
+    ) -> HttpResponse:
+        """Returns the response with the validators (or a 304)."""
+        response["ETag"] = entry["etag"]
+        response["Last-Modified"] = http_date(entry["last_modified"])
+        patch_vary_headers(response, ["Accept"])
+        return get_conditional_response(
+            request._request,
+            etag=entry["etag"],
+            last_modified=entry["last_modified"],
+            response=response,
+        )
+
+    def _render(
+        self, request: Request, response: Response, last_modified: int
+    ) -> dict:
+        """Returns the cache entry of the rendered response."""
+        response.accepted_renderer = request.accepted_renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = self.get_renderer_context()
+        response.render()
+        return {
+            "content": response.content,
+            "content_type": response["Content-Type"],
+            "etag": f'"{hashlib.md5(response.content).hexdigest()}"',
+            "last_modified": last_modified,
+        }
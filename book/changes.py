@@ -0,0 +1,102 @@
+import json
+from base64 import b64decode, b64encode
+from typing import Iterable, Optional
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework.fields import DateTimeField
+
+from .bulk import lookup_books
+from .models import Book, BookChange
+from .serializers import BookReadSerializer
+
+
+# * Every transaction below this one has ended (committed or not).
+XMIN_SQL = "SELECT pg_snapshot_xmin(pg_current_snapshot())::text"
+
+
+def get_xmin(alias: str) -> int:
+    """Returns the id of the oldest transaction still running."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(XMIN_SQL)
+        return int(cursor.fetchone()[0])
+
+
+def encode_change_cursor(position: tuple[int, int]) -> str:
+    """Returns the opaque cursor of the (txid, book_id) position."""
+    payload = json.dumps(list(position), separators=(",", ":"))
+    return b64encode(payload.encode("ascii")).decode("ascii")
+
+
+def decode_change_cursor(cursor: str) -> tuple[int, int]:
+    """Returns the (txid, book_id) position of the cursor."""
+    try:
+        txid, book_id = json.loads(b64decode(cursor.encode("ascii")))
+        return int(txid), int(book_id)
+    except (TypeError, ValueError, UnicodeEncodeError):
+        raise ValueError(f"Invalid change cursor: {cursor!r}")
+
+
+def get_changes(
+    alias: str,
+    position: Optional[tuple[int, int]],
+    limit: int,
+    fields: Iterable[str],
+) -> tuple[list[dict], tuple[int, int], bool]:
+    """
+    Returns the book changes after the position, in (txid, book_id) order.
+
+    Only the changes of the ended transactions are returned: any later
+    write gets a greater transaction id, so the order never changes
+    behind a client's position. A book changed again moves to its new
+    position. Returns the (changes, next position, has more) triple.
+    """
+    changes = BookChange.objects.using(alias).filter(txid__lt=get_xmin(alias))
+    if position is not None:
+        txid, book_id = position
+        changes = changes.filter(txid__gte=txid).filter(
+            Q(txid__gt=txid) | Q(book_id__gt=book_id)
+        )
+    page = list(
+        changes.order_by("txid", "book_id").values_list(
+            "book_id", "txid", "deleted", "changed_at"
+        )[: limit + 1]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    names = BookReadSerializer.get_value_names(fields)
+    rows = lookup_books(
+        Book.objects.using(alias).values(
+            *dict.fromkeys([*names, "id", "created_at", "updated_at"])
+        ),
+        "id",
+        [book_id for book_id, _, deleted, _ in page if not deleted],
+    )
+    serializer = BookReadSerializer(context={"fields": fields})
+    changed_at_field = DateTimeField()
+    results = []
+    for book_id, _, deleted, changed_at in page:
+        # * A book deleted since its change was read is reported deleted.
+        row = None if deleted else rows.get(book_id)
+        if row is None:
+            change = "deleted"
+        elif row["created_at"] == row["updated_at"]:
+            change = "created"
+        else:
+            change = "updated"
+        results.append(
+            {
+                "id": book_id,
+                "change": change,
+                "changed_at": changed_at_field.to_representation(changed_at),
+                "book": (
+                    serializer.to_representation(row)
+                    if row is not None
+                    else None
+                ),
+            }
+        )
+    if page:
+        position = (page[-1][1], page[-1][0])
+    return results, position or (0, 0), has_more
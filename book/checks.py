@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.checks import Error, Warning, register, Tags
+from django.db import models
+from django.db.models.functions import Upper
+from django_filters import FilterSet
+
+from .filters import BookFilterSet
+from .models import Book
+
+BTREE_LOOKUPS = {"exact", "in", "gt", "gte", "lt", "lte", "range", "isnull"}
+TRIGRAM_LOOKUPS = {"icontains"}
+# * Cache backends whose entries live on a single host.
+PER_HOST_CACHE_BACKENDS = {
+    "django.core.cache.backends.filebased.FileBasedCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register(Tags.models)
+def check_filter_indexes(app_configs=None, **kwargs) -> list[Error]:
+    """Checks that every BookFilterSet lookup is backed by an index."""
+    return [
+        Error(
+            f"BookFilterSet filters '{name}' without a matching index.",
+            hint="Add an index for the lookup to Book.Meta.indexes.",
+            obj=BookFilterSet,
+            id="book.E001",
+        )
+        for name in get_unindexed_filters(BookFilterSet, Book)
+    ]
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs=None, **kwargs) -> list[Warning]:
+    """Checks that the Book data version lives in a shared cache."""
+    if settings.CACHES["default"]["BACKEND"] not in PER_HOST_CACHE_BACKENDS:
+        return []
+    return [
+        Warning(
+            "The default cache is per host, so hosts don't share the Book "
+            "data version and may serve stale cached responses.",
+            hint=(
+                "Set CACHE_BACKEND to a shared cache (e.g. "
+                "django.core.cache.backends.redis.RedisCache) when the API "
+                "runs on several hosts."
+            ),
+            id="book.W001",
+        )
+    ]
+
+
+def get_unindexed_filters(
+    filterset_class: type[FilterSet], model: type[models.Model]
+) -> list[str]:
+    """
+    Returns the names of the filters without a matching index.
+
+    A filter across relations (e.g. 'author__name') needs B-tree indexes
+    on the joined keys and the matching index on the related field.
+    """
+    unindexed = []
+    for name, filter_ in filterset_class.get_filters().items():
+        *relations, field_name = filter_.field_name.split("__")
+        related_model = model
+        indexed = True
+        for relation in relations:
+            btree_fields, _ = _get_indexed_fields(related_model)
+            indexed = indexed and relation in btree_fields
+            related_model = related_model._meta.get_field(
+                relation
+            ).related_model
+        btree_fields, trigram_fields = _get_indexed_fields(related_model)
+        if filter_.lookup_expr in BTREE_LOOKUPS:
+            indexed = indexed and field_name in btree_fields
+        elif filter_.lookup_expr in TRIGRAM_LOOKUPS:
+            indexed = indexed and field_name in trigram_fields
+        else:
+            indexed = False
+        if not indexed:
+            unindexed.append(name)
+    return unindexed
+
+
+def _get_indexed_fields(model: type[models.Model]) -> tuple[set, set]:
+    """Returns the fields leading a B-tree index and the trigram fields."""
+    btree_fields = {
+        field.name
+        for field in model._meta.fields
+        if field.primary_key or field.unique or field.db_index
+    }
+    trigram_fields = set()
+    for index in model._meta.indexes:
+        if isinstance(index, GinIndex):
+            trigram_fields.update(
+                _get_trigram_field(expression)
+                for expression in index.expressions
+            )
+        elif index.fields:
+            btree_fields.add(index.fields[0].lstrip("-"))
+    trigram_fields.discard(None)
+    return btree_fields, trigram_fields
+
+
+def _get_trigram_field(expression) -> str | None:
+    """Returns the field of an OpClass(Upper(field), 'gin_trgm_ops')."""
+    if not isinstance(expression, OpClass):
+        return None
+    if expression.extra.get("name") != "gin_trgm_ops":
+        return None
+    (source,) = expression.get_source_expressions()
+    if not isinstance(source, Upper):
+        return None
+    (field,) = source.get_source_expressions()
+    return getattr(field, "name", None)
@@ -0,0 +1,85 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import QuerySet
+
+from .cache import (
+    aget_books_last_modified,
+    aget_books_version,
+    get_books_last_modified,
+    get_books_version,
+    is_cacheable_read,
+)
+
+
+def get_book_count(queryset: QuerySet) -> tuple[int, bool]:
+    """
+    Returns the (count, is_exact) pair for the filtered Book queryset.
+
+    Small results are counted exactly; above the threshold the planner
+    estimate is used instead. Counts are memoized per filter combination
+    until the next Book write (but for replica reads right after one).
+    """
+    queryset = queryset.order_by()
+    key = f"book:count:{get_books_version()}:{_get_digest(queryset)}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    last_modified = get_books_last_modified()
+
+    estimate = estimate_count(queryset)
+    if estimate is None or estimate < settings.BOOK_EXACT_COUNT_THRESHOLD:
+        result = (queryset.count(), True)
+    else:
+        result = (estimate, False)
+    if is_cacheable_read(last_modified):
+        cache.set(key, result, settings.BOOK_COUNT_CACHE_TIMEOUT)
+    return result
+
+
+async def aget_book_count(queryset: QuerySet) -> tuple[int, bool]:
+    """Returns the count like get_book_count, asynchronously."""
+    queryset = queryset.order_by()
+    key = f"book:count:{await aget_books_version()}:{_get_digest(queryset)}"
+    cached = await cache.aget(key)
+    if cached is not None:
+        return cached
+    last_modified = await aget_books_last_modified()
+
+    estimate = await aestimate_count(queryset)
+    if estimate is None or estimate < settings.BOOK_EXACT_COUNT_THRESHOLD:
+        result = (await queryset.acount(), True)
+    else:
+        result = (estimate, False)
+    if is_cacheable_read(last_modified):
+        await cache.aset(key, result, settings.BOOK_COUNT_CACHE_TIMEOUT)
+    return result
+
+
+def estimate_count(queryset: QuerySet) -> int | None:
+    """Returns the planner row estimate for the queryset (PostgreSQL)."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def aestimate_count(queryset: QuerySet) -> int | None:
+    """Returns the planner row estimate like estimate_count, asynchronously."""
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(await queryset.aexplain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _get_digest(queryset: QuerySet) -> str:
+    """Returns the digest of the queryset SQL, i.e. its filters."""
+    sql, params = queryset.query.sql_with_params()
+    return hashlib.md5(f"{sql}{params!r}".encode()).hexdigest()
@@ -0,0 +1,32 @@
+from itertools import islice
+from typing import Iterator, Sequence
+
+from django.conf import settings
+from django.db.models import QuerySet
+from rest_framework.renderers import BaseRenderer
+
+from .serializers import BookReadSerializer
+
+
+def stream_books(
+    queryset: QuerySet,
+    renderer: BaseRenderer,
+    fields: Sequence[str] | None = None,
+) -> Iterator[str]:
+    """
+    Yields the books of the queryset rendered by the renderer.
+
+    Rows are read through a server-side cursor in chunks and rendered
+    lazily, so the memory use doesn't depend on the number of books.
+    """
+    if not queryset.ordered:
+        queryset = queryset.order_by("id")
+    fields = list(fields or BookReadSerializer.get_field_names())
+    serializer = BookReadSerializer(context={"fields": fields})
+    chunk_size = settings.BOOK_EXPORT_CHUNK_SIZE
+    rows = queryset.values(
+        *BookReadSerializer.get_value_names(fields)
+    ).iterator(chunk_size=chunk_size)
+    lines = renderer.stream(map(serializer.to_representation, rows), fields)
+    while chunk := "".join(islice(lines, chunk_size)):
+        yield chunk
@@ -0,0 +1,228 @@
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, QuerySet, Window
+from django.db.models.functions import RowNumber
+from django.http import QueryDict
+
+from .filters import BookFilterSet, BookSearchFilter, filter_books
+from .models import Author, Book, BookFacetCount, Language
+
+
+# * The facets and the fields they are filtered by.
+FACET_FIELDS = {
+    "language": "language__name",
+    "author": "author__name",
+    "year": "published_date",
+}
+# * The Book columns the facets group by, the keys instead of the names.
+FACET_COLUMNS = {
+    "language": "language_id",
+    "author": "author_id",
+    "year": "published_date",
+}
+FACET_EXPRESSIONS = {
+    "language": "language_id",
+    "author": "author_id",
+    "year": "EXTRACT(YEAR FROM published_date)::int",
+}
+# * The models naming the grouped keys.
+FACET_MODELS = {"language": Language, "author": Author}
+# * The triggers keeping the BookFacetCount summary (migration 0006).
+FACET_TRIGGERS = [
+    "book_facet_count_insert",
+    "book_facet_count_update",
+    "book_facet_count_delete",
+    "book_facet_count_truncate",
+]
+
+
+def get_facets(
+    queryset: QuerySet, params: QueryDict, request=None
+) -> dict[str, list[dict]]:
+    """
+    Returns the most common values of every facet with their counts.
+
+    Every facet is filtered by all the active filters except its own (so
+    the other values of the facet stay selectable). Facets with the same
+    filters are counted together in one grouped query, facets without any
+    filter are read from the BookFacetCount summary (BOOK_FACET_SUMMARY).
+    """
+    groups = {}
+    for facet in FACET_FIELDS:
+        facet_params = get_facet_params(params, facet)
+        key = tuple(
+            (name, tuple(values))
+            for name, values in sorted(facet_params.lists())
+        )
+        groups.setdefault(key, (facet_params, []))[1].append(facet)
+
+    facets = {}
+    for key, (facet_params, names) in groups.items():
+        if not key and settings.BOOK_FACET_SUMMARY:
+            facets.update(get_summary_facets(names))
+        else:
+            facets.update(
+                count_facets(
+                    filter_books(queryset, facet_params, request), names
+                )
+            )
+    return {facet: facets[facet] for facet in FACET_FIELDS}
+
+
+def get_facet_params(params: QueryDict, facet: str) -> QueryDict:
+    """Returns the active filter params without the facet's own ones."""
+    names = {
+        name
+        for name, book_filter in BookFilterSet.base_filters.items()
+        if book_filter.field_name != FACET_FIELDS[facet]
+    }
+    names.add(BookSearchFilter.search_param)
+    facet_params = QueryDict(mutable=True)
+    for name, values in params.lists():
+        values = [value for value in values if value]
+        if name in names and values:
+            facet_params.setlist(name, values)
+    return facet_params
+
+
+def count_facets(queryset: QuerySet, names: list[str]) -> dict:
+    """
+    Returns the facets of the books counted in one grouped query.
+
+    The books are grouped by the author/language keys, only the groups
+    are joined to their names.
+    """
+    books_sql, params = (
+        queryset.order_by()
+        .values(*dict.fromkeys(FACET_COLUMNS[name] for name in names))
+        .query.sql_with_params()
+    )
+    facet_case = " ".join(
+        f"WHEN GROUPING({name}) = 0 THEN '{name}'" for name in names
+    )
+    key_case = " ".join(
+        f"WHEN GROUPING({name}) = 0 THEN {name}" for name in names
+    )
+    columns = ", ".join(
+        f"{FACET_EXPRESSIONS[name]} AS {name}" for name in names
+    )
+    grouping_sets = ", ".join(f"({name})" for name in names)
+    value_case = " ".join(
+        f"WHEN '{name}' THEN {name}_names.name"
+        for name in names
+        if name in FACET_MODELS
+    )
+    # * A group of only the year facet has no names to join.
+    value = (
+        f"CASE groups.facet {value_case} ELSE groups.key::text END"
+        if value_case
+        else "groups.key::text"
+    )
+    joins = " ".join(
+        f"LEFT JOIN {FACET_MODELS[name]._meta.db_table} AS {name}_names "
+        f"ON groups.facet = '{name}' AND {name}_names.id = groups.key"
+        for name in names
+        if name in FACET_MODELS
+    )
+    sql = (
+        "SELECT facet, value, count FROM ("
+        "SELECT facet, value, count, ROW_NUMBER() OVER ("
+        "PARTITION BY facet ORDER BY count DESC, value) AS position "
+        "FROM (SELECT groups.facet, "
+        f"{value} AS value, "
+        "groups.count "
+        f"FROM (SELECT CASE {facet_case} END AS facet, "
+        f"CASE {key_case} END AS key, COUNT(*) AS count "
+        f"FROM (SELECT {columns} FROM ({books_sql}) AS books) AS books "
+        f"GROUP BY GROUPING SETS ({grouping_sets})) AS groups {joins}"
+        ") AS facets) AS facets "
+        "WHERE position <= %s ORDER BY facet, position"
+    )
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, (*params, settings.BOOK_FACET_LIMIT))
+        return _group_rows(names, cursor.fetchall())
+
+
+def get_summary_facets(names: list[str]) -> dict:
+    """Returns the facets of all the books from the BookFacetCount summary."""
+    rows = (
+        BookFacetCount.objects.filter(facet__in=names)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("facet"),
+                order_by=[F("count").desc(), F("value").asc()],
+            )
+        )
+        .filter(position__lte=settings.BOOK_FACET_LIMIT)
+        .order_by("facet", "position")
+        .values_list("facet", "value", "count")
+    )
+    return _group_rows(names, rows)
+
+
+def rebuild_facet_summary(using: str = "default") -> int:
+    """Returns the number of BookFacetCount rows rebuilt from the books."""
+    table = Book._meta.db_table
+    with transaction.atomic(using), connections[using].cursor() as cursor:
+        # * The triggers can't update the counts while they're rebuilt.
+        cursor.execute(f"LOCK TABLE {table} IN SHARE MODE")
+        cursor.execute(f"DELETE FROM {BookFacetCount._meta.db_table}")
+        cursor.execute(
+            f"INSERT INTO {BookFacetCount._meta.db_table} "
+            "(facet, value, count) "
+            "SELECT f.facet, f.value, COUNT(*) "
+            f"FROM {table} AS b "
+            f"JOIN {Language._meta.db_table} AS l ON l.id = b.language_id "
+            f"JOIN {Author._meta.db_table} AS a ON a.id = b.author_id "
+            "CROSS JOIN LATERAL (VALUES "
+            "('language', l.name), "
+            "('author', a.name), "
+            "('year', EXTRACT(YEAR FROM b.published_date)::int::text)"
+            ") AS f (facet, value) GROUP BY f.facet, f.value"
+        )
+        return cursor.rowcount
+
+
+def sync_facet_triggers(using: str = "default") -> bool:
+    """
+    Returns whether the summary triggers were switched to the setting.
+
+    With BOOK_FACET_SUMMARY off, the triggers are disabled (and the summary
+    emptied), so the Book writes don't pay for the unread counts. Turning
+    it back on enables them and rebuilds the summary, which missed the
+    writes in between.
+    """
+    table = Book._meta.db_table
+    with transaction.atomic(using), connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT tgname FROM pg_trigger "
+            "WHERE tgrelid = %s::regclass AND tgname = ANY(%s) "
+            "AND tgenabled <> %s",
+            [
+                table,
+                FACET_TRIGGERS,
+                "O" if settings.BOOK_FACET_SUMMARY else "D",
+            ],
+        )
+        triggers = [name for (name,) in cursor.fetchall()]
+        if not triggers:
+            return False
+        action = "ENABLE" if settings.BOOK_FACET_SUMMARY else "DISABLE"
+        for name in triggers:
+            cursor.execute(f"ALTER TABLE {table} {action} TRIGGER {name}")
+        if settings.BOOK_FACET_SUMMARY:
+            rebuild_facet_summary(using)
+        else:
+            cursor.execute(f"DELETE FROM {BookFacetCount._meta.db_table}")
+    return True
+
+
+def _group_rows(names: list[str], rows) -> dict:
+    """Returns the (facet, value, count) rows grouped by the facet."""
+    facets = {name: [] for name in names}
+    for facet, value, count in rows:
+        if facet == "year" and value is not None:
+            value = int(value)
+        facets[facet].append({"value": value, "count": count})
+    return facets
@@ -1,17 +1,100 @@
-from django_filters.rest_framework import FilterSet
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, QuerySet
+from django.http import QueryDict
+from django_filters.rest_framework import BaseInFilter, CharFilter, FilterSet
+from django_filters.utils import translate_validation
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.request import Request
 
-from .models import Book
+from .models import Book, SEARCH_CONFIG
+
+
+class CharInFilter(BaseInFilter, CharFilter):
+    """Filter by any of the comma-separated strings."""
 
 
 class BookFilterSet(FilterSet):
-    """Filter set for the Book model."""
+    """
+    Filter set for the Book model.
+
+    The author and language are filtered by name, the books are joined
+    to them by their integer keys.
+    """
+
+    author = CharFilter(field_name="author__name")
+    author__in = CharInFilter(field_name="author__name", lookup_expr="in")
+    author__icontains = CharFilter(
+        field_name="author__name", lookup_expr="icontains"
+    )
+    language = CharFilter(field_name="language__name")
+    language__in = CharInFilter(field_name="language__name", lookup_expr="in")
+    language__icontains = CharFilter(
+        field_name="language__name", lookup_expr="icontains"
+    )
 
     class Meta:
         """Meta options for the BookFilterSet."""
 
         model = Book
         fields = {
-            "author": ["exact", "in", "icontains"],
+            "id": ["in"],
+            "isbn": ["exact", "in"],
             "published_date": ["exact", "gte", "lte"],
-            "language": ["exact", "in", "icontains"],
         }
+
+
+class BookSearchFilter(BaseFilterBackend):
+    """Ranked full-text search over the book title and author."""
+
+    search_param = "search"
+    search_description = "Full-text search by title and author."
+
+    def filter_queryset(
+        self, request: Request, queryset: QuerySet, view
+    ) -> QuerySet:
+        """Returns the books matching the search, most relevant first."""
+        search_term = request.query_params.get(self.search_param, "").strip()
+        if not search_term:
+            return queryset
+        return search_books(queryset, search_term).order_by("-rank", "id")
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        """Returns the schema parameters of the search filter."""
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": self.search_description,
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+def filter_books(
+    queryset: QuerySet, params: QueryDict, request: Request = None
+) -> QuerySet:
+    """Returns the books filtered like the API list by the given params."""
+    filterset = BookFilterSet(params, queryset=queryset, request=request)
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+    queryset = filterset.qs
+    search_term = params.get(BookSearchFilter.search_param, "").strip()
+    if search_term:
+        queryset = search_books(queryset, search_term)
+    return queryset
+
+
+def search_books(queryset: QuerySet, search_term: str) -> QuerySet:
+    """Returns the books matching the search term with the rank alias."""
+    query = get_search_query(search_term)
+    return queryset.filter(search_vector=query).alias(
+        rank=SearchRank(F("search_vector"), query)
+    )
+
+
+def get_search_query(search_term: str) -> SearchQuery:
+    """Returns the full-text query for the search term."""
+    return SearchQuery(
+        search_term, config=SEARCH_CONFIG, search_type="websearch"
+    )
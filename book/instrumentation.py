@@ -0,0 +1,235 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+
+slow_query_logger = logging.getLogger("book.slow_queries")
+
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)  # fmt: skip
+QUERIES_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# * The method labels, any other (client-chosen) method is "other".
+METRIC_METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+# * Only the statements EXPLAIN can't run or change anything through.
+EXPLAINABLE_STATEMENTS = ("SELECT", "WITH")
+
+
+class RequestMetrics:
+    """Timings and query count of one request."""
+
+    phases = ("sql", "serialize", "render", "compress")
+
+    def __init__(self) -> None:
+        """Initializes the zero metrics."""
+        self.queries = 0
+        self.times = dict.fromkeys(self.phases, 0.0)
+
+    def get_server_timing(self, total: float) -> str:
+        """Returns the Server-Timing header value of the metrics."""
+        # * The rest is the middleware and view code.
+        app = max(total - sum(self.times.values()), 0.0)
+        metrics = [
+            f'sql;dur={self.times["sql"] * 1000:.2f};'
+            f'desc="{self.queries} queries"',
+            f'serialize;dur={self.times["serialize"] * 1000:.2f}',
+            f'render;dur={self.times["render"] * 1000:.2f}',
+            f'compress;dur={self.times["compress"] * 1000:.2f}',
+            f"app;dur={app * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        ]
+        return ", ".join(metrics)
+
+
+_request_metrics = ContextVar("book_request_metrics", default=None)
+_explaining = ContextVar("book_explaining", default=False)
+
+
+def start_request_metrics() -> RequestMetrics:
+    """Returns the new metrics collected for the current request."""
+    metrics = RequestMetrics()
+    _request_metrics.set(metrics)
+    return metrics
+
+
+def stop_request_metrics() -> None:
+    """Stops collecting the metrics for the current request."""
+    _request_metrics.set(None)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Adds the time of the block to the phase of the request metrics."""
+    metrics = _request_metrics.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.times[phase] += time.perf_counter() - started
+
+
+def instrument_query(
+    execute: Callable, sql: str, params, many: bool, context: dict
+):
+    """
+    Database execute wrapper timing and counting the queries.
+
+    Queries slower than BOOK_SLOW_QUERY_MS go to the 'book.slow_queries'
+    log with their EXPLAIN plan.
+    """
+    if _explaining.get():
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - started
+
+    metrics = _request_metrics.get()
+    if metrics is not None:
+        metrics.queries += 1
+        metrics.times["sql"] += duration
+    if duration * 1000 >= settings.BOOK_SLOW_QUERY_MS:
+        log_slow_query(context["connection"], sql, params, many, duration)
+    return result
+
+
+def log_slow_query(
+    connection, sql: str, params, many: bool, duration: float
+) -> None:
+    """Logs the slow query with its EXPLAIN plan."""
+    plan = None
+    if not many and sql.lstrip().upper().startswith(EXPLAINABLE_STATEMENTS):
+        plan = explain_query(connection, sql, params)
+    slow_query_logger.warning(
+        "Slow query (%.1f ms): %s\n%s",
+        duration * 1000,
+        sql,
+        plan or "(no plan)",
+        extra={"duration": duration, "sql": sql, "plan": plan},
+    )
+
+
+def explain_query(connection, sql: str, params) -> Optional[str]:
+    """Returns the EXPLAIN plan of the query (None if it fails)."""
+    token = _explaining.set(True)
+    try:
+        # * A failed EXPLAIN must not break the transaction of the request.
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN {sql}", params)
+                return "\n".join(row[0] for row in cursor.fetchall())
+    except DatabaseError:
+        return None
+    finally:
+        _explaining.reset(token)
+
+
+class Histogram:
+    """Prometheus histogram (cumulative buckets) with labels."""
+
+    def __init__(
+        self, name: str, documentation: str, buckets: tuple[float, ...]
+    ) -> None:
+        """Initializes the empty histogram."""
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        """Records the value in the series of the labels."""
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            counts, total = self.series.get(key) or (
+                [0] * (len(self.buckets) + 1),
+                0.0,
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-1] += 1
+            self.series[key] = (counts, total + value)
+
+    def expose(self) -> list[str]:
+        """Returns the lines of the histogram in the text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            series = sorted(self.series.items())
+        for key, (counts, total) in series:
+            labels = [f'{name}="{value}"' for name, value in key]
+            bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, counts):
+                bucket_labels = ",".join([*labels, f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {count}")
+            suffix = f"{{{','.join(labels)}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total:g}")
+            lines.append(f"{self.name}_count{suffix} {counts[-1]}")
+        return lines
+
+
+REQUEST_HISTOGRAMS = {
+    "total": Histogram(
+        "book_request_duration_seconds",
+        "Request duration in seconds.",
+        SECONDS_BUCKETS,
+    ),
+    "sql": Histogram(
+        "book_request_sql_seconds",
+        "Time spent in SQL queries per request in seconds.",
+        SECONDS_BUCKETS,
+    ),
+    "serialize": Histogram(
+        "book_request_serialize_seconds",
+        "Time spent serializing per request in seconds.",
+        SECONDS_BUCKETS,
+    ),
+    "render": Histogram(
+        "book_request_render_seconds",
+        "Time spent rendering per request in seconds.",
+        SECONDS_BUCKETS,
+    ),
+    "compress": Histogram(
+        "book_request_compress_seconds",
+        "Time spent compressing per request in seconds.",
+        SECONDS_BUCKETS,
+    ),
+    "queries": Histogram(
+        "book_request_queries",
+        "SQL queries per request.",
+        QUERIES_BUCKETS,
+    ),
+}
+
+
+def observe_request(metrics: RequestMetrics, total: float, **labels) -> None:
+    """Records the request metrics in the histograms."""
+    REQUEST_HISTOGRAMS["total"].observe(total, **labels)
+    REQUEST_HISTOGRAMS["queries"].observe(metrics.queries, **labels)
+    for phase, duration in metrics.times.items():
+        REQUEST_HISTOGRAMS[phase].observe(duration, **labels)
+
+
+def get_method_label(method: str) -> str:
+    """Returns the metrics label of the HTTP method (a bounded set)."""
+    return method if method in METRIC_METHODS else "other"
+
+
+def expose_metrics() -> str:
+    """Returns all the histograms in the Prometheus text format."""
+    lines = []
+    for histogram in REQUEST_HISTOGRAMS.values():
+        lines.extend(histogram.expose())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,309 @@
+import json
+import math
+import platform
+import random
+import statistics
+import time
+from typing import Callable
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ...cache import bump_books_version
+from ...filters import BookFilterSet
+from ...models import Book
+from ...pagination import BookPagination
+from ...synthetic import create_books, generate_books
+from .generate_books import add_synthetic_arguments, get_synthetic_options
+
+
+URL = "/api/v1/books/"
+# * Far from the generate_books numbers, so both can share a database.
+BENCHMARK_START = 90_000_000_000
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Command(BaseCommand):
+    """Command for benchmarking the book API endpoints."""
+
+    help = (
+        "Benchmarks the book API (list, deep pagination, every filter "
+        "lookup, retrieve, create, update) through the full request stack "
+        "over synthetic rows (rolled back) and reports the latency "
+        "percentiles, throughput and query counts as JSON."
+    )
+
+    def add_arguments(self, parser) -> None:
+        """Adds the command arguments."""
+        add_synthetic_arguments(parser)
+        parser.set_defaults(rows=10000)
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            help="Scenario to run (repeatable, all by default).",
+        )
+        parser.add_argument(
+            "--output", default="-", help="JSON report path ('-': stdout)."
+        )
+        parser.add_argument(
+            "--compare", help="JSON report of an earlier run to compare to."
+        )
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Keep the response cache on (off by default).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Runs the scenarios and writes the JSON report."""
+        settings = {
+            "ALLOWED_HOSTS": ["testserver"],
+            # * The replicas can't see the rows of the open transaction.
+            "DATABASE_REPLICAS": [],
+        }
+        if not options["cache"]:
+            settings["BOOK_RESPONSE_CACHE_TIMEOUT"] = 0
+        with override_settings(**settings), transaction.atomic():
+            if options["rows"]:
+                create_books(
+                    options["rows"],
+                    start=BENCHMARK_START,
+                    **get_synthetic_options(options),
+                )
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {Book._meta.db_table}")
+                bump_books_version()
+            try:
+                report = {
+                    "meta": self._get_meta(options),
+                    "scenarios": self._run(options),
+                }
+            finally:
+                transaction.set_rollback(True)
+                bump_books_version()
+
+        content = json.dumps(report, indent=2)
+        if options["output"] == "-":
+            self.stdout.write(content)
+        else:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(content + "\n")
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as file:
+                baseline = json.load(file)
+            output = self.stderr if options["output"] == "-" else self.stdout
+            output.write(compare_reports(baseline, report))
+
+    def _run(self, options: dict) -> dict:
+        """Returns the results of the scenarios."""
+        generator = random.Random(options["seed"])
+        scenarios = self._get_scenarios(generator, options)
+        names = options["scenarios"] or list(scenarios)
+        unknown = set(names) - set(scenarios)
+        if unknown:
+            raise CommandError(
+                f"Unknown scenarios: {', '.join(sorted(unknown))}. "
+                f"Choose from: {', '.join(scenarios)}."
+            )
+        client = APIClient()
+        return {
+            name: self._measure(
+                client,
+                scenarios[name],
+                options["iterations"],
+                options["warmup"],
+            )
+            for name in names
+        }
+
+    def _measure(
+        self,
+        client: APIClient,
+        scenario: Callable,
+        iterations: int,
+        warmup: int,
+    ) -> dict:
+        """Returns the latency, throughput and query counts of a scenario."""
+        latencies, queries, errors = [], [], 0
+        for number in range(warmup + iterations):
+            method, path, data = scenario()
+            with CaptureQueriesContext(connection) as context:
+                kwargs = {} if method == "get" else {"format": "json"}
+                started = time.perf_counter()
+                response = getattr(client, method)(path, data, **kwargs)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                elapsed = time.perf_counter() - started
+            if number < warmup:
+                continue
+            latencies.append(elapsed)
+            queries.append(len(context))
+            errors += response.status_code >= 400
+
+        latencies_ms = sorted(latency * 1000 for latency in latencies)
+        return {
+            "iterations": iterations,
+            "errors": errors,
+            "latency_ms": {
+                "min": round(latencies_ms[0], 3),
+                "mean": round(statistics.fmean(latencies_ms), 3),
+                **{
+                    f"p{percentile}": round(
+                        get_percentile(latencies_ms, percentile), 3
+                    )
+                    for percentile in PERCENTILES
+                },
+                "max": round(latencies_ms[-1], 3),
+            },
+            "throughput_rps": round(iterations / sum(latencies), 1),
+            "queries": {
+                "mean": round(statistics.fmean(queries), 2),
+                "max": max(queries),
+            },
+        }
+
+    def _get_scenarios(
+        self, generator: random.Random, options: dict
+    ) -> dict[str, Callable[[], tuple[str, str, dict]]]:
+        """Returns the (method, path, data) factories of the scenarios."""
+        ids = list(Book.objects.order_by("id").values_list("id", flat=True))
+        if not ids:
+            raise CommandError("No books to benchmark, use --rows.")
+        books = list(
+            Book.objects.filter(
+                id__in=generator.sample(ids, min(len(ids), 1000))
+            )
+            .order_by("id")
+            .values(
+                "id",
+                *dict.fromkeys(
+                    book_filter.field_name
+                    for book_filter in BookFilterSet.base_filters.values()
+                ),
+            )
+        )
+        count = len(ids)
+        deep_cursor = BookPagination().encode_cursor(
+            "id", [ids[max(count - 11, 0)]], False
+        )
+        new_books = generate_books(
+            10**9,
+            start=BENCHMARK_START + options["rows"],
+            **get_synthetic_options(options),
+        )
+
+        scenarios = {
+            "list": lambda: ("get", URL, {}),
+            "list_deep_offset": lambda: (
+                "get",
+                URL,
+                {"offset": max(count - 10, 0)},
+            ),
+            "list_deep_keyset": lambda: ("get", URL, {"cursor": deep_cursor}),
+            "retrieve": lambda: (
+                "get",
+                f"{URL}{generator.choice(books)['id']}/",
+                {},
+            ),
+            "create": lambda: ("post", URL, get_book_data(next(new_books))),
+            "update": lambda: (
+                "patch",
+                f"{URL}{generator.choice(books)['id']}/",
+                {"title": f"Updated {generator.random()}"},
+            ),
+        }
+        for name, book_filter in BookFilterSet.base_filters.items():
+            scenarios[f"filter_{name}"] = self._get_filter_scenario(
+                generator, books, name, book_filter
+            )
+        return scenarios
+
+    @staticmethod
+    def _get_filter_scenario(
+        generator: random.Random, books: list[dict], name: str, book_filter
+    ) -> Callable[[], tuple[str, str, dict]]:
+        """Returns the factory of a filter lookup scenario."""
+        values = [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for book in books
+            if (value := book[book_filter.field_name]) is not None
+        ]
+
+        def scenario() -> tuple[str, str, dict]:
+            """Returns the request of the lookup with a sample value."""
+            value = generator.choice(values)
+            if book_filter.lookup_expr == "in":
+                value = f"{value},{generator.choice(values)}"
+            elif book_filter.lookup_expr == "icontains":
+                value = value[1:-1].lower()
+            return "get", URL, {name: value}
+
+        return scenario
+
+    @staticmethod
+    def _get_meta(options: dict) -> dict:
+        """Returns the description of the benchmark run."""
+        return {
+            "generated_at": timezone.now().isoformat(),
+            "books": Book.objects.count(),
+            "synthetic": {
+                "rows": options["rows"],
+                **get_synthetic_options(options),
+            },
+            "iterations": options["iterations"],
+            "warmup": options["warmup"],
+            "response_cache": options["cache"],
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": f"{connection.vendor} {connection.pg_version}",
+        }
+
+
+def get_book_data(book: Book) -> dict:
+    """Returns the API payload of the (unsaved) book."""
+    data = {
+        "title": book.title,
+        "author": book.author.name,
+        "isbn": book.isbn,
+        "pages": book.pages,
+        "cover": book.cover,
+        "language": book.language.name,
+    }
+    if book.published_date:
+        data["published_date"] = book.published_date.isoformat()
+    return data
+
+
+def get_percentile(values: list[float], percentile: int) -> float:
+    """Returns the nearest-rank percentile of the sorted values."""
+    return values[max(math.ceil(percentile / 100 * len(values)) - 1, 0)]
+
+
+def compare_reports(baseline: dict, report: dict) -> str:
+    """Returns the table comparing the report scenarios to the baseline."""
+    lines = [
+        f"{'scenario':<32}{'p50 ms':>18}{'p95 ms':>18}{'queries':>14}",
+    ]
+    for name, result in report["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        columns = []
+        for key in ("p50", "p95"):
+            old, new = base["latency_ms"][key], result["latency_ms"][key]
+            change = (new - old) / old * 100 if old else 0
+            columns.append(f"{new:>9.2f} {change:+6.1f}%")
+        old, new = base["queries"]["mean"], result["queries"]["mean"]
+        lines.append(
+            f"{name:<32}{columns[0]:>18}{columns[1]:>18}"
+            f"{new:>8.1f} {new - old:+4.1f}"
+        )
+    return "\n".join(lines)
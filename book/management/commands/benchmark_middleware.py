@@ -0,0 +1,93 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ...models import Author, Book, Language
+from .benchmark_api import BENCHMARK_START
+
+
+class Command(BaseCommand):
+    """Command for benchmarking the middleware overhead of the API."""
+
+    help = (
+        "Measures the per-request time and queries of API calls through "
+        "the full middleware stack (before) and the lean API chain (after), "
+        "for an anonymous and a session-holding client (rolled back)."
+    )
+
+    def add_arguments(self, parser) -> None:
+        """Adds the command arguments."""
+        parser.add_argument("--iterations", type=int, default=2000)
+        parser.add_argument("--warmup", type=int, default=100)
+
+    def handle(self, *args, **options) -> None:
+        """Measures the API calls of every setup and reports the results."""
+        with override_settings(
+            ALLOWED_HOSTS=["testserver"]
+        ), transaction.atomic():
+            try:
+                self._report(options["iterations"], options["warmup"])
+            finally:
+                transaction.set_rollback(True)
+
+    def _report(self, iterations: int, warmup: int) -> None:
+        """Writes the measurements of the setups."""
+        book = Book.objects.create(
+            title="Benchmark book",
+            author=Author.objects.get_by_names(["Benchmark"])["Benchmark"],
+            isbn=str(BENCHMARK_START),
+            language=Language.objects.get_by_names(["English"])["English"],
+        )
+        user = get_user_model().objects.create_user("benchmark-middleware")
+        paths = {
+            # * Served from the response cache, so mostly the stack itself.
+            "retrieve": f"/api/v1/books/{book.pk}/",
+            "list": "/api/v1/books/?limit=1",
+        }
+        self.stdout.write(
+            f"{'request':<10} {'client':<10} {'stack':<6} "
+            f"{'median us':>10} {'mean us':>10} {'queries':>8}"
+        )
+        for name, path in paths.items():
+            for client_name in ("anonymous", "session"):
+                for stack, prefixes in (
+                    ("full", []),
+                    ("lean", settings.BOOK_API_PATH_PREFIXES),
+                ):
+                    with override_settings(BOOK_API_PATH_PREFIXES=prefixes):
+                        client = Client()
+                        if client_name == "session":
+                            client.force_login(user)
+                        times, queries = self._measure(
+                            client, path, iterations, warmup
+                        )
+                    self.stdout.write(
+                        f"{name:<10} {client_name:<10} {stack:<6} "
+                        f"{statistics.median(times) * 10**6:>10.1f} "
+                        f"{statistics.mean(times) * 10**6:>10.1f} "
+                        f"{queries:>8}"
+                    )
+
+    @staticmethod
+    def _measure(
+        client: Client, path: str, iterations: int, warmup: int
+    ) -> tuple[list[float], int]:
+        """Returns the request times and the queries per request."""
+        for _ in range(warmup):
+            client.get(path)
+        times = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            response: HttpResponse = client.get(path)
+            times.append(time.perf_counter() - started)
+        with CaptureQueriesContext(connection) as queries:
+            client.get(path)
+        assert response.status_code == 200, response.status_code
+        return times, len(queries)
@@ -0,0 +1,137 @@
+import datetime
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from ...models import Author, Book, Language
+from ...parsers import COMPACT_PARSER_CLASSES
+from ...renderers import FastJSONRenderer
+from ...serializers import BookReadSerializer, BookSerializer
+
+
+class Command(BaseCommand):
+    """Command for benchmarking the book list serialization paths."""
+
+    help = (
+        "Compares the BookSerializer + JSONRenderer path with the "
+        "BookReadSerializer + FastJSONRenderer one, and the payload size and "
+        "encode/decode times of the wire formats (rolled back data)."
+    )
+
+    def add_arguments(self, parser) -> None:
+        """Adds the command arguments."""
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options) -> None:
+        """Runs both paths over the same rows and reports the timings."""
+        rows, repeat = options["rows"], options["repeat"]
+        with transaction.atomic():
+            authors = Author.objects.get_by_names(
+                f"Benchmark author {count}" for count in range(100)
+            )
+            language = Language.objects.get_by_names(["English"])["English"]
+            books = Book.objects.bulk_create(
+                Book(
+                    title=f"Benchmark book {count}",
+                    author=authors[f"Benchmark author {count % 100}"],
+                    published_date=datetime.date(2000, 1, 1)
+                    + datetime.timedelta(days=count),
+                    isbn=f"999{count:010}",
+                    pages=count % 1000 or None,
+                    cover=f"https://example.com/covers/{count}.png",
+                    language=language,
+                )
+                for count in range(rows)
+            )
+            queryset = Book.objects.filter(
+                pk__in=[book.pk for book in books]
+            ).order_by("id")
+
+            default, default_time = self._measure(
+                repeat,
+                lambda: JSONRenderer().render(
+                    BookSerializer(
+                        queryset.select_related("author", "language"),
+                        many=True,
+                    ).data
+                ),
+            )
+            fast, fast_time = self._measure(
+                repeat,
+                lambda: FastJSONRenderer().render(
+                    BookReadSerializer(
+                        queryset.values(
+                            *BookReadSerializer.get_value_names(
+                                BookReadSerializer.get_field_names()
+                            )
+                        ),
+                        many=True,
+                    ).data
+                ),
+            )
+            data = BookReadSerializer(
+                queryset.values(
+                    *BookReadSerializer.get_value_names(
+                        BookReadSerializer.get_field_names()
+                    )
+                ),
+                many=True,
+            ).data
+            transaction.set_rollback(True)
+
+        per_1000 = 1000 / rows
+        self.stdout.write(f"Rows: {rows}, repeat: {repeat}")
+        self.stdout.write(
+            f"BookSerializer + JSONRenderer:         "
+            f"{default_time * per_1000 * 1000:.2f} ms / 1000 rows"
+        )
+        self.stdout.write(
+            f"BookReadSerializer + FastJSONRenderer: "
+            f"{fast_time * per_1000 * 1000:.2f} ms / 1000 rows"
+        )
+        self.stdout.write(f"Speedup: {default_time / fast_time:.1f}x")
+        self.stdout.write(f"Byte-for-byte identical: {default == fast}")
+        self._report_formats(data, rows, repeat)
+
+    def _report_formats(self, data: list, rows: int, repeat: int) -> None:
+        """Writes the size and encode/decode times of every wire format."""
+        page = {"count": rows, "next": None, "previous": None, "results": data}
+        self.stdout.write(
+            f"{'Format':<30} {'KiB':>8} {'vs JSON':>8} "
+            f"{'encode ms':>10} {'decode ms':>10}"
+        )
+        json_size = None
+        for parser_class in [JSONParser, *COMPACT_PARSER_CLASSES]:
+            parser = parser_class()
+            renderer = (
+                FastJSONRenderer()
+                if parser_class is JSONParser
+                else parser.renderer_class()
+            )
+            content, encode_time = self._measure(
+                repeat, lambda: renderer.render(page)
+            )
+            _, decode_time = self._measure(
+                repeat, lambda: parser.parse(io.BytesIO(content))
+            )
+            json_size = json_size or len(content)
+            self.stdout.write(
+                f"{renderer.media_type:<30} {len(content) / 1024:>8.1f} "
+                f"{len(content) / json_size:>8.0%} "
+                f"{encode_time * 1000:>10.2f} {decode_time * 1000:>10.2f}"
+            )
+
+    @staticmethod
+    def _measure(repeat: int, function) -> tuple[bytes, float]:
+        """Returns the function result and its best time out of repeat."""
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = function()
+            best = min(best, time.perf_counter() - started)
+        return result, best
@@ -0,0 +1,117 @@
+import gc
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...models import Book
+from ...snapshot import VALUE_NAMES, BookSnapshot
+from ...synthetic import create_books
+from .benchmark_api import BENCHMARK_START
+from .generate_books import add_synthetic_arguments, get_synthetic_options
+
+
+class Command(BaseCommand):
+    """Command for benchmarking the in-process snapshot of the books."""
+
+    help = (
+        "Loads the books (with synthetic ones, rolled back) into a "
+        "BookSnapshot and reports its memory per million books, the load "
+        "and sync times and the lookups compared with the database."
+    )
+
+    def add_arguments(self, parser) -> None:
+        """Adds the command arguments."""
+        add_synthetic_arguments(parser)
+        parser.set_defaults(rows=100000)
+        parser.add_argument("--lookups", type=int, default=10000)
+
+    def handle(self, *args, **options) -> None:
+        """Measures the snapshot over the books and reports the results."""
+        with transaction.atomic():
+            if options["rows"]:
+                create_books(
+                    options["rows"],
+                    start=BENCHMARK_START,
+                    **get_synthetic_options(options),
+                )
+            try:
+                self._report(options["lookups"], options["seed"])
+            finally:
+                transaction.set_rollback(True)
+
+    def _report(self, lookups: int, seed: int) -> None:
+        """Writes the measurements of the snapshot."""
+        snapshot = BookSnapshot()
+        started = time.perf_counter()
+        snapshot.sync()
+        load_time = time.perf_counter() - started
+        count = len(snapshot)
+        if not count:
+            self.stdout.write("No books to load, use --rows.")
+            return
+        allocated = self._get_kept_bytes(self._load_snapshot)
+        instances_allocated = self._get_kept_bytes(
+            lambda: list(Book.objects.select_related("author", "language"))
+        )
+
+        ids = random.Random(seed).choices(list(snapshot.by_id), k=lookups)
+        started = time.perf_counter()
+        for pk in ids:
+            snapshot.get(pk)
+        snapshot_time = time.perf_counter() - started
+        queryset = Book.objects.values(*VALUE_NAMES)
+        started = time.perf_counter()
+        for pk in ids[:1000]:
+            queryset.get(pk=pk)
+        database_time = time.perf_counter() - started
+
+        Book.objects.filter(pk__in=ids[:100]).update(pages=1)
+        started = time.perf_counter()
+        synced = snapshot.sync()
+        sync_time = time.perf_counter() - started
+
+        million = 1_000_000 / count / 2**20
+        self.stdout.write(f"Books: {count}")
+        self.stdout.write(
+            f"Snapshot (sys.getsizeof): "
+            f"{snapshot.get_memory_usage() * million:.1f} MiB / 1M books"
+        )
+        self.stdout.write(
+            f"Snapshot (allocated):     {allocated * million:.1f} MiB / 1M "
+            f"books"
+        )
+        self.stdout.write(
+            f"Model instances:          "
+            f"{instances_allocated * million:.1f} MiB / 1M books"
+        )
+        self.stdout.write(
+            f"Full load: {load_time:.2f} s, sync of {synced} changed books: "
+            f"{sync_time * 1000:.1f} ms"
+        )
+        self.stdout.write(
+            f"Lookup by id: {snapshot_time / lookups * 10**6:.1f} us "
+            f"(snapshot), {database_time / min(lookups, 1000) * 10**6:.1f} "
+            f"us (database)"
+        )
+
+    @staticmethod
+    def _get_kept_bytes(function) -> int:
+        """Returns the bytes allocated for the result of the function."""
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = function()  # noqa: F841 (kept while measured)
+            gc.collect()
+            return tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+    @staticmethod
+    def _load_snapshot() -> BookSnapshot:
+        """Returns a new snapshot of all the books."""
+        snapshot = BookSnapshot()
+        snapshot.sync()
+        return snapshot
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from drf_spectacular.renderers import (
+    OpenApiJsonRenderer,
+    OpenApiYamlRenderer,
+)
+
+from ...schema import CachedSpectacularAPIView, get_code_version
+
+
+class Command(BaseCommand):
+    """Command for generating the cached OpenAPI schema ahead."""
+
+    help = (
+        "Generates the OpenAPI schema (YAML and JSON) into the cache for "
+        "the current code version, e.g. at build or deploy time."
+    )
+
+    def handle(self, *args, **options) -> None:
+        """Requests the schema in every format, caching it."""
+        view = CachedSpectacularAPIView.as_view()
+        factory = RequestFactory()
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for renderer in (OpenApiYamlRenderer, OpenApiJsonRenderer):
+                response = view(
+                    factory.get(
+                        "/api/schema/", HTTP_ACCEPT=renderer.media_type
+                    )
+                )
+                self.stdout.write(
+                    f"{renderer.media_type}: {len(response.content)} bytes"
+                )
+        self.stdout.write(
+            self.style.SUCCESS(f"Schema cached for {get_code_version()}.")
+        )
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from ...cache import bump_books_version
+from ...models import Book
+from ...synthetic import create_books
+
+
+class Command(BaseCommand):
+    """Command for filling the database with synthetic books."""
+
+    help = (
+        "Creates reproducible synthetic books (the same options always "
+        "create the same books) for benchmarks and local testing."
+    )
+
+    def add_arguments(self, parser) -> None:
+        """Adds the command arguments."""
+        add_synthetic_arguments(parser)
+        parser.add_argument(
+            "--start",
+            type=int,
+            default=0,
+            help="First synthetic book number (to add more batches).",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options) -> None:
+        """Creates the books and refreshes the planner statistics."""
+        with transaction.atomic():
+            created = create_books(
+                options["rows"],
+                batch_size=options["batch_size"],
+                start=options["start"],
+                **get_synthetic_options(options),
+            )
+            transaction.on_commit(bump_books_version)
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Book._meta.db_table}")
+        self.stdout.write(self.style.SUCCESS(f"{created} books created."))
+
+
+def add_synthetic_arguments(parser) -> None:
+    """Adds the arguments of the synthetic data shape."""
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--languages", type=int, default=5)
+    parser.add_argument(
+        "--date-spread",
+        type=int,
+        default=365 * 50,
+        help="Days the published dates span.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def get_synthetic_options(options: dict) -> dict:
+    """Returns the generate_books keyword arguments of the options."""
+    return {
+        "authors": options["authors"],
+        "languages": options["languages"],
+        "date_spread": options["date_spread"],
+        "seed": options["seed"],
+    }
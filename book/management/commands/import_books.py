@@ -0,0 +1,228 @@
+import csv
+import io
+import json
+import sys
+import time
+from itertools import islice
+from typing import Iterator, TextIO
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Field
+
+from ...cache import bump_books_version
+from ...models import Book
+
+STAGING_TABLE = "book_import_staging"
+IMPORT_FIELDS = [
+    field
+    for field in Book._meta.concrete_fields
+    if not field.primary_key and field.editable
+]
+# * The author and language are imported (and created) by name.
+LOOKUP_FIELDS = [field for field in IMPORT_FIELDS if field.is_relation]
+
+
+class Command(BaseCommand):
+    """Command for importing books from CSV or JSONL files."""
+
+    help = (
+        "Imports books from a CSV or JSONL file (or '-' for stdin), "
+        "creating new books and updating the existing ones by ISBN."
+    )
+
+    def add_arguments(self, parser) -> None:
+        """Adds the command arguments."""
+        parser.add_argument("path", help="CSV/JSONL file path or '-'.")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="Input format (by default by the file extension).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10000,
+            help="Number of rows loaded per COPY (default: 10000).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Streams the input into the staging table and merges it."""
+        if connection.vendor != "postgresql":
+            raise CommandError("The import requires PostgreSQL (COPY).")
+        input_format = options["format"] or self._get_format(options["path"])
+        self.created = self.updated = self.invalid = 0
+        self.started = time.monotonic()
+
+        with self._open(options["path"]) as file:
+            rows = self._read(file, input_format)
+            self._create_staging_table()
+            try:
+                while chunk := list(islice(rows, options["chunk_size"])):
+                    self._import_chunk(chunk)
+                    self._report_progress()
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        transaction.on_commit(bump_books_version)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done: {self.created} created, {self.updated} updated, "
+                f"{self.invalid} invalid rows."
+            )
+        )
+
+    def _import_chunk(self, chunk: list[tuple[int, dict]]) -> None:
+        """Validates the chunk, COPYs it to staging and merges it."""
+        books = {}
+        for line, row in chunk:
+            try:
+                book = clean_book_row(row)
+            except ValidationError as error:
+                self.invalid += 1
+                self.stderr.write(f"Line {line}: {error.message_dict}")
+                continue
+            # * The last row wins, as a merge can't update a row twice.
+            books[book["isbn"]] = book
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for book in books.values():
+            writer.writerow(
+                "" if book[field.name] is None else book[field.name]
+                for field in IMPORT_FIELDS
+            )
+        buffer.seek(0)
+
+        staging_columns = ", ".join(field.name for field in IMPORT_FIELDS)
+        columns = ", ".join(field.column for field in IMPORT_FIELDS)
+        values = ", ".join(
+            f"{field.name}.id" if field.is_relation else f"s.{field.name}"
+            for field in IMPORT_FIELDS
+        )
+        joins = " ".join(
+            f"JOIN {field.related_model._meta.db_table} AS {field.name} "
+            f"ON {field.name}.name = s.{field.name}"
+            for field in LOOKUP_FIELDS
+        )
+        updates = ", ".join(
+            f"{field.column} = EXCLUDED.{field.column}"
+            for field in IMPORT_FIELDS
+            if field.name != "isbn"
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} ({staging_columns}) FROM STDIN "
+                f"WITH (FORMAT csv)",
+                buffer,
+            )
+            for field in LOOKUP_FIELDS:
+                cursor.execute(
+                    f"INSERT INTO {field.related_model._meta.db_table} "
+                    f"(name) SELECT DISTINCT {field.name} "
+                    f"FROM {STAGING_TABLE} ON CONFLICT (name) DO NOTHING"
+                )
+            # * xmax = 0 only for the freshly inserted rows.
+            cursor.execute(
+                f"INSERT INTO {Book._meta.db_table} ({columns}) "
+                f"SELECT {values} FROM {STAGING_TABLE} AS s {joins} "
+                f"ON CONFLICT (isbn) DO UPDATE SET {updates} "
+                f"RETURNING (xmax = 0)"
+            )
+            inserted = [row[0] for row in cursor.fetchall()]
+        self.created += sum(inserted)
+        self.updated += len(inserted) - sum(inserted)
+
+    def _create_staging_table(self) -> None:
+        """Creates the temporary staging table for the COPY."""
+        columns = ", ".join(
+            f"{field.name} {get_value_field(field).db_type(connection)}"
+            for field in IMPORT_FIELDS
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {STAGING_TABLE} ({columns})"
+            )
+
+    def _report_progress(self) -> None:
+        """Writes the number of processed rows and the rows per second."""
+        processed = self.created + self.updated + self.invalid
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f"Processed {processed} rows "
+            f"({processed / elapsed if elapsed else 0:.0f} rows/s)."
+        )
+
+    @staticmethod
+    def _read(file: TextIO, input_format: str) -> Iterator[tuple[int, dict]]:
+        """Yields the (line number, row) pairs of the input."""
+        if input_format == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line, text in enumerate(file, start=1):
+            if not text.strip():
+                continue
+            try:
+                yield line, json.loads(text)
+            except json.JSONDecodeError as error:
+                raise CommandError(f"Line {line}: invalid JSON ({error}).")
+
+    @staticmethod
+    def _get_format(path: str) -> str:
+        """Returns the input format by the file extension."""
+        if path.endswith(".csv"):
+            return "csv"
+        if path.endswith((".jsonl", ".ndjson")):
+            return "jsonl"
+        raise CommandError("Unknown input format, use --format.")
+
+    @staticmethod
+    def _open(path: str) -> TextIO:
+        """Returns the opened input file (or stdin)."""
+        if path == "-":
+            return open(sys.stdin.fileno(), encoding="utf-8", closefd=False)
+        try:
+            return open(path, encoding="utf-8", newline="")
+        except OSError as error:
+            raise CommandError(f"Can't open '{path}': {error}.")
+
+
+def clean_book_row(row: dict) -> dict:
+    """Returns the row cleaned by the Book model field validation."""
+    # * A JSONL line can hold any JSON value, not only an object.
+    if not isinstance(row, dict):
+        raise ValidationError(
+            {
+                NON_FIELD_ERRORS: [
+                    f"Expected an object, got {type(row).__name__}."
+                ]
+            }
+        )
+    book, errors = {}, {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field.name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in ("", None) and field.null:
+            book[field.name] = None
+            continue
+        try:
+            book[field.name] = get_value_field(field).clean(
+                "" if value is None else value, None
+            )
+        except ValidationError as error:
+            errors[field.name] = error.messages
+    if errors:
+        raise ValidationError(errors)
+    return book
+
+
+def get_value_field(field: Field) -> Field:
+    """Returns the field of the imported value (the name for relations)."""
+    if field.is_relation:
+        return field.related_model._meta.get_field("name")
+    return field
@@ -0,0 +1,157 @@
+import asyncio
+import datetime
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, override_settings
+
+from ...models import Author, Book, Language
+from ...views import BookViewSet
+
+
+SEED_ISBN_PREFIX = "998"
+
+
+class Command(BaseCommand):
+    """Command for load testing the async and sync book read views."""
+
+    help = (
+        "Sends concurrent list/retrieve requests to the async views and to "
+        "the sync views run the way ASGI runs them (sync_to_async), and "
+        "reports the throughput and latency per concurrency level."
+    )
+
+    def add_arguments(self, parser) -> None:
+        """Adds the command arguments."""
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument(
+            "--concurrency", type=int, nargs="+", default=[1, 10, 50]
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Books to create for the test (deleted afterwards).",
+        )
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Keep the response cache on (off by default).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Runs both views at every concurrency level."""
+        if options["seed"]:
+            self._seed(options["seed"])
+        try:
+            settings = (
+                {} if options["cache"] else {"BOOK_RESPONSE_CACHE_TIMEOUT": 0}
+            )
+            with override_settings(ALLOWED_HOSTS=["testserver"], **settings):
+                asyncio.run(self._run(options))
+        finally:
+            if options["seed"]:
+                Book.objects.filter(isbn__startswith=SEED_ISBN_PREFIX).delete()
+                Author.objects.filter(
+                    name__startswith="Load test author", books__isnull=True
+                ).delete()
+
+    async def _run(self, options: dict) -> None:
+        """Reports the results of both views at every concurrency level."""
+        pks = [pk async for pk in Book.objects.values_list("pk", flat=True)]
+        if not pks:
+            self.stderr.write("No books to read, use --seed.")
+            return
+        views = {
+            "async": self._get_views(async_reads=True),
+            "sync": self._get_views(async_reads=False),
+        }
+        self.stdout.write(
+            f"Books: {len(pks)}, requests per run: {options['requests']}"
+        )
+        for concurrency in options["concurrency"]:
+            for name, (list_view, detail_view) in views.items():
+                latencies, elapsed = await self._load(
+                    list_view,
+                    detail_view,
+                    pks,
+                    options["requests"],
+                    concurrency,
+                )
+                latencies.sort()
+                p50 = latencies[len(latencies) // 2] * 1000
+                p95 = latencies[int(len(latencies) * 0.95)] * 1000
+                self.stdout.write(
+                    f"{name:>5} c={concurrency:<4} "
+                    f"{len(latencies) / elapsed:8.1f} req/s  "
+                    f"p50 {p50:7.2f} ms  p95 {p95:7.2f} ms"
+                )
+
+    async def _load(
+        self,
+        list_view,
+        detail_view,
+        pks: list[int],
+        total: int,
+        concurrency: int,
+    ) -> tuple[list[float], float]:
+        """Returns the request latencies and the elapsed time of a run."""
+        factory = AsyncRequestFactory()
+        latencies = []
+
+        async def worker(offset: int) -> None:
+            """Sends every concurrency-th request of the run."""
+            for number in range(offset, total, concurrency):
+                if number % 2:
+                    pk = pks[number % len(pks)]
+                    request = factory.get(f"/api/v1/books/{pk}/")
+                    view, kwargs = detail_view, {"pk": pk}
+                else:
+                    request = factory.get(
+                        "/api/v1/books/", {"offset": number % len(pks)}
+                    )
+                    view, kwargs = list_view, {}
+                started = time.perf_counter()
+                response = await view(request, **kwargs)
+                if hasattr(response, "render"):
+                    response.render()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(worker(offset) for offset in range(concurrency))
+        )
+        return latencies, time.perf_counter() - started
+
+    @staticmethod
+    def _get_views(async_reads: bool) -> tuple:
+        """Returns the list and detail views as ASGI would await them."""
+        with override_settings(BOOK_ASYNC_READS=async_reads):
+            views = (
+                BookViewSet.as_view({"get": "list"}),
+                BookViewSet.as_view({"get": "retrieve"}),
+            )
+        if async_reads:
+            return views
+        # * Django runs sync views under ASGI in its one sync thread.
+        return tuple(sync_to_async(view) for view in views)
+
+    @staticmethod
+    def _seed(rows: int) -> None:
+        """Creates the books to read."""
+        authors = Author.objects.get_by_names(
+            f"Load test author {count}" for count in range(100)
+        )
+        language = Language.objects.get_by_names(["English"])["English"]
+        Book.objects.bulk_create(
+            Book(
+                title=f"Load test book {count}",
+                author=authors[f"Load test author {count % 100}"],
+                published_date=datetime.date(2000, 1, 1)
+                + datetime.timedelta(days=count),
+                isbn=f"{SEED_ISBN_PREFIX}{count:010}",
+                language=language,
+            )
+            for count in range(rows)
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from ...facets import rebuild_facet_summary
+
+
+class Command(BaseCommand):
+    """Command for rebuilding the BookFacetCount summary table."""
+
+    help = (
+        "Recounts the BookFacetCount summary from the books (the triggers "
+        "keep it up to date, this is for restores and manual fixes)."
+    )
+
+    def handle(self, *args, **options) -> None:
+        """Rebuilds the summary table."""
+        rows = rebuild_facet_summary()
+        self.stdout.write(self.style.SUCCESS(f"{rows} facet counts rebuilt."))
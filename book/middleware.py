@@ -0,0 +1,295 @@
+import time
+from typing import Callable, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.signing import BadSignature, TimestampSigner
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .compression import (
+    acompress_chunks,
+    compress,
+    compress_chunks,
+    get_accepted_encoding,
+    is_compressible,
+    set_content_encoding,
+    weaken_etag,
+)
+from .instrumentation import (
+    get_method_label,
+    observe_request,
+    start_request_metrics,
+    stop_request_metrics,
+)
+from .replicas import reset_replica_routing
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware scoping the replica routing to the request.
+
+    A write request pins its client to the primary for a few seconds
+    (BOOK_REPLICA_PIN_SECONDS), so the client reads its own writes while
+    the replicas catch up. The write response carries a signed pin token,
+    both as a cookie (for browsers) and as the Book-Primary-Pin header:
+    clients that don't keep cookies send the token back in the
+    Book-Primary-Pin request header.
+    """
+
+    sync_capable = True
+    async_capable = True
+    cookie_name = "book_primary_pin"
+    header_name = "Book-Primary-Pin"
+    safe_methods = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+    def __init__(self, get_response: Callable) -> None:
+        """Initializes the middleware for a sync or async chain."""
+        self.get_response = get_response
+        self.signer = TimestampSigner(salt="book.primary-pin")
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Returns the response with the routing scoped to the request."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.process_request(request)
+        try:
+            return self.process_response(request, self.get_response(request))
+        finally:
+            reset_replica_routing()
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Returns the response like __call__, asynchronously."""
+        self.process_request(request)
+        try:
+            return self.process_response(
+                request, await self.get_response(request)
+            )
+        finally:
+            reset_replica_routing()
+
+    def process_request(self, request: HttpRequest) -> None:
+        """Pins the request to the primary after a (recent) write."""
+        reset_replica_routing(
+            pinned=request.method not in self.safe_methods
+            or self.is_pinned(request.headers.get(self.header_name))
+            or self.is_pinned(request.COOKIES.get(self.cookie_name))
+        )
+
+    def process_response(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        """Returns the response pinning the client after a write."""
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in self.safe_methods
+        ):
+            token = self.signer.sign("primary")
+            response[self.header_name] = token
+            response.set_cookie(
+                self.cookie_name,
+                token,
+                max_age=settings.BOOK_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def is_pinned(self, token: Optional[str]) -> bool:
+        """Returns whether the pin token is valid and not expired."""
+        if not token:
+            return False
+        try:
+            self.signer.unsign(
+                token, max_age=settings.BOOK_REPLICA_PIN_SECONDS
+            )
+        except BadSignature:
+            return False
+        return True
+
+
+class InstrumentationMiddleware:
+    """
+    Middleware measuring the SQL, serialization and rendering per request.
+
+    The timings go to the Server-Timing header of the response and to the
+    histograms of the metrics endpoint.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        """Initializes the middleware for a sync or async chain."""
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Returns the response with the request timings."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = start_request_metrics()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_request_metrics()
+        return self.process_response(
+            request, response, metrics, time.perf_counter() - started
+        )
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Returns the response like __call__, asynchronously."""
+        metrics = start_request_metrics()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_request_metrics()
+        return self.process_response(
+            request, response, metrics, time.perf_counter() - started
+        )
+
+    @staticmethod
+    def process_response(
+        request: HttpRequest,
+        response: HttpResponse,
+        metrics,
+        total: float,
+    ) -> HttpResponse:
+        """Returns the response with the Server-Timing header."""
+        response["Server-Timing"] = metrics.get_server_timing(total)
+        match = request.resolver_match
+        observe_request(
+            metrics,
+            total,
+            view=match.view_name if match else "",
+            method=get_method_label(request.method),
+        )
+        return response
+
+
+def is_api_request(request: HttpRequest) -> bool:
+    """Returns whether the request is to an API path."""
+    return request.path_info.startswith(tuple(settings.BOOK_API_PATH_PREFIXES))
+
+
+class BrowserOnlyMiddlewareMixin:
+    """
+    Middleware mixin skipping the middleware for the API requests.
+
+    The API authenticates each request (no session, see
+    DEFAULT_AUTHENTICATION_CLASSES; its only cookie is the replica pin),
+    so the API paths (BOOK_API_PATH_PREFIXES) pass through the sessions,
+    authentication and messages middleware untouched, while the admin, the
+    Swagger UI and every other path keep the full stack.
+    """
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Returns the response, skipping the middleware for the API."""
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class BrowserSessionMiddleware(BrowserOnlyMiddlewareMixin, SessionMiddleware):
+    """SessionMiddleware for every path but the API ones."""
+
+
+class BrowserAuthenticationMiddleware(
+    BrowserOnlyMiddlewareMixin, AuthenticationMiddleware
+):
+    """AuthenticationMiddleware for every path but the API ones."""
+
+
+class BrowserMessageMiddleware(BrowserOnlyMiddlewareMixin, MessageMiddleware):
+    """MessageMiddleware for every path but the API ones."""
+
+
+class ApiFrameOptionsExemptMiddleware(MiddlewareMixin):
+    """
+    Middleware exempting the API responses from the clickjacking header.
+
+    Listed after the stock XFrameOptionsMiddleware (which the deploy
+    checks look for), so the admin, the Swagger UI and every other path
+    keep X-Frame-Options. The API views need no CSRF exemption: DRF views
+    are csrf_exempt and only enforce CSRF for session authentication.
+    """
+
+    def process_response(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        """Returns the response, exempted for the API."""
+        if is_api_request(request):
+            response.xframe_options_exempt = True
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Middleware compressing the API responses (zstd, Brotli or gzip).
+
+    The encoding is negotiated through Accept-Encoding; bodies under
+    BOOK_COMPRESSION_MIN_SIZE are sent as they are. Streaming responses
+    are compressed chunk by chunk as they are sent. Responses already
+    encoded (e.g. the precompressed cache entries) are left untouched.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        """Initializes the middleware for a sync or async chain."""
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Returns the (compressed) response."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Returns the response like __call__, asynchronously."""
+        return self.process_response(request, await self.get_response(request))
+
+    @staticmethod
+    def process_response(
+        request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        """Returns the response compressed in the accepted encoding."""
+        if not is_api_request(request) or response.has_header(
+            "Content-Encoding"
+        ):
+            return response
+        if not response.streaming and not is_compressible(response.content):
+            return response
+        patch_vary_headers(response, ["Accept-Encoding"])
+        encoding = get_accepted_encoding(request)
+        if encoding is None:
+            return response
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_chunks(
+                    response.streaming_content, encoding
+                )
+            else:
+                response.streaming_content = compress_chunks(
+                    response.streaming_content, encoding
+                )
+            del response["Content-Length"]
+            response["Content-Encoding"] = encoding
+            weaken_etag(response)
+            return response
+        content = compress(response.content, encoding)
+        if len(content) < len(response.content):
+            set_content_encoding(response, content, encoding)
+        return response
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0002_alter_book_pages"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["published_date", "id"], name="book_published_date_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1 on 2026-10-18 13:13
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0003_book_published_date_id_idx"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["author", "published_date"], name="book_author_published_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["language", "published_date"],
+                name="book_language_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("author"), name="gin_trgm_ops"
+                ),
+                name="book_author_upper_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("language"),
+                    name="gin_trgm_ops",
+                ),
+                name="book_language_upper_trgm_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 5.1 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+# * Statement-level triggers: a bulk write updates each count once.
+CREATE_TRIGGERS_SQL = """
+CREATE FUNCTION book_facet_count_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    deltas text;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM book_bookfacetcount;
+        RETURN NULL;
+    ELSIF TG_OP = 'INSERT' THEN
+        deltas := 'SELECT language, author, published_date, 1 AS delta '
+            'FROM new_books';
+    ELSIF TG_OP = 'DELETE' THEN
+        deltas := 'SELECT language, author, published_date, -1 AS delta '
+            'FROM old_books';
+    ELSE
+        deltas := 'SELECT language, author, published_date, 1 AS delta '
+            'FROM new_books UNION ALL '
+            'SELECT language, author, published_date, -1 FROM old_books';
+    END IF;
+    EXECUTE format(
+        'INSERT INTO book_bookfacetcount (facet, value, count) '
+        'SELECT f.facet, f.value, SUM(b.delta) FROM (%s) AS b '
+        'CROSS JOIN LATERAL (VALUES '
+        '(''language'', b.language), '
+        '(''author'', b.author), '
+        '(''year'', EXTRACT(YEAR FROM b.published_date)::int::text)'
+        ') AS f (facet, value) '
+        'GROUP BY f.facet, f.value HAVING SUM(b.delta) <> 0 '
+        'ON CONFLICT (facet, value) DO UPDATE '
+        'SET count = book_bookfacetcount.count + EXCLUDED.count',
+        deltas
+    );
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM book_bookfacetcount WHERE count <= 0;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER book_facet_count_insert AFTER INSERT ON book_book
+REFERENCING NEW TABLE AS new_books
+FOR EACH STATEMENT EXECUTE FUNCTION book_facet_count_trigger();
+
+CREATE TRIGGER book_facet_count_update AFTER UPDATE ON book_book
+REFERENCING OLD TABLE AS old_books NEW TABLE AS new_books
+FOR EACH STATEMENT EXECUTE FUNCTION book_facet_count_trigger();
+
+CREATE TRIGGER book_facet_count_delete AFTER DELETE ON book_book
+REFERENCING OLD TABLE AS old_books
+FOR EACH STATEMENT EXECUTE FUNCTION book_facet_count_trigger();
+
+CREATE TRIGGER book_facet_count_truncate AFTER TRUNCATE ON book_book
+FOR EACH STATEMENT EXECUTE FUNCTION book_facet_count_trigger();
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER book_facet_count_insert ON book_book;
+DROP TRIGGER book_facet_count_update ON book_book;
+DROP TRIGGER book_facet_count_delete ON book_book;
+DROP TRIGGER book_facet_count_truncate ON book_book;
+DROP FUNCTION book_facet_count_trigger();
+"""
+
+BACKFILL_SQL = """
+INSERT INTO book_bookfacetcount (facet, value, count)
+SELECT f.facet, f.value, COUNT(*)
+FROM book_book AS b
+CROSS JOIN LATERAL (VALUES
+    ('language', b.language),
+    ('author', b.author),
+    ('year', EXTRACT(YEAR FROM b.published_date)::int::text)
+) AS f (facet, value)
+GROUP BY f.facet, f.value;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0005_book_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookFacetCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "facet",
+                    models.CharField(
+                        choices=[
+                            ("language", "language"),
+                            ("author", "author"),
+                            ("year", "year"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("value", models.CharField(max_length=255, null=True)),
+                ("count", models.IntegerField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["facet", "-count"], name="book_facet_count_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("facet", "value"),
+                        name="book_facet_count_facet_value_uniq",
+                        nulls_distinct=False,
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1 on 2026-10-18 13:39
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0006_book_facet_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bookfacetcount",
+            index=models.Index(
+                models.F("facet"),
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("value"),
+                    name="text_pattern_ops",
+                ),
+                name="book_facet_count_prefix_idx",
+            ),
+        ),
+    ]
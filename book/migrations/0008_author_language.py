@@ -0,0 +1,340 @@
+# Generated by Django 5.1 on 2026-10-18 13:42
+
+import importlib
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+facet_count_migration = importlib.import_module(
+    "book.migrations.0006_book_facet_count"
+)
+
+# * The deferred key checks of the updated rows would keep the table from
+# * being altered later in the migration, they run right away instead.
+FILL_SQL = """
+SET CONSTRAINTS ALL IMMEDIATE;
+INSERT INTO book_author (name) SELECT DISTINCT author_name FROM book_book;
+INSERT INTO book_language (name)
+SELECT DISTINCT language_name FROM book_book;
+UPDATE book_book AS b SET author_id = a.id, language_id = l.id
+FROM book_author AS a, book_language AS l
+WHERE a.name = b.author_name AND l.name = b.language_name;
+"""
+
+UNFILL_SQL = """
+UPDATE book_book AS b SET author_name = a.name, language_name = l.name
+FROM book_author AS a, book_language AS l
+WHERE a.id = b.author_id AND l.id = b.language_id;
+"""
+
+# * Same vector as the generated column had, with the author's name.
+CREATE_SEARCH_TRIGGERS_SQL = """
+CREATE FUNCTION book_search_vector_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', COALESCE(NEW.title, '')), 'A')
+        || setweight(to_tsvector('english', COALESCE(
+            (SELECT name FROM book_author WHERE id = NEW.author_id), ''
+        )), 'B');
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER book_search_vector BEFORE INSERT OR UPDATE ON book_book
+FOR EACH ROW EXECUTE FUNCTION book_search_vector_trigger();
+
+UPDATE book_book SET search_vector = NULL;
+"""
+
+DROP_SEARCH_TRIGGERS_SQL = """
+DROP TRIGGER book_search_vector ON book_book;
+DROP FUNCTION book_search_vector_trigger();
+"""
+
+# * The facet counts keep the names, joined by the keys of the rows.
+CREATE_FACET_TRIGGERS_SQL = """
+CREATE FUNCTION book_facet_count_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    deltas text;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM book_bookfacetcount;
+        RETURN NULL;
+    ELSIF TG_OP = 'INSERT' THEN
+        deltas := 'SELECT language_id, author_id, published_date, '
+            '1 AS delta FROM new_books';
+    ELSIF TG_OP = 'DELETE' THEN
+        deltas := 'SELECT language_id, author_id, published_date, '
+            '-1 AS delta FROM old_books';
+    ELSE
+        deltas := 'SELECT language_id, author_id, published_date, '
+            '1 AS delta FROM new_books UNION ALL '
+            'SELECT language_id, author_id, published_date, -1 '
+            'FROM old_books';
+    END IF;
+    EXECUTE format(
+        'INSERT INTO book_bookfacetcount (facet, value, count) '
+        'SELECT f.facet, f.value, SUM(b.delta) FROM (%s) AS b '
+        'JOIN book_language AS l ON l.id = b.language_id '
+        'JOIN book_author AS a ON a.id = b.author_id '
+        'CROSS JOIN LATERAL (VALUES '
+        '(''language'', l.name), '
+        '(''author'', a.name), '
+        '(''year'', EXTRACT(YEAR FROM b.published_date)::int::text)'
+        ') AS f (facet, value) '
+        'GROUP BY f.facet, f.value HAVING SUM(b.delta) <> 0 '
+        'ON CONFLICT (facet, value) DO UPDATE '
+        'SET count = book_bookfacetcount.count + EXCLUDED.count',
+        deltas
+    );
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM book_bookfacetcount WHERE count <= 0;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER book_facet_count_insert AFTER INSERT ON book_book
+REFERENCING NEW TABLE AS new_books
+FOR EACH STATEMENT EXECUTE FUNCTION book_facet_count_trigger();
+
+CREATE TRIGGER book_facet_count_update AFTER UPDATE ON book_book
+REFERENCING OLD TABLE AS old_books NEW TABLE AS new_books
+FOR EACH STATEMENT EXECUTE FUNCTION book_facet_count_trigger();
+
+CREATE TRIGGER book_facet_count_delete AFTER DELETE ON book_book
+REFERENCING OLD TABLE AS old_books
+FOR EACH STATEMENT EXECUTE FUNCTION book_facet_count_trigger();
+
+CREATE TRIGGER book_facet_count_truncate AFTER TRUNCATE ON book_book
+FOR EACH STATEMENT EXECUTE FUNCTION book_facet_count_trigger();
+
+CREATE FUNCTION book_lookup_rename_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE book_bookfacetcount SET value = NEW.name
+    WHERE facet = TG_ARGV[0] AND value = OLD.name;
+    IF TG_ARGV[0] = 'author' THEN
+        -- The books of the author get their search vectors recomputed.
+        UPDATE book_book SET author_id = author_id WHERE author_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER book_author_rename AFTER UPDATE OF name ON book_author
+FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+EXECUTE FUNCTION book_lookup_rename_trigger('author');
+
+CREATE TRIGGER book_language_rename AFTER UPDATE OF name ON book_language
+FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+EXECUTE FUNCTION book_lookup_rename_trigger('language');
+"""
+
+DROP_FACET_TRIGGERS_SQL = """
+DROP TRIGGER book_author_rename ON book_author;
+DROP TRIGGER book_language_rename ON book_language;
+DROP FUNCTION book_lookup_rename_trigger();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0007_book_facet_count_prefix_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Author",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        django.contrib.postgres.indexes.OpClass(
+                            django.db.models.functions.text.Upper("name"),
+                            name="gin_trgm_ops",
+                        ),
+                        name="book_author_name_trgm_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="Language",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        django.contrib.postgres.indexes.OpClass(
+                            django.db.models.functions.text.Upper("name"),
+                            name="gin_trgm_ops",
+                        ),
+                        name="book_language_name_trgm_idx",
+                    )
+                ],
+            },
+        ),
+        # * The triggers read the old columns, they're recreated at the end.
+        migrations.RunSQL(
+            facet_count_migration.DROP_TRIGGERS_SQL,
+            facet_count_migration.CREATE_TRIGGERS_SQL,
+        ),
+        migrations.RemoveIndex(
+            model_name="book",
+            name="book_author_published_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="book",
+            name="book_language_published_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="book",
+            name="book_author_upper_trgm_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="book",
+            name="book_language_upper_trgm_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="book",
+            name="book_search_vector_idx",
+        ),
+        migrations.RemoveField(
+            model_name="book",
+            name="search_vector",
+        ),
+        migrations.RenameField(
+            model_name="book",
+            old_name="author",
+            new_name="author_name",
+        ),
+        migrations.RenameField(
+            model_name="book",
+            old_name="language",
+            new_name="language_name",
+        ),
+        # * Nullable, so the names can be added back before they're filled.
+        migrations.AlterField(
+            model_name="book",
+            name="author_name",
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name="book",
+            name="language_name",
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="author",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="books",
+                to="book.author",
+            ),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="language",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="books",
+                to="book.language",
+            ),
+        ),
+        migrations.RunSQL(FILL_SQL, UNFILL_SQL),
+        migrations.AlterField(
+            model_name="book",
+            name="author",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="books",
+                to="book.author",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="book",
+            name="language",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="books",
+                to="book.language",
+            ),
+        ),
+        migrations.RemoveField(
+            model_name="book",
+            name="author_name",
+        ),
+        migrations.RemoveField(
+            model_name="book",
+            name="language_name",
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(
+            CREATE_SEARCH_TRIGGERS_SQL, DROP_SEARCH_TRIGGERS_SQL
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["author", "published_date"],
+                name="book_author_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["language", "published_date"],
+                name="book_language_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="book_search_vector_idx"
+            ),
+        ),
+        migrations.RunSQL(
+            CREATE_FACET_TRIGGERS_SQL,
+            DROP_FACET_TRIGGERS_SQL + facet_count_migration.DROP_TRIGGERS_SQL,
+        ),
+    ]
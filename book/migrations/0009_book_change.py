@@ -0,0 +1,124 @@
+# Generated by Django 5.1 on 2026-10-18 13:49
+
+from django.db import migrations, models
+
+# * One row per book, written by the statements that change the books.
+CREATE_TRIGGERS_SQL = """
+CREATE FUNCTION book_change_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE book_bookchange
+        SET txid = pg_current_xact_id()::text::bigint, deleted = true
+        WHERE NOT deleted;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO book_bookchange (book_id, txid, deleted)
+        SELECT id, pg_current_xact_id()::text::bigint, true
+        FROM old_books ORDER BY id
+        ON CONFLICT (book_id) DO UPDATE
+        SET txid = EXCLUDED.txid, deleted = true;
+    ELSE
+        INSERT INTO book_bookchange (book_id, txid, deleted)
+        SELECT id, pg_current_xact_id()::text::bigint, false
+        FROM new_books ORDER BY id
+        ON CONFLICT (book_id) DO UPDATE
+        SET txid = EXCLUDED.txid, deleted = false;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER book_change_insert AFTER INSERT ON book_book
+REFERENCING NEW TABLE AS new_books
+FOR EACH STATEMENT EXECUTE FUNCTION book_change_trigger();
+
+CREATE TRIGGER book_change_update AFTER UPDATE ON book_book
+REFERENCING NEW TABLE AS new_books
+FOR EACH STATEMENT EXECUTE FUNCTION book_change_trigger();
+
+CREATE TRIGGER book_change_delete AFTER DELETE ON book_book
+REFERENCING OLD TABLE AS old_books
+FOR EACH STATEMENT EXECUTE FUNCTION book_change_trigger();
+
+CREATE TRIGGER book_change_truncate AFTER TRUNCATE ON book_book
+FOR EACH STATEMENT EXECUTE FUNCTION book_change_trigger();
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER book_change_insert ON book_book;
+DROP TRIGGER book_change_update ON book_book;
+DROP TRIGGER book_change_delete ON book_book;
+DROP TRIGGER book_change_truncate ON book_book;
+DROP FUNCTION book_change_trigger();
+"""
+
+# * The existing books count as changed before any reader's first sync.
+BACKFILL_SQL = """
+INSERT INTO book_bookchange (book_id, txid, deleted)
+SELECT id, 0, false FROM book_book;
+"""
+
+# * A renamed language changes its books' data too, like an author.
+RENAME_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION book_lookup_rename_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE book_bookfacetcount SET value = NEW.name
+    WHERE facet = TG_ARGV[0] AND value = OLD.name;
+    IF TG_ARGV[0] = 'author' THEN
+        -- The books of the author get their search vectors recomputed.
+        UPDATE book_book SET author_id = author_id WHERE author_id = NEW.id;
+    ELSE
+        -- The books of the language are marked changed.
+        UPDATE book_book SET language_id = language_id
+        WHERE language_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+AUTHOR_RENAME_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION book_lookup_rename_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE book_bookfacetcount SET value = NEW.name
+    WHERE facet = TG_ARGV[0] AND value = OLD.name;
+    IF TG_ARGV[0] = 'author' THEN
+        -- The books of the author get their search vectors recomputed.
+        UPDATE book_book SET author_id = author_id WHERE author_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0008_author_language"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookChange",
+            fields=[
+                (
+                    "book_id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("txid", models.BigIntegerField()),
+                ("deleted", models.BooleanField(default=False)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["txid"], name="book_change_txid_idx")
+                ],
+            },
+        ),
+        migrations.RunSQL(
+            CREATE_TRIGGERS_SQL + BACKFILL_SQL, DROP_TRIGGERS_SQL
+        ),
+        migrations.RunSQL(RENAME_TRIGGER_SQL, AUTHOR_RENAME_TRIGGER_SQL),
+    ]
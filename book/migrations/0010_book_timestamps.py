@@ -0,0 +1,127 @@
+# Generated by Django 5.1 on 2026-10-18 14:07
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+# * The model writes can't be trusted with the timestamps (bulk upserts,
+# * raw SQL, the import), the database keeps them.
+CREATE_TIMESTAMPS_TRIGGER_SQL = """
+CREATE FUNCTION book_updated_at_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.created_at := OLD.created_at;
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER book_updated_at BEFORE UPDATE ON book_book
+FOR EACH ROW EXECUTE FUNCTION book_updated_at_trigger();
+"""
+
+DROP_TIMESTAMPS_TRIGGER_SQL = """
+DROP TRIGGER book_updated_at ON book_book;
+DROP FUNCTION book_updated_at_trigger();
+"""
+
+CHANGE_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION book_change_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE book_bookchange
+        SET txid = pg_current_xact_id()::text::bigint, deleted = true,
+            changed_at = now()
+        WHERE NOT deleted;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO book_bookchange (book_id, txid, deleted, changed_at)
+        SELECT id, pg_current_xact_id()::text::bigint, true, now()
+        FROM old_books ORDER BY id
+        ON CONFLICT (book_id) DO UPDATE
+        SET txid = EXCLUDED.txid, deleted = true, changed_at = now();
+    ELSE
+        INSERT INTO book_bookchange (book_id, txid, deleted, changed_at)
+        SELECT id, pg_current_xact_id()::text::bigint, false, now()
+        FROM new_books ORDER BY id
+        ON CONFLICT (book_id) DO UPDATE
+        SET txid = EXCLUDED.txid, deleted = false, changed_at = now();
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+UNCHANGE_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION book_change_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE book_bookchange
+        SET txid = pg_current_xact_id()::text::bigint, deleted = true
+        WHERE NOT deleted;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO book_bookchange (book_id, txid, deleted)
+        SELECT id, pg_current_xact_id()::text::bigint, true
+        FROM old_books ORDER BY id
+        ON CONFLICT (book_id) DO UPDATE
+        SET txid = EXCLUDED.txid, deleted = true;
+    ELSE
+        INSERT INTO book_bookchange (book_id, txid, deleted)
+        SELECT id, pg_current_xact_id()::text::bigint, false
+        FROM new_books ORDER BY id
+        ON CONFLICT (book_id) DO UPDATE
+        SET txid = EXCLUDED.txid, deleted = false;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0009_book_change"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="bookchange",
+            name="book_change_txid_idx",
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="created_at",
+            field=models.DateTimeField(
+                db_default=django.db.models.functions.datetime.Now(),
+                db_index=True,
+                editable=False,
+            ),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="updated_at",
+            field=models.DateTimeField(
+                db_default=django.db.models.functions.datetime.Now(),
+                db_index=True,
+                editable=False,
+            ),
+        ),
+        migrations.AddField(
+            model_name="bookchange",
+            name="changed_at",
+            field=models.DateTimeField(
+                db_default=django.db.models.functions.datetime.Now()
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookchange",
+            index=models.Index(
+                fields=["txid", "book_id"], name="book_change_txid_book_idx"
+            ),
+        ),
+        migrations.RunSQL(
+            CREATE_TIMESTAMPS_TRIGGER_SQL, DROP_TIMESTAMPS_TRIGGER_SQL
+        ),
+        migrations.RunSQL(CHANGE_TRIGGER_SQL, UNCHANGE_TRIGGER_SQL),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-18 14:18
+
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0010_book_timestamps"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="author",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate(
+                    django.db.models.functions.text.Upper("name"), "C"
+                ),
+                models.F("id"),
+                name="book_author_name_prefix_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate(
+                    django.db.models.functions.text.Upper("title"), "C"
+                ),
+                models.F("id"),
+                name="book_title_prefix_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.1 on 2026-10-18 16:05
+
+from django.db import migrations
+
+# * The emptied counts are deleted by id, only among the keys the
+# * statement changed, instead of scanning the whole summary.
+FACET_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION book_facet_count_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    deltas text;
+    emptied bigint[];
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM book_bookfacetcount;
+        RETURN NULL;
+    ELSIF TG_OP = 'INSERT' THEN
+        deltas := 'SELECT language_id, author_id, published_date, '
+            '1 AS delta FROM new_books';
+    ELSIF TG_OP = 'DELETE' THEN
+        deltas := 'SELECT language_id, author_id, published_date, '
+            '-1 AS delta FROM old_books';
+    ELSE
+        deltas := 'SELECT language_id, author_id, published_date, '
+            '1 AS delta FROM new_books UNION ALL '
+            'SELECT language_id, author_id, published_date, -1 '
+            'FROM old_books';
+    END IF;
+    EXECUTE format(
+        'WITH upserted AS ('
+        'INSERT INTO book_bookfacetcount (facet, value, count) '
+        'SELECT f.facet, f.value, SUM(b.delta) FROM (%s) AS b '
+        'JOIN book_language AS l ON l.id = b.language_id '
+        'JOIN book_author AS a ON a.id = b.author_id '
+        'CROSS JOIN LATERAL (VALUES '
+        '(''language'', l.name), '
+        '(''author'', a.name), '
+        '(''year'', EXTRACT(YEAR FROM b.published_date)::int::text)'
+        ') AS f (facet, value) '
+        'GROUP BY f.facet, f.value HAVING SUM(b.delta) <> 0 '
+        'ON CONFLICT (facet, value) DO UPDATE '
+        'SET count = book_bookfacetcount.count + EXCLUDED.count '
+        'RETURNING id, count'
+        ') SELECT array_agg(id) FROM upserted WHERE count <= 0',
+        deltas
+    ) INTO emptied;
+    IF emptied IS NOT NULL THEN
+        DELETE FROM book_bookfacetcount WHERE id = ANY(emptied);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+UNFACET_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION book_facet_count_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    deltas text;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM book_bookfacetcount;
+        RETURN NULL;
+    ELSIF TG_OP = 'INSERT' THEN
+        deltas := 'SELECT language_id, author_id, published_date, '
+            '1 AS delta FROM new_books';
+    ELSIF TG_OP = 'DELETE' THEN
+        deltas := 'SELECT language_id, author_id, published_date, '
+            '-1 AS delta FROM old_books';
+    ELSE
+        deltas := 'SELECT language_id, author_id, published_date, '
+            '1 AS delta FROM new_books UNION ALL '
+            'SELECT language_id, author_id, published_date, -1 '
+            'FROM old_books';
+    END IF;
+    EXECUTE format(
+        'INSERT INTO book_bookfacetcount (facet, value, count) '
+        'SELECT f.facet, f.value, SUM(b.delta) FROM (%s) AS b '
+        'JOIN book_language AS l ON l.id = b.language_id '
+        'JOIN book_author AS a ON a.id = b.author_id '
+        'CROSS JOIN LATERAL (VALUES '
+        '(''language'', l.name), '
+        '(''author'', a.name), '
+        '(''year'', EXTRACT(YEAR FROM b.published_date)::int::text)'
+        ') AS f (facet, value) '
+        'GROUP BY f.facet, f.value HAVING SUM(b.delta) <> 0 '
+        'ON CONFLICT (facet, value) DO UPDATE '
+        'SET count = book_bookfacetcount.count + EXCLUDED.count',
+        deltas
+    );
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM book_bookfacetcount WHERE count <= 0;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0011_prefix_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FACET_TRIGGER_SQL, UNFACET_TRIGGER_SQL),
+    ]
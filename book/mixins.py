@@ -0,0 +1,120 @@
+from typing import Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.http import Http404, HttpRequest, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+class AsyncReadMixin:
+    """
+    ViewSet mixin serving the list/retrieve actions natively async.
+
+    The GET requests of the list/detail routes run on the event loop with
+    the async ORM, at the same URLs and with the same responses as the
+    sync actions. Any other method (and any non-JSON rendering) falls
+    back to the regular sync view.
+    """
+
+    async_actions = ("list", "retrieve")
+    async_renderer_formats = ("json",)
+
+    @classmethod
+    def as_view(cls, actions: dict = None, **initkwargs) -> Callable:
+        """Returns the view, an async one for the async read actions."""
+        sync_view = super().as_view(actions, **initkwargs)
+        action = (actions or {}).get("get")
+        if not settings.BOOK_ASYNC_READS or action not in cls.async_actions:
+            return sync_view
+
+        async def view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            """Returns the response of the read action, asynchronously."""
+            if request.method != "GET":
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, method_action in actions.items():
+                setattr(self, method, getattr(self, method_action))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        # * The router and the schema generation introspect these.
+        view.__dict__.update(sync_view.__dict__)
+        view.__name__ = sync_view.__name__
+        view.__doc__ = sync_view.__doc__
+        return csrf_exempt(view)
+
+    async def adispatch(
+        self, request: HttpRequest, *args, **kwargs
+    ) -> HttpResponse:
+        """Returns the response like dispatch, asynchronously."""
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await self.ainitial(request)
+            if request.accepted_renderer.format in self.async_renderer_formats:
+                handler = getattr(self, f"a{self.action}")
+                response = await handler(request, *args, **kwargs)
+            else:
+                handler = getattr(self, self.action)
+                response = await sync_to_async(handler)(
+                    request, *args, **kwargs
+                )
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def ainitial(self, request: Request) -> None:
+        """Runs the initial checks like initial, asynchronously."""
+        if "HTTP_AUTHORIZATION" in request.META:
+            # * The credentials are checked against the database.
+            await sync_to_async(self.initial)(request)
+            return
+        if hasattr(request._request, "auser"):
+            # * The session user is loaded up front, not lazily in sync code.
+            request._request.user = await request._request.auser()
+        self.initial(request)
+
+    async def alist(self, request: Request, *args, **kwargs) -> Response:
+        """Returns the list response, asynchronously."""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.paginator.apaginate_queryset(
+            queryset, request, view=self
+        )
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(
+            [row async for row in queryset], many=True
+        )
+        return Response(serializer.data)
+
+    async def aretrieve(self, request: Request, *args, **kwargs) -> Response:
+        """Returns the retrieve response, asynchronously."""
+        serializer = self.get_serializer(await self.aget_object())
+        return Response(serializer.data)
+
+    async def aget_object(self):
+        """Returns the object like get_object, asynchronously."""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (ObjectDoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404(
+                f"No {queryset.model._meta.object_name} matches the given "
+                "query."
+            )
+        self.check_object_permissions(self.request, obj)
+        return obj
@@ -1,17 +1,236 @@
+from typing import Iterable
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Collate, Now, Upper
+
+SEARCH_CONFIG = "english"
+# * Byte order, so a prefix is a key range and the matches come in order.
+PREFIX_COLLATION = "C"
+
+
+class NameManager(models.Manager):
+    """Manager of the lookup models identified by their unique name."""
+
+    def get_by_natural_key(self, name: str) -> models.Model:
+        """Returns the row with the name."""
+        return self.get(name=name)
+
+    def get_by_names(self, names: Iterable[str]) -> dict[str, models.Model]:
+        """
+        Returns the rows by the names, creating the missing ones.
+
+        Runs one SELECT, plus an INSERT and a SELECT only when some names
+        are new, whatever the number of names.
+        """
+        names = set(names)
+        rows = {row.name: row for row in self.filter(name__in=names)}
+        missing = names - rows.keys()
+        if missing:
+            # * Another request may create the same names concurrently.
+            self.bulk_create(
+                [self.model(name=name) for name in missing],
+                ignore_conflicts=True,
+            )
+            rows.update(
+                (row.name, row) for row in self.filter(name__in=missing)
+            )
+        return rows
+
+
+class Author(models.Model):
+    """Model representing a book author."""
+
+    name = models.CharField(max_length=255, unique=True)
+
+    objects = NameManager()
+
+    class Meta:
+        """Meta options for the Author model."""
+
+        indexes = [
+            # * Trigram index for icontains, i.e. UPPER(x) LIKE '%..%'.
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="book_author_name_trgm_idx",
+            ),
+            # * Prefix matches of the autocomplete, in order.
+            models.Index(
+                Collate(Upper("name"), PREFIX_COLLATION),
+                models.F("id"),
+                name="book_author_name_prefix_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Returns the name as the string representation of the Author."""
+        return self.name
+
+    def natural_key(self) -> tuple[str]:
+        """Returns the name as the natural key of the Author."""
+        return (self.name,)
+
+
+class Language(models.Model):
+    """Model representing a book language."""
+
+    name = models.CharField(max_length=50, unique=True)
+
+    objects = NameManager()
+
+    class Meta:
+        """Meta options for the Language model."""
+
+        indexes = [
+            # * Trigram index for icontains, i.e. UPPER(x) LIKE '%..%'.
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="book_language_name_trgm_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Returns the name as the string representation of the Language."""
+        return self.name
+
+    def natural_key(self) -> tuple[str]:
+        """Returns the name as the natural key of the Language."""
+        return (self.name,)
 
 
 class Book(models.Model):
     """Model representing a book."""
 
     title = models.CharField(max_length=255)
-    author = models.CharField(max_length=255)
+    # * The (author, published_date) index below leads with the key.
+    author = models.ForeignKey(
+        Author, on_delete=models.PROTECT, related_name="books", db_index=False
+    )
     published_date = models.DateField(null=True, blank=True)
     isbn = models.CharField(max_length=13, unique=True)
     pages = models.PositiveIntegerField(null=True, blank=True)
     cover = models.URLField(null=True, blank=True)
-    language = models.CharField(max_length=50)
+    language = models.ForeignKey(
+        Language,
+        on_delete=models.PROTECT,
+        related_name="books",
+        db_index=False,
+    )
+    # * The weighted title (A) and author name (B) vector, kept up to date
+    # * by database triggers (a generated column can't read the author).
+    search_vector = SearchVectorField(null=True, editable=False)
+    # * Set by the database (updated_at by a trigger), for every write path.
+    created_at = models.DateTimeField(
+        db_default=Now(), editable=False, db_index=True
+    )
+    updated_at = models.DateTimeField(
+        db_default=Now(), editable=False, db_index=True
+    )
+
+    class Meta:
+        """Meta options for the Book model."""
+
+        indexes = [
+            # * Keyset pagination seeks by (published_date, id).
+            models.Index(
+                fields=["published_date", "id"],
+                name="book_published_date_id_idx",
+            ),
+            # * B-tree indexes for the exact/in filters and date ranges.
+            models.Index(
+                fields=["author", "published_date"],
+                name="book_author_published_idx",
+            ),
+            models.Index(
+                fields=["language", "published_date"],
+                name="book_language_published_idx",
+            ),
+            # * Full-text search over the stored title/author vector.
+            GinIndex(fields=["search_vector"], name="book_search_vector_idx"),
+            # * Prefix matches of the autocomplete, in order.
+            models.Index(
+                Collate(Upper("title"), PREFIX_COLLATION),
+                models.F("id"),
+                name="book_title_prefix_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         """Returns the title as the string representation of the Book model."""
         return self.title
+
+
+class BookFacetCount(models.Model):
+    """
+    Model representing the number of books with a facet value.
+
+    Database triggers on the Book table keep the counts up to date for
+    every write, including bulk and raw SQL ones.
+    """
+
+    FACETS = ("language", "author", "year")
+
+    facet = models.CharField(
+        max_length=20, choices=[(facet, facet) for facet in FACETS]
+    )
+    value = models.CharField(max_length=255, null=True)
+    count = models.IntegerField()
+
+    class Meta:
+        """Meta options for the BookFacetCount model."""
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["facet", "value"],
+                name="book_facet_count_facet_value_uniq",
+                nulls_distinct=False,
+            )
+        ]
+        indexes = [
+            # * The most common values of a facet first.
+            models.Index(
+                fields=["facet", "-count"], name="book_facet_count_idx"
+            ),
+            # * Prefix lookups of the admin autocomplete, UPPER(x) LIKE '..%'.
+            models.Index(
+                models.F("facet"),
+                OpClass(Upper("value"), name="text_pattern_ops"),
+                name="book_facet_count_prefix_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Returns the facet value and its count."""
+        return f"{self.facet}={self.value}: {self.count}"
+
+
+class BookChange(models.Model):
+    """
+    Model representing the last change of a book, deletions included.
+
+    Database triggers on the Book table keep one row per book (ever
+    created) with the id of the transaction that last wrote or deleted it,
+    so readers can fetch the books changed since a point in time.
+    """
+
+    book_id = models.BigIntegerField(primary_key=True)
+    # * The 64-bit (wraparound-free) id of the writing transaction.
+    txid = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        """Meta options for the BookChange model."""
+
+        indexes = [
+            # * The change feed seeks by (txid, book_id).
+            models.Index(
+                fields=["txid", "book_id"], name="book_change_txid_book_idx"
+            )
+        ]
+
+    def __str__(self) -> str:
+        """Returns the book id and its last change."""
+        state = "deleted" if self.deleted else "changed"
+        return f"book {self.book_id} {state} in {self.txid}"
@@ -0,0 +1,318 @@
+import json
+from base64 import b64decode, b64encode
+from datetime import date
+from typing import Any, Optional
+
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .counts import aget_book_count, get_book_count
+
+
+class BookPagination(LimitOffsetPagination):
+    """
+    Pagination for the Book list with two modes.
+
+    The default 'offset' mode is the regular limit/offset pagination.
+    The 'keyset' mode (?pagination=keyset or any ?cursor=...) seeks by
+    a stable (id) or (published_date, id) ordering with opaque cursors,
+    so every page costs the same no matter how deep it is.
+    """
+
+    mode_query_param = "pagination"
+    mode_query_description = "Pagination mode: 'offset' (default) or 'keyset'."
+    cursor_query_param = "cursor"
+    cursor_query_description = "Opaque keyset pagination cursor."
+    ordering_query_param = "ordering"
+    ordering_query_description = "Keyset pagination ordering."
+    keyset_orderings = ("id", "-id", "published_date", "-published_date")
+    keyset_fields = ("id", "published_date")
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> Optional[list]:
+        """Paginates the queryset by the mode requested by the client."""
+        if not self._start(request):
+            return None
+        if self.keyset:
+            page_queryset = self._get_keyset_queryset(queryset, request)
+            return self._set_keyset_page(list(page_queryset))
+        self.count, self.count_exact = get_book_count(queryset)
+        page_queryset = self._get_offset_queryset(queryset, request)
+        return self._set_offset_page(
+            [] if page_queryset is None else list(page_queryset)
+        )
+
+    async def apaginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> Optional[list]:
+        """Paginates the queryset like paginate_queryset, asynchronously."""
+        if not self._start(request):
+            return None
+        if self.keyset:
+            page_queryset = self._get_keyset_queryset(queryset, request)
+            return self._set_keyset_page([row async for row in page_queryset])
+        self.count, self.count_exact = await aget_book_count(queryset)
+        page_queryset = self._get_offset_queryset(queryset, request)
+        return self._set_offset_page(
+            []
+            if page_queryset is None
+            else [row async for row in page_queryset]
+        )
+
+    def get_paginated_response(self, data: list) -> Response:
+        """Returns the paginated response for the current mode."""
+        if not self.keyset:
+            return Response(
+                {
+                    "count": self.count,
+                    "count_exact": self.count_exact,
+                    "next": self.get_next_link(),
+                    "previous": self.get_previous_link(),
+                    "results": data,
+                }
+            )
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self) -> Optional[str]:
+        """Returns the link to the next page."""
+        if not self.keyset:
+            if not self.count_exact and not self.has_next:
+                return None
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self._get_cursor_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        """Returns the link to the previous page."""
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self._get_cursor_link(self.page[0], reverse=True)
+
+    def is_keyset_mode(self, request: Request) -> bool:
+        """Returns whether the client asked for the keyset mode."""
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == "keyset"
+        )
+
+    def get_keyset_ordering(self, request: Request) -> str:
+        """Returns the keyset ordering requested by the client."""
+        ordering = request.query_params.get(self.ordering_query_param, "id")
+        if ordering not in self.keyset_orderings:
+            raise NotFound(
+                f"Invalid ordering. Choose one of: "
+                f"{', '.join(self.keyset_orderings)}."
+            )
+        return ordering
+
+    def encode_cursor(self, ordering: str, values: list, reverse: bool) -> str:
+        """Returns the opaque cursor for the given position."""
+        payload = json.dumps(
+            {"o": ordering, "v": values, "r": int(reverse)},
+            separators=(",", ":"),
+        )
+        return b64encode(payload.encode("ascii")).decode("ascii")
+
+    def decode_cursor(self, request: Request) -> Optional[tuple]:
+        """Returns the (ordering, values, reverse) position of the cursor."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(b64decode(encoded.encode("ascii")))
+            ordering, values = payload["o"], payload["v"]
+            reverse = bool(payload.get("r", 0))
+            if ordering not in self.keyset_orderings:
+                raise ValueError(ordering)
+            if self._get_field_name(ordering) == "id":
+                values = [int(values[0])]
+            else:
+                values = [
+                    date.fromisoformat(values[0]) if values[0] else None,
+                    int(values[1]),
+                ]
+        except (TypeError, ValueError, KeyError, IndexError):
+            raise NotFound(self.invalid_cursor_message)
+        return ordering, values, reverse
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        """Returns the response schema for both pagination modes."""
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["required"] = ["results"]
+        response_schema["properties"]["count"][
+            "description"
+        ] = "Total number of results (offset mode only)."
+        return response_schema
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        """Returns the schema parameters for both pagination modes."""
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.extend(
+            [
+                {
+                    "name": self.mode_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": self.mode_query_description,
+                    "schema": {"type": "string", "enum": ["offset", "keyset"]},
+                },
+                {
+                    "name": self.cursor_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": self.cursor_query_description,
+                    "schema": {"type": "string"},
+                },
+                {
+                    "name": self.ordering_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": self.ordering_query_description,
+                    "schema": {
+                        "type": "string",
+                        "enum": list(self.keyset_orderings),
+                    },
+                },
+            ]
+        )
+        return parameters
+
+    def _start(self, request: Request) -> bool:
+        """Reads the pagination mode and limit; returns whether to page."""
+        self.request = request
+        self.keyset = self.is_keyset_mode(request)
+        self.limit = self.get_limit(request)
+        return self.limit is not None
+
+    def _get_offset_queryset(
+        self, queryset: QuerySet, request: Request
+    ) -> Optional[QuerySet]:
+        """Returns the limit/offset page queryset (None when it's empty)."""
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count_exact:
+            if self.count == 0 or self.offset > self.count:
+                return None
+            return queryset[self.offset : self.offset + self.limit]
+        # * An estimate can't tell where the results end, the extra row can.
+        return queryset[self.offset : self.offset + self.limit + 1]
+
+    def _set_offset_page(self, results: list) -> list:
+        """Returns the limit/offset page of the fetched results."""
+        if self.count_exact:
+            return results
+        self.has_next = len(results) > self.limit
+        self.count = max(self.count, self.offset + len(results))
+        return results[: self.limit]
+
+    def _get_keyset_queryset(
+        self, queryset: QuerySet, request: Request
+    ) -> QuerySet:
+        """Returns the keyset page queryset right after (before) the cursor."""
+        position = self.decode_cursor(request)
+        if position is None:
+            self.ordering, self.values, self.reverse = (
+                self.get_keyset_ordering(request),
+                None,
+                False,
+            )
+        else:
+            self.ordering, self.values, self.reverse = position
+
+        queryset = self._order_queryset(queryset, self.reverse)
+        if self.values is not None:
+            queryset = queryset.filter(
+                self._get_seek_condition(self.values, self.reverse)
+            )
+        # * One extra row tells whether there is another page this way.
+        return queryset[: self.limit + 1]
+
+    def _set_keyset_page(self, results: list) -> list:
+        """Returns the keyset page of the fetched results."""
+        has_more = len(results) > self.limit
+        results = results[: self.limit]
+        if self.reverse:
+            results.reverse()
+
+        self.page = results
+        self.has_next = has_more if not self.reverse else True
+        self.has_previous = (
+            has_more if self.reverse else self.values is not None
+        )
+        return results
+
+    def _get_cursor_link(self, book: Any, reverse: bool) -> str:
+        """Returns the link to the page starting right after the book."""
+        if not isinstance(book, dict):
+            book = {"id": book.id, "published_date": book.published_date}
+        if self._get_field_name(self.ordering) == "id":
+            values = [book["id"]]
+        else:
+            published_date = book["published_date"]
+            values = [
+                published_date.isoformat() if published_date else None,
+                book["id"],
+            ]
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        url = remove_query_param(url, self.mode_query_param)
+        url = remove_query_param(url, self.ordering_query_param)
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(self.ordering, values, reverse),
+        )
+
+    def _order_queryset(self, queryset: QuerySet, reverse: bool) -> QuerySet:
+        """Returns the queryset ordered by the keyset (reversed if asked)."""
+        prefix = "-" if self._is_descending(reverse) else ""
+        if self._get_field_name(self.ordering) == "id":
+            return queryset.order_by(f"{prefix}id")
+        return queryset.order_by(f"{prefix}published_date", f"{prefix}id")
+
+    def _get_seek_condition(self, values: list, reverse: bool) -> Q:
+        """Returns the condition selecting rows past the given position."""
+        descending = self._is_descending(reverse)
+        after = "lt" if descending else "gt"
+        if self._get_field_name(self.ordering) == "id":
+            return Q(**{f"id__{after}": values[0]})
+
+        # * PostgreSQL sorts NULL dates last ascending and first descending,
+        # * which keeps both scan directions on the composite index.
+        published_date, pk = values
+        if published_date is None:
+            condition = Q(published_date__isnull=True, **{f"id__{after}": pk})
+            if descending:
+                condition |= Q(published_date__isnull=False)
+            return condition
+        condition = Q(**{f"published_date__{after}": published_date}) | Q(
+            published_date=published_date, **{f"id__{after}": pk}
+        )
+        if not descending:
+            condition |= Q(published_date__isnull=True)
+        return condition
+
+    def _is_descending(self, reverse: bool) -> bool:
+        """Returns whether the rows are scanned in descending order."""
+        return self.ordering.startswith("-") != reverse
+
+    @staticmethod
+    def _get_field_name(ordering: str) -> str:
+        """Returns the leading keyset field name of the ordering."""
+        return ordering.lstrip("-")
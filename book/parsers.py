@@ -0,0 +1,60 @@
+from typing import Any
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from .renderers import ColumnarJSONRenderer, MessagePackRenderer, msgpack
+
+
+def from_columnar(data: Any) -> Any:
+    """Returns the data with every columnar list as a list of objects."""
+    if isinstance(data, dict):
+        if data.keys() == {"fields", "rows"} and isinstance(
+            data["fields"], list
+        ):
+            fields = data["fields"]
+            rows = data["rows"]
+            if not isinstance(rows, list) or not all(
+                isinstance(row, list) and len(row) == len(fields)
+                for row in rows
+            ):
+                raise ParseError(
+                    "Columnar parse error - every row needs a value per "
+                    "field."
+                )
+            return [dict(zip(fields, row)) for row in rows]
+        return {key: from_columnar(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [from_columnar(item) for item in data]
+    return data
+
+
+class ColumnarJSONParser(JSONParser):
+    """Parser for the columnar JSON (see ColumnarJSONRenderer)."""
+
+    media_type = ColumnarJSONRenderer.media_type
+    renderer_class = ColumnarJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None) -> Any:
+        """Returns the data of the columnar JSON, as objects."""
+        return from_columnar(super().parse(stream, media_type, parser_context))
+
+
+class MessagePackParser(BaseParser):
+    """Parser for MessagePack (see MessagePackRenderer)."""
+
+    media_type = MessagePackRenderer.media_type
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None) -> Any:
+        """Returns the data of the MessagePack payload."""
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except ValueError as error:
+            raise ParseError(f"MessagePack parse error - {error}")
+
+
+# * The compact formats BookViewSet accepts besides the JSON and forms.
+COMPACT_PARSER_CLASSES = [ColumnarJSONParser] + (
+    [MessagePackParser] if msgpack is not None else []
+)
@@ -0,0 +1,190 @@
+import csv
+import json
+from typing import Any, Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .instrumentation import timed
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson (when installed).
+
+    The output is byte-for-byte the same as the JSONRenderer one; indented
+    output and the rare values orjson can't encode fall back to it.
+    """
+
+    def render(
+        self, data: Any, accepted_media_type=None, renderer_context=None
+    ) -> bytes:
+        """Renders the data into JSON (timed)."""
+        with timed("render"):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(
+        self, data: Any, accepted_media_type=None, renderer_context=None
+    ) -> bytes:
+        """Returns the data rendered by orjson or the JSONRenderer."""
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                # * Date/times go through the DRF encoder for its format.
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # * Same strict JavaScript subset escaping as the JSONRenderer.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+def to_columnar(data: Any) -> Any:
+    """
+    Returns the data with every list of same-keyed objects as columns.
+
+    Such a list becomes {"fields": [names], "rows": [[values], ...]}, so
+    the field names are sent once; anything else (a single object, an
+    empty list, mixed items) is kept, with its values converted.
+    """
+    if isinstance(data, dict):
+        return {key: to_columnar(value) for key, value in data.items()}
+    if isinstance(data, list):
+        if data and all(isinstance(item, dict) for item in data):
+            fields = list(data[0])
+            if all(list(item) == fields for item in data):
+                return {
+                    "fields": fields,
+                    "rows": [list(item.values()) for item in data],
+                }
+        return [to_columnar(item) for item in data]
+    return data
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    """
+    Renderer for the columnar JSON: the lists of objects as field names
+    and value arrays (see to_columnar).
+    """
+
+    media_type = "application/vnd.columnar+json"
+    format = "columnar"
+
+    def render(
+        self, data: Any, accepted_media_type=None, renderer_context=None
+    ) -> bytes:
+        """Renders the data into columnar JSON (timed)."""
+        with timed("render"):
+            return self._render(
+                to_columnar(data), accepted_media_type, renderer_context
+            )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer for MessagePack, the binary equivalent of the JSON output.
+
+    The values JSON has no type for (dates, decimals, ...) are encoded as
+    the JSONRenderer encodes them.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(
+        self, data: Any, accepted_media_type=None, renderer_context=None
+    ) -> bytes:
+        """Renders the data into MessagePack (timed)."""
+        if data is None:
+            return b""
+        with timed("render"):
+            return msgpack.packb(data, default=JSONEncoder().default)
+
+
+# * The compact formats BookViewSet negotiates besides the JSON.
+COMPACT_RENDERER_CLASSES = [ColumnarJSONRenderer] + (
+    [MessagePackRenderer] if msgpack is not None else []
+)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renderer for newline delimited JSON, one object per line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(
+        self, data: Any, accepted_media_type=None, renderer_context=None
+    ) -> bytes:
+        """Renders the data, a list as one line per item."""
+        items = data if isinstance(data, list) else [data]
+        return "".join(self.stream(items)).encode(self.charset)
+
+    def stream(self, rows: Iterable[dict], fields=None) -> Iterator[str]:
+        """Yields the rows as NDJSON lines."""
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        for row in rows:
+            yield encoder.encode(row) + "\n"
+
+
+class CSVRenderer(BaseRenderer):
+    """Renderer for comma separated values with a header row."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(
+        self, data: Any, accepted_media_type=None, renderer_context=None
+    ) -> bytes:
+        """Renders the data, a dict (e.g. errors) as key/value rows."""
+        if isinstance(data, dict):
+            rows = [
+                {"key": key, "value": value} for key, value in data.items()
+            ]
+        else:
+            rows = data or []
+        fields = list(rows[0]) if rows else []
+        return "".join(self.stream(rows, fields)).encode(self.charset)
+
+    def stream(self, rows: Iterable[dict], fields: list[str]) -> Iterator[str]:
+        """Yields the header and the rows as CSV lines."""
+        buffer = _LineBuffer()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        yield writer.writeheader()
+        for row in rows:
+            yield writer.writerow(row)
+
+
+class _LineBuffer:
+    """File-like object returning the written line instead of storing it."""
+
+    def write(self, value: str) -> str:
+        """Returns the written value."""
+        return value
@@ -0,0 +1,76 @@
+import random
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Model
+
+
+_replica_reads = ContextVar("book_replica_reads", default=False)
+_pinned_to_primary = ContextVar("book_pinned_to_primary", default=False)
+
+
+def enable_replica_reads() -> None:
+    """Lets the Book reads of the current request go to a replica."""
+    _replica_reads.set(True)
+
+
+def pin_to_primary() -> None:
+    """Sends all the Book reads of the current request to the primary."""
+    _pinned_to_primary.set(True)
+
+
+def is_pinned_to_primary() -> bool:
+    """Returns whether the current request reads from the primary."""
+    return _pinned_to_primary.get()
+
+
+def reads_from_replicas() -> bool:
+    """Returns whether the Book reads of the current request may lag."""
+    return (
+        bool(settings.DATABASE_REPLICAS)
+        and _replica_reads.get()
+        and not _pinned_to_primary.get()
+    )
+
+
+def reset_replica_routing(pinned: bool = False) -> None:
+    """Resets the routing state for the next request."""
+    _replica_reads.set(False)
+    _pinned_to_primary.set(pinned)
+
+
+class ReplicaRouter:
+    """
+    Database router sending the Book reads to the replicas.
+
+    Only the reads a view opted in (enable_replica_reads) go to a random
+    replica of DATABASE_REPLICAS, everything else (writes, validation
+    queries, commands) stays on the primary. A request pinned to the
+    primary (right after a write) reads its own writes from the primary.
+    """
+
+    app_label = "book"
+
+    def db_for_read(self, model: type[Model], **hints) -> Optional[str]:
+        """Returns a replica alias for the opted-in Book reads."""
+        if (
+            model._meta.app_label != self.app_label
+            or not settings.DATABASE_REPLICAS
+            or not _replica_reads.get()
+            or _pinned_to_primary.get()
+        ):
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model: type[Model], **hints) -> Optional[str]:
+        """Returns the primary alias for the Book writes."""
+        if model._meta.app_label != self.app_label:
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints) -> bool:
+        """Returns whether both objects come from the same database data."""
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        return obj1._state.db in databases and obj2._state.db in databases
@@ -0,0 +1,119 @@
+import hashlib
+from functools import cache
+from importlib.metadata import version as get_package_version
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+from rest_framework.request import Request
+
+from .compression import encode_entry, encode_entry_response
+
+
+# * The packages whose versions change the generated schema too.
+SCHEMA_PACKAGES = ("django", "djangorestframework", "drf-spectacular")
+# * Bounds the in-process entries (the query params are client input).
+SCHEMA_MEMORY_ENTRIES = 16
+
+_schemas = {}
+
+
+@cache
+def get_code_version() -> str:
+    """
+    Returns the version of the code the schema is generated from.
+
+    BOOK_CODE_VERSION (e.g. the commit the build is made from) if set,
+    otherwise the digest of the project's Python sources and the versions
+    of the schema packages. Computed once per process, as the code can't
+    change without a restart.
+    """
+    if settings.BOOK_CODE_VERSION:
+        return settings.BOOK_CODE_VERSION
+    digest = hashlib.md5()
+    for package in SCHEMA_PACKAGES:
+        digest.update(f"{package}=={get_package_version(package)}".encode())
+    base_dir = Path(settings.BASE_DIR)
+    paths = {Path(base_dir, *settings.ROOT_URLCONF.split(".")[:-1])}
+    paths.update(
+        Path(app_config.path)
+        for app_config in apps.get_app_configs()
+        if Path(app_config.path).is_relative_to(base_dir)
+    )
+    for path in sorted(paths):
+        for source in sorted(path.rglob("*.py")):
+            digest.update(str(source.relative_to(base_dir)).encode())
+            digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    Schema view generating the OpenAPI schema once per code version.
+
+    The rendered schema (per format, language and API version) is kept in
+    memory and in the cache (file-based by default, so it survives the
+    restarts and is shared by the workers) under the code version, with a
+    strong ETag and 304 Not Modified replies, and compressed once per
+    encoding. `python manage.py build_schema` generates it ahead, at build
+    time.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """Returns the (cached) schema response."""
+        key = self._get_schema_cache_key(request)
+        entry = _schemas.get(key) or django_cache.get(key)
+        if entry is not None:
+            if encode_entry(entry, request):
+                django_cache.set(key, entry, timeout=None)
+        else:
+            response = super().get(request, *args, **kwargs)
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            entry = {
+                "content": response.content,
+                "content_type": response["Content-Type"],
+                "content_disposition": response["Content-Disposition"],
+                "etag": f'"{hashlib.md5(response.content).hexdigest()}"',
+            }
+            encode_entry(entry, request)
+            django_cache.set(key, entry, timeout=None)
+        if key not in _schemas:
+            if len(_schemas) >= SCHEMA_MEMORY_ENTRIES:
+                _schemas.clear()
+            _schemas[key] = entry
+
+        response = HttpResponse(
+            entry["content"], content_type=entry["content_type"]
+        )
+        response["Content-Disposition"] = entry["content_disposition"]
+        response["ETag"] = entry["etag"]
+        return encode_entry_response(
+            request,
+            get_conditional_response(
+                request._request, etag=entry["etag"], response=response
+            ),
+            entry,
+        )
+
+    def _get_schema_cache_key(self, request: Request) -> str:
+        """Returns the cache key of the schema variant of the request."""
+        raw_key = repr(
+            (
+                request.accepted_media_type,
+                request.query_params.get("lang"),
+                self.api_version
+                or request.version
+                or self._get_version_parameter(request),
+            )
+        )
+        digest = hashlib.md5(raw_key.encode()).hexdigest()
+        return f"book:schema:{get_code_version()}:{digest}"
@@ -1,13 +1,241 @@
+from functools import cache
+from typing import Iterable
+
+from django.conf import settings
 from rest_framework import serializers
 
+from .bulk import resolve_lookups
+from .instrumentation import timed
 from .models import Book
 
 
+class BookListSerializer(serializers.ListSerializer):
+    """List serializer of books, timing their representation."""
+
+    @property
+    def data(self) -> list[dict]:
+        """Returns the representation of the books (timed)."""
+        with timed("serialize"):
+            return super().data
+
+
 class BookSerializer(serializers.ModelSerializer):
-    """Serializer for the Book model."""
+    """
+    Serializer for the Book model.
+
+    The author and language are read and written by name; unknown names
+    are created on save.
+    """
+
+    author = serializers.CharField(source="author.name", max_length=255)
+    language = serializers.CharField(source="language.name", max_length=50)
 
     class Meta:
         """Meta options for the BookSerializer."""
 
         model = Book
-        fields = "__all__"
+        list_serializer_class = BookListSerializer
+        fields = (
+            "id",
+            "title",
+            "author",
+            "published_date",
+            "isbn",
+            "pages",
+            "cover",
+            "language",
+        )
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Keeps only the sparse fieldset fields given in the context."""
+        super().__init__(*args, **kwargs)
+        fields = self.context.get("fields")
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def create(self, validated_data: dict) -> Book:
+        """Returns the created book, with its author and language."""
+        return super().create(resolve_lookups([validated_data])[0])
+
+    def update(self, instance: Book, validated_data: dict) -> Book:
+        """Returns the updated book, with its author and language."""
+        return super().update(instance, resolve_lookups([validated_data])[0])
+
+    @property
+    def data(self) -> dict:
+        """Returns the representation of the book (timed)."""
+        with timed("serialize"):
+            return super().data
+
+
+class BookReadSerializer:
+    """
+    Read-only serializer for the Book rows fetched by .values().
+
+    Gives the same representation as the BookSerializer without building
+    model instances and serializer fields for every row.
+    """
+
+    # * Only the fields whose representation isn't the raw value.
+    converters = {"published_date": lambda value: value.isoformat()}
+    # * Only the fields read from the related rows.
+    sources = {"author": "author__name", "language": "language__name"}
+
+    def __init__(
+        self, instance=None, many: bool = False, context=None, **kwargs
+    ) -> None:
+        """Sets the row(s) to serialize and the (sparse) fields."""
+        self.instance = instance
+        self.many = many
+        self.field_names = (context or {}).get(
+            "fields"
+        ) or self.get_field_names()
+        self.field_sources = [
+            (name, self.sources.get(name, name)) for name in self.field_names
+        ]
+        self.field_converters = [
+            (name, convert)
+            for name, convert in self.converters.items()
+            if name in self.field_names
+        ]
+
+    @classmethod
+    @cache
+    def get_field_names(cls) -> tuple[str, ...]:
+        """Returns the field names, in the BookSerializer order."""
+        return tuple(BookSerializer().fields)
+
+    @classmethod
+    def get_value_names(cls, field_names: Iterable[str]) -> list[str]:
+        """Returns the .values() names to fetch for the fields."""
+        return [cls.sources.get(name, name) for name in field_names]
+
+    @property
+    def data(self) -> list[dict] | dict:
+        """Returns the representation of the row(s) (timed)."""
+        with timed("serialize"):
+            if self.many:
+                return [self.to_representation(row) for row in self.instance]
+            return self.to_representation(self.instance)
+
+    def to_representation(self, row: dict) -> dict:
+        """Returns the representation of the row."""
+        data = {name: row[source] for name, source in self.field_sources}
+        for name, convert in self.field_converters:
+            if data[name] is not None:
+                data[name] = convert(data[name])
+        return data
+
+
+def parse_sparse_fields(
+    fields: str | None, exclude: str | None
+) -> tuple[str, ...] | None:
+    """
+    Returns the field names of the ?fields=/?exclude= sparse fieldset.
+
+    Both are comma-separated field names; the result keeps the
+    BookSerializer field order. Returns None when neither is given.
+    """
+    if not fields and not exclude:
+        return None
+    field_names = BookReadSerializer.get_field_names()
+    requested = _split_field_names(fields) if fields else set(field_names)
+    excluded = _split_field_names(exclude) if exclude else set()
+    unknown = (requested | excluded) - set(field_names)
+    if unknown:
+        raise serializers.ValidationError(
+            {
+                "fields": [
+                    f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                    f"Choose from: {', '.join(field_names)}."
+                ]
+            }
+        )
+    selected = tuple(
+        name
+        for name in field_names
+        if name in requested and name not in excluded
+    )
+    if not selected:
+        raise serializers.ValidationError(
+            {"fields": ["At least one field must be selected."]}
+        )
+    return selected
+
+
+def _split_field_names(value: str) -> set[str]:
+    """Returns the names of the comma-separated value."""
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class BookBulkListSerializer(BookListSerializer):
+    """List serializer validating a batch of books."""
+
+    def to_internal_value(self, data: list) -> list[dict]:
+        """Validates the batch, reporting the errors per item."""
+        self._seen_isbns = set()
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data: dict) -> dict:
+        """Validates the item and that its ISBN doesn't repeat."""
+        validated = super().run_child_validation(data)
+        if validated["isbn"] in self._seen_isbns:
+            raise serializers.ValidationError(
+                {"isbn": ["Duplicate ISBN in the batch."]}
+            )
+        self._seen_isbns.add(validated["isbn"])
+        return validated
+
+
+class BookBulkSerializer(BookSerializer):
+    """Serializer for upserting a batch of books by ISBN."""
+
+    class Meta(BookSerializer.Meta):
+        """Meta options for the BookBulkSerializer."""
+
+        list_serializer_class = BookBulkListSerializer
+        # * Existing ISBNs are updated, not rejected (and not queried).
+        extra_kwargs = {"isbn": {"validators": []}}
+
+    @classmethod
+    def many_init(cls, *args, **kwargs) -> BookBulkListSerializer:
+        """Returns the list serializer limited to the maximum batch size."""
+        kwargs.setdefault("max_length", settings.BOOK_BULK_MAX_ITEMS)
+        kwargs.setdefault("allow_empty", False)
+        return super().many_init(*args, **kwargs)
+
+
+class BookBulkDeleteSerializer(serializers.Serializer):
+    """Serializer for deleting a batch of books by ids."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BOOK_BULK_MAX_ITEMS,
+    )
+
+
+class BookLookupSerializer(serializers.Serializer):
+    """Serializer for looking up a batch of books by ISBNs or ids."""
+
+    isbns = serializers.ListField(
+        child=serializers.CharField(max_length=13),
+        required=False,
+        allow_empty=False,
+        max_length=settings.BOOK_LOOKUP_MAX_ITEMS,
+    )
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=settings.BOOK_LOOKUP_MAX_ITEMS,
+    )
+
+    def validate(self, data: dict) -> dict:
+        """Validates that exactly one of the lists is given."""
+        if len(data) != 1:
+            raise serializers.ValidationError(
+                "Give either 'isbns' or 'ids' (not both)."
+            )
+        return data
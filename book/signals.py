@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .cache import bump_books_version
+from .facets import sync_facet_triggers
+from .instrumentation import instrument_query
+from .models import Author, Book, Language
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Language)
+def invalidate_books_cache(sender, using: str, **kwargs) -> None:
+    """
+    Invalidates the cached Book data once the write is committed.
+
+    Renaming an author or a language changes the books' data too.
+    """
+    transaction.on_commit(bump_books_version, using=using)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs) -> None:
+    """Times and counts the queries of the new database connection."""
+    if instrument_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(instrument_query)
+
+
+@receiver(post_migrate)
+def switch_facet_triggers(sender, using: str, **kwargs) -> None:
+    """Switches the facet summary triggers to BOOK_FACET_SUMMARY."""
+    if sender.name == "book":
+        sync_facet_triggers(using)
@@ -0,0 +1,415 @@
+import datetime
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from itertools import islice
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .cache import aget_books_version, get_books_version
+from .changes import get_xmin
+from .models import Book, BookChange
+from .replicas import is_pinned_to_primary
+
+
+# * The BookReadSerializer row keys, in the order of the slot values.
+VALUE_NAMES = (
+    "id",
+    "title",
+    "author__name",
+    "published_date",
+    "isbn",
+    "pages",
+    "cover",
+    "language__name",
+)
+# * Markers of the unknown dates and pages in the integer columns.
+NO_DATE = 0
+NO_PAGES = -1
+
+
+class BookMirror(ABC):
+    """
+    Base of the in-process copies of the Book data.
+
+    The first sync loads all the books, the next ones only the books the
+    BookChange log marks as changed (or deleted) since the previous sync.
+    A copy is fresh while the Book data version it was synced to is the
+    current one, for BOOK_SNAPSHOT_MAX_AGE seconds at most (see
+    get_max_age).
+    """
+
+    def __init__(self) -> None:
+        """Initializes the empty, never synced copy."""
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Empties the copy, the next sync loads all the books."""
+        with self.lock:
+            self.clear()
+            self.cursor = None
+            self.version = None
+            self.synced_at = 0.0
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Empties the data of the copy."""
+
+    @abstractmethod
+    def apply(self, books: QuerySet, removed: list[int]) -> int:
+        """Applies the (changed) books and removed ids, returns the books."""
+
+    def needs_reload(self) -> bool:
+        """Returns whether the next sync must load all the books again."""
+        return False
+
+    def get_max_age(self) -> int:
+        """Returns the seconds a sync is trusted without a version bump."""
+        return settings.BOOK_SNAPSHOT_MAX_AGE
+
+    def is_fresh(self, version: int) -> bool:
+        """Returns whether the copy is synced to the data version."""
+        return (
+            self.cursor is not None
+            and self.version == version
+            and time.monotonic() - self.synced_at < self.get_max_age()
+        )
+
+    def sync(self, version: int = None) -> int:
+        """
+        Syncs the copy with the database, returns the changed books.
+
+        The `version` is the Book data version read before the sync, the
+        copy is fresh for it afterwards. Concurrent callers wait for the
+        one sync instead of running their own.
+        """
+        with self.sync_lock:
+            if version is not None and self.is_fresh(version):
+                return 0
+            alias = router.db_for_write(Book)
+            xmin = get_xmin(alias)
+            books = Book.objects.using(alias).order_by()
+            removed = []
+            if self.needs_reload():
+                self.reset()
+            if self.cursor is not None:
+                # * The transactions still running at the last sync may
+                # * have committed since, they are read again.
+                changes = BookChange.objects.using(alias).filter(
+                    txid__gte=self.cursor
+                )
+                removed = list(
+                    changes.filter(deleted=True).values_list(
+                        "book_id", flat=True
+                    )
+                )
+                books = books.filter(
+                    pk__in=changes.filter(deleted=False).values("book_id")
+                )
+            changed = self.apply(books, removed)
+            self.cursor = xmin
+            self.version = version
+            self.synced_at = time.monotonic()
+            return changed + len(removed)
+
+
+class BookSnapshot(BookMirror):
+    """
+    Compact in-process copy of the catalog for the lookups by id and ISBN.
+
+    The books are kept in columns (integer arrays for the ids, dates and
+    pages, lists of strings with the author and language names interned)
+    with the id and ISBN indexes pointing at their slots.
+    """
+
+    def clear(self) -> None:
+        """Empties the columns and indexes."""
+        self.ids = array("q")
+        self.dates = array("i")
+        self.pages = array("i")
+        self.titles = []
+        self.authors = []
+        self.isbns = []
+        self.covers = []
+        self.languages = []
+        self.by_id = {}
+        self.by_isbn = {}
+        self.free_slots = []
+
+    def __len__(self) -> int:
+        """Returns the number of the books in the snapshot."""
+        return len(self.by_id)
+
+    def apply(self, books: QuerySet, removed: list[int]) -> int:
+        """
+        Puts the books in the columns and removes the removed ones.
+
+        The rows are put chunk by chunk as they are read, so only a chunk
+        of row tuples is held besides the columns (the first sync reads
+        the whole catalog). The lock is held per chunk: the lookups
+        meanwhile see each book either before or after the sync.
+        """
+        chunk_size = settings.BOOK_EXPORT_CHUNK_SIZE
+        rows = books.values_list(*VALUE_NAMES).iterator(chunk_size=chunk_size)
+        with self.lock:
+            for pk in removed:
+                self._remove(pk)
+        changed = 0
+        while chunk := list(islice(rows, chunk_size)):
+            with self.lock:
+                for row in chunk:
+                    self._put(row)
+            changed += len(chunk)
+        return changed
+
+    def get(self, pk: int = None, isbn: str = None) -> Optional[dict]:
+        """Returns the row of the book with the id or ISBN (or None)."""
+        with self.lock:
+            slot = (
+                self.by_id.get(pk) if isbn is None else self.by_isbn.get(isbn)
+            )
+            if slot is None:
+                return None
+            date, pages = self.dates[slot], self.pages[slot]
+            return dict(
+                zip(
+                    VALUE_NAMES,
+                    (
+                        self.ids[slot],
+                        self.titles[slot],
+                        self.authors[slot],
+                        (
+                            datetime.date.fromordinal(date)
+                            if date != NO_DATE
+                            else None
+                        ),
+                        self.isbns[slot],
+                        pages if pages != NO_PAGES else None,
+                        self.covers[slot],
+                        self.languages[slot],
+                    ),
+                )
+            )
+
+    def get_memory_usage(self) -> int:
+        """Returns the bytes taken by the columns, indexes and values."""
+        containers = [
+            self.ids,
+            self.dates,
+            self.pages,
+            self.titles,
+            self.authors,
+            self.isbns,
+            self.covers,
+            self.languages,
+            self.by_id,
+            self.by_isbn,
+            self.free_slots,
+        ]
+        values = [
+            *self.titles,
+            *self.authors,
+            *self.isbns,
+            *self.covers,
+            *self.languages,
+            *self.by_id.keys(),
+            *self.by_id.values(),
+        ]
+        # * The shared (interned) values and the slots count once.
+        unique = {id(value): value for value in values if value is not None}
+        return sum(map(sys.getsizeof, containers)) + sum(
+            map(sys.getsizeof, unique.values())
+        )
+
+    def _put(self, row: tuple) -> None:
+        """Adds or replaces the book of the .values_list() row."""
+        pk, title, author, date, isbn, pages, cover, language = row
+        values = (
+            pk,
+            date.toordinal() if date is not None else NO_DATE,
+            pages if pages is not None else NO_PAGES,
+            title,
+            sys.intern(author),
+            isbn,
+            cover,
+            sys.intern(language),
+        )
+        slot = self.by_id.get(pk)
+        if slot is None:
+            if self.free_slots:
+                slot = self.free_slots.pop()
+                self._set_slot(slot, values)
+            else:
+                slot = len(self.ids)
+                for column, value in zip(self._columns, values):
+                    column.append(value)
+            self.by_id[pk] = slot
+        else:
+            self._unindex_isbn(slot)
+            self._set_slot(slot, values)
+        self.by_isbn[isbn] = slot
+
+    def _remove(self, pk: int) -> None:
+        """Removes the book with the id (if any), freeing its slot."""
+        slot = self.by_id.pop(pk, None)
+        if slot is None:
+            return
+        self._unindex_isbn(slot)
+        self._set_slot(slot, (0, NO_DATE, NO_PAGES, *[None] * 5))
+        self.free_slots.append(slot)
+
+    def _unindex_isbn(self, slot: int) -> None:
+        """Removes the ISBN of the slot from the index."""
+        # * Another book may have taken the ISBN over in the same sync.
+        if self.by_isbn.get(self.isbns[slot]) == slot:
+            del self.by_isbn[self.isbns[slot]]
+
+    def _set_slot(self, slot: int, values: tuple) -> None:
+        """Sets the values of the slot in all the columns."""
+        for column, value in zip(self._columns, values):
+            column[slot] = value
+
+    @property
+    def _columns(self) -> tuple:
+        """Returns the columns, in the order of the slot values."""
+        return (
+            self.ids,
+            self.dates,
+            self.pages,
+            self.titles,
+            self.authors,
+            self.isbns,
+            self.covers,
+            self.languages,
+        )
+
+
+book_snapshot = BookSnapshot()
+
+
+def get_book_snapshot(version: int) -> BookSnapshot:
+    """Returns the snapshot of the process, synced to the data version."""
+    if not book_snapshot.is_fresh(version):
+        book_snapshot.sync(version)
+    return book_snapshot
+
+
+def warm_book_mirrors() -> None:
+    """
+    Loads the enabled in-process copies before the first request.
+
+    Called by the WSGI/ASGI entry points, so the first (full) sync doesn't
+    hold a request (and the ones waiting on its lock). The connections are
+    closed afterwards: workers forked from a preloading master must not
+    share them.
+    """
+    # * Imported here, the filter module builds on this one.
+    from .bloom import book_isbn_filter
+
+    mirrors = [
+        mirror
+        for mirror, enabled in [
+            (book_snapshot, settings.BOOK_SNAPSHOT),
+            (book_isbn_filter, settings.BOOK_ISBN_FILTER),
+        ]
+        if enabled
+    ]
+    if not mirrors:
+        return
+    version = get_books_version()
+    for mirror in mirrors:
+        mirror.sync(version)
+    connections.close_all()
+
+
+async def aget_book_snapshot(version: int) -> BookSnapshot:
+    """Returns the snapshot like get_book_snapshot, asynchronously."""
+    if not book_snapshot.is_fresh(version):
+        await sync_to_async(book_snapshot.sync)(version)
+    return book_snapshot
+
+
+class SnapshotReadMixin:
+    """
+    ViewSet mixin serving retrieve from the in-process BookSnapshot.
+
+    With BOOK_SNAPSHOT on, a retrieve (sparse fieldsets aside) reads the
+    book from the snapshot synced to the current Book data version,
+    without a query. Retrieves with filters, of the clients pinned to the
+    primary after a write, and the snapshot misses read the database. The
+    batch lookups by id or ISBN read the snapshot first too.
+    """
+
+    snapshot_params = {"fields", "exclude", "format"}
+
+    def retrieve(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """Returns the retrieve response, from the snapshot if possible."""
+        if self._is_snapshot_read(request):
+            row = get_book_snapshot(get_books_version()).get(
+                self._get_snapshot_pk()
+            )
+            if row is not None:
+                return self._get_snapshot_response(request, row)
+        return super().retrieve(request, *args, **kwargs)
+
+    async def aretrieve(
+        self, request: Request, *args, **kwargs
+    ) -> HttpResponse:
+        """Returns the retrieve response like retrieve, asynchronously."""
+        if self._is_snapshot_read(request):
+            snapshot = await aget_book_snapshot(await aget_books_version())
+            row = snapshot.get(self._get_snapshot_pk())
+            if row is not None:
+                return self._get_snapshot_response(request, row)
+        return await super().aretrieve(request, *args, **kwargs)
+
+    def _is_snapshot_read(self, request: Request) -> bool:
+        """Returns whether the retrieve can read the snapshot."""
+        return (
+            settings.BOOK_SNAPSHOT
+            and not is_pinned_to_primary()
+            and set(request.query_params) <= self.snapshot_params
+            and self._get_snapshot_pk() is not None
+        )
+
+    def _get_snapshot_rows(self, field: str, values: list) -> dict:
+        """
+        Returns the snapshot rows of the books by id or ISBN (if found).
+
+        The batch lookups are POSTs (pinned to the primary), they read the
+        snapshot synced to the current version like the ISBN filter.
+        """
+        if not settings.BOOK_SNAPSHOT:
+            return {}
+        snapshot = get_book_snapshot(get_books_version())
+        key = "pk" if field == "id" else field
+        rows = {}
+        for value in values:
+            row = snapshot.get(**{key: value})
+            if row is not None:
+                rows[value] = row
+        return rows
+
+    def _get_snapshot_pk(self) -> Optional[int]:
+        """Returns the id of the retrieved book (None if not one)."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            return int(self.kwargs[lookup_url_kwarg])
+        except (KeyError, ValueError):
+            return None
+
+    def _get_snapshot_response(self, request: Request, row: dict) -> Response:
+        """Returns the response of the snapshot row."""
+        self.check_object_permissions(request, row)
+        return Response(self.get_serializer(row).data)
@@ -0,0 +1,103 @@
+import datetime
+import itertools
+import random
+from typing import Iterator
+
+from .models import Author, Book, Language
+
+
+SYNTHETIC_ISBN_PREFIX = "97"
+WORDS = (
+    "silent", "river", "garden", "shadow", "empire", "winter", "secret",
+    "journey", "light", "ocean", "forest", "stone", "city", "dream",
+    "history", "war", "love", "night", "storm", "mountain", "glass",
+    "island", "kingdom", "memory", "fire", "road", "star", "house",
+)  # fmt: skip
+LANGUAGES = (
+    "English", "French", "German", "Spanish", "Italian", "Ukrainian",
+    "Polish", "Portuguese", "Dutch", "Swedish", "Japanese", "Chinese",
+)  # fmt: skip
+
+
+def generate_books(
+    rows: int,
+    authors: int = 1000,
+    languages: int = 5,
+    date_spread: int = 365 * 50,
+    seed: int = 0,
+    start: int = 0,
+) -> Iterator[Book]:
+    """
+    Yields reproducible synthetic (unsaved) books.
+
+    Their authors and languages are unsaved too, create_books resolves
+    them to the rows with the same names.
+
+    The same arguments always yield the same books: `authors` and
+    `languages` set the cardinality of the columns (skewed, like real
+    catalogs), `date_spread` the days the published dates span (back from
+    2020-01-01, about 5% are unknown), and `start` offsets the ISBNs so
+    several batches don't collide.
+    """
+    generator = random.Random(seed)
+    language_names = [
+        LANGUAGES[number % len(LANGUAGES)]
+        + (f" {number // len(LANGUAGES)}" if number >= len(LANGUAGES) else "")
+        for number in range(languages)
+    ]
+    # * Zipf-like weights, a few authors/languages have most of the books.
+    author_weights = list(
+        itertools.accumulate(1 / (number + 1) for number in range(authors))
+    )
+    language_weights = list(
+        itertools.accumulate(1 / (number + 1) for number in range(languages))
+    )
+    last_date = datetime.date(2020, 1, 1)
+    for number in range(start, start + rows):
+        author = generator.choices(range(authors), cum_weights=author_weights)[
+            0
+        ]
+        title = " ".join(generator.choices(WORDS, k=generator.randint(1, 4)))
+        published_date = (
+            None
+            if generator.random() < 0.05
+            else last_date
+            - datetime.timedelta(days=generator.randrange(date_spread or 1))
+        )
+        yield Book(
+            title=title.capitalize(),
+            author=Author(name=f"Author {author}"),
+            published_date=published_date,
+            isbn=f"{SYNTHETIC_ISBN_PREFIX}{number:011}",
+            pages=generator.randint(40, 1200),
+            cover=(
+                f"https://covers.example.com/{number}.jpg"
+                if generator.random() < 0.7
+                else None
+            ),
+            language=Language(
+                name=generator.choices(
+                    language_names, cum_weights=language_weights
+                )[0]
+            ),
+        )
+
+
+def create_books(rows: int, batch_size: int = 5000, **options) -> int:
+    """Returns the number of synthetic books created in batches."""
+    created = 0
+    books = generate_books(rows, **options)
+    while created < rows:
+        batch = [book for _, book in zip(range(batch_size), books)]
+        authors = Author.objects.get_by_names(
+            book.author.name for book in batch
+        )
+        languages = Language.objects.get_by_names(
+            book.language.name for book in batch
+        )
+        for book in batch:
+            book.author = authors[book.author.name]
+            book.language = languages[book.language.name]
+        Book.objects.bulk_create(batch)
+        created += len(batch)
+    return created
@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..admin import BookAdmin
+from .utils import create_book
+
+
+class BookAdminTestCase(TestCase):
+    """Test cases for the Book admin changelist."""
+
+    url = "/admin/book/book/"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Creates test books and a superuser."""
+        cls.books = [
+            create_book(
+                title=f"Book {count}",
+                author=f"Author {count % 3}",
+                isbn=f"97831614840{count:02}",
+                language="English" if count % 2 else "French",
+            )
+            for count in range(5)
+        ]
+        cls.user = get_user_model().objects.create_superuser(
+            "admin", "", "admin"
+        )
+
+    def setUp(self):
+        """Logs the superuser in and clears the cached counts."""
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_filters_read_summary(self):
+        """Test that the filter choices don't scan the books."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertContains(response, "Author 0 (2)")
+        self.assertContains(response, "French (3)")
+        self.assertFalse(
+            [query for query in context if "DISTINCT" in query["sql"]]
+        )
+        self.assertFalse(
+            [query for query in context if "COUNT(*)" in query["sql"]][1:]
+        )
+
+    def test_filter_by_author_outside_choices(self):
+        """Test that any author can be filtered by."""
+        with self.settings(BOOK_ADMIN_FILTER_CHOICES=1):
+            response = self.client.get(self.url, {"author": "Author 2"})
+        self.assertEqual(
+            list(response.context["cl"].result_list),
+            [self.books[2]],
+        )
+        self.assertContains(response, "?author=Author+2")
+
+    def test_keyset_pagination(self):
+        """Test that the default ordering pages by keyset."""
+        response = self._get_page({})
+        self.assertEqual(
+            [book.pk for book in response.context["cl"].result_list],
+            [book.pk for book in self.books[:-3:-1]],
+        )
+        response = self._get_page({"after": self.books[3].pk})
+        cl = response.context["cl"]
+        self.assertEqual(
+            [book.pk for book in cl.result_list],
+            [book.pk for book in self.books[2:0:-1]],
+        )
+        self.assertEqual(cl.next_page_url, f"?after={self.books[1].pk}")
+        self.assertEqual(cl.first_page_url, "?")
+        self.assertContains(response, "Next page")
+
+    def test_ordered_pagination(self):
+        """Test that the other orderings page by numbers."""
+        response = self._get_page({"o": "1", "p": "2"})
+        cl = response.context["cl"]
+        self.assertFalse(cl.keyset)
+        self.assertEqual(
+            [book.title for book in cl.result_list], ["Book 2", "Book 3"]
+        )
+
+    def test_author_autocomplete(self):
+        """Test that the authors autocomplete by prefix."""
+        response = self.client.get(
+            f"{self.url}autocomplete/author/", {"term": "author 1"}
+        )
+        self.assertEqual(
+            response.json(),
+            {"results": [{"id": "Author 1", "text": "Author 1 (2)"}]},
+        )
+
+    def test_change_form_autocompletes_author(self):
+        """Test that the change form doesn't list all the authors."""
+        response = self.client.get(f"{self.url}{self.books[0].pk}/change/")
+        self.assertContains(response, "admin-autocomplete")
+        self.assertNotContains(response, '<option value="">---------')
+
+    def _get_page(self, params: dict):
+        """Returns the changelist page of two books."""
+        with patch.object(BookAdmin, "list_per_page", 2):
+            return self.client.get(self.url, params)
@@ -0,0 +1,132 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from .. import autocomplete
+from ..autocomplete import get_prefix_range
+from ..models import Author
+from .utils import create_book
+
+
+class BookAutocompleteTestCase(APITestCase):
+    """Test cases for the title and author prefix autocomplete."""
+
+    url = "/api/v1/books/autocomplete/"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Creates test books."""
+        cls.books = [
+            create_book(
+                title=title,
+                author=author,
+                isbn=f"978316148450{count}",
+                language="English",
+            )
+            for count, (title, author) in enumerate(
+                [
+                    ("Dune", "Frank Herbert"),
+                    ("Dune Messiah", "Frank Herbert"),
+                    ("dungeon crawl", "Dunsany"),
+                    ("The Hobbit", "J. R. R. Tolkien"),
+                ]
+            )
+        ]
+        Author.objects.create(name="Dunbar")
+
+    def setUp(self):
+        """Clears the cache so no test sees another test's cached data."""
+        cache.clear()
+
+    def test_autocomplete(self):
+        """Test that the titles and authors match the prefix in order."""
+        response = self.client.get(self.url, {"q": "dun"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["titles"],
+            [
+                {"id": book.pk, "title": book.title, "author": author}
+                for book, author in zip(
+                    self.books[:3],
+                    ["Frank Herbert", "Frank Herbert", "Dunsany"],
+                )
+            ],
+        )
+        # * Authors without books are left out.
+        self.assertEqual(
+            [author["name"] for author in response.json()["authors"]],
+            ["Dunsany"],
+        )
+
+    def test_autocomplete_limit(self):
+        """Test that the matches are capped by the limit and its maximum."""
+        response = self.client.get(self.url, {"q": "DUNE", "limit": 1})
+        self.assertEqual(
+            [title["title"] for title in response.data["titles"]], ["Dune"]
+        )
+        with override_settings(BOOK_AUTOCOMPLETE_MAX_LIMIT=2):
+            response = self.client.get(self.url, {"q": "d", "limit": 100})
+        self.assertEqual(len(response.data["titles"]), 2)
+
+    def test_autocomplete_empty_prefix(self):
+        """Test that an empty prefix matches nothing without a query."""
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"q": " "})
+        self.assertEqual(response.data, {"titles": [], "authors": []})
+
+    def test_autocomplete_cached(self):
+        """Test that a repeated prefix is served from the cache."""
+        self.client.get(self.url, {"q": "the"})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"q": "the"})
+        self.assertEqual(response.json()["titles"][0]["title"], "The Hobbit")
+
+    @override_settings(BOOK_AUTOCOMPLETE_TIMEOUT_MS=10)
+    def test_autocomplete_timeout(self):
+        """Test that a query over the time budget is canceled with 503."""
+        filter_prefix = autocomplete.filter_prefix
+
+        def slow_filter_prefix(*args):
+            """Returns the prefix filter sleeping on every row."""
+            return filter_prefix(*args).extra(
+                where=["pg_sleep(0.05) IS NOT NULL"]
+            )
+
+        with mock.patch.object(
+            autocomplete, "filter_prefix", slow_filter_prefix
+        ):
+            response = self.client.get(self.url, {"q": "dun"})
+        self.assertEqual(response.status_code, 503)
+        # * The timeout doesn't outlive the autocomplete.
+        self.assertEqual(
+            self.client.get(self.url, {"q": "d"}).status_code, 200
+        )
+
+    def test_autocomplete_uppercased_by_database(self):
+        """Test that the prefix is uppercased like the indexed keys."""
+        book = create_book(
+            title="ßolo",
+            author="Author",
+            isbn="9783161484599",
+            language="English",
+        )
+        response = self.client.get(self.url, {"q": "ß"})
+        self.assertEqual(
+            [title["id"] for title in response.json()["titles"]], [book.pk]
+        )
+
+    def test_autocomplete_before_surrogates(self):
+        """Test that a prefix ending before the surrogates is matched."""
+        response = self.client.get(self.url, {"q": "dun\ud7ff"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["titles"], [])
+
+    def test_prefix_range(self):
+        """Test that the range covers exactly the keys with the prefix."""
+        self.assertEqual(get_prefix_range("AB"), ("AB", "AC"))
+        self.assertEqual(
+            get_prefix_range("Z\U0010ffff"), ("Z\U0010ffff", None)
+        )
+        self.assertEqual(get_prefix_range("A\ud7ff"), ("A\ud7ff", "A\ue000"))
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..bloom import BloomFilter, book_isbn_filter
+from ..cache import BOOKS_VERSION_KEY, get_books_version
+from .utils import create_book
+
+
+class BloomFilterTestCase(SimpleTestCase):
+    """Test cases for the Bloom filter."""
+
+    def test_no_false_negatives(self):
+        """Test that every added value is reported as present."""
+        bloom = BloomFilter(1000, 0.01)
+        values = [f"978{number:010}" for number in range(1000)]
+        for value in values:
+            bloom.add(value)
+        self.assertTrue(all(value in bloom for value in values))
+
+    def test_false_positive_rate(self):
+        """Test that the false positives stay near the error rate."""
+        bloom = BloomFilter(1000, 0.01)
+        for number in range(1000):
+            bloom.add(f"978{number:010}")
+        false_positives = sum(
+            f"979{number:010}" in bloom for number in range(10000)
+        )
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(BOOK_ISBN_FILTER=True)
+class BookISBNFilterLookupTestCase(TestCase):
+    """Test cases for the ISBN lookups through the Bloom filter."""
+
+    client_class = APIClient
+    url = "/api/v1/books/lookup/"
+
+    def setUp(self):
+        """Empties the cache and the filter."""
+        cache.clear()
+        book_isbn_filter.reset()
+
+    def test_lookup_finds_late_bumped_books_after_max_age(self):
+        """Test that a book committed without a bump is found in time."""
+        self.client.post(self.url, {"isbns": ["1"]}, format="json")
+        version = get_books_version()
+        create_book(
+            title="New",
+            author="Author",
+            isbn="0000000000000",
+            language="English",
+        )
+        # * As if the bump hadn't reached the cache of this process yet.
+        cache.set(BOOKS_VERSION_KEY, version, timeout=None)
+        data = {"isbns": ["0000000000000"]}
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.data["not_found"], ["0000000000000"])
+        with override_settings(BOOK_ISBN_FILTER_MAX_AGE=0):
+            response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.data["not_found"], [])
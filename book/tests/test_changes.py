@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from ..models import Book
+from .utils import create_book
+
+
+class BookChangesTestCase(TransactionTestCase):
+    """Test cases for the change feed (committed changes only)."""
+
+    client_class = APIClient
+    url = "/api/v1/books/changes/"
+
+    def setUp(self):
+        """Creates test books."""
+        cache.clear()
+        self.books = [
+            create_book(
+                title=f"Book {count}",
+                author="Author",
+                isbn=f"978316148430{count}",
+                language="English",
+            )
+            for count in range(3)
+        ]
+
+    def test_changes_from_start(self):
+        """Test that the feed starts with all the books, page by page."""
+        response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [change["id"] for change in response.data["results"]],
+            [book.pk for book in self.books[:2]],
+        )
+        self.assertEqual(response.data["results"][0]["change"], "created")
+        self.assertEqual(
+            response.data["results"][0]["book"]["title"], "Book 0"
+        )
+        self.assertTrue(response.data["has_more"])
+        response = self.client.get(
+            self.url, {"since": response.data["cursor"], "limit": 2}
+        )
+        self.assertEqual(
+            [change["id"] for change in response.data["results"]],
+            [self.books[2].pk],
+        )
+        self.assertFalse(response.data["has_more"])
+
+    def test_changes_since_cursor(self):
+        """Test that the feed returns only the changes after the cursor."""
+        cursor = self.client.get(self.url).data["cursor"]
+        self.client.patch(
+            f"/api/v1/books/{self.books[1].pk}/",
+            {"title": "Changed"},
+            format="json",
+        )
+        self.client.delete(f"/api/v1/books/{self.books[0].pk}/")
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                self.url, {"since": cursor, "fields": "id,title"}
+            )
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "id": self.books[1].pk,
+                    "change": "updated",
+                    "changed_at": response.data["results"][0]["changed_at"],
+                    "book": {"id": self.books[1].pk, "title": "Changed"},
+                },
+                {
+                    "id": self.books[0].pk,
+                    "change": "deleted",
+                    "changed_at": response.data["results"][1]["changed_at"],
+                    "book": None,
+                },
+            ],
+        )
+        cursor = response.data["cursor"]
+        response = self.client.get(self.url, {"since": cursor})
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(response.data["cursor"], cursor)
+
+    def test_updated_at_set_by_database(self):
+        """Test that every write path moves updated_at."""
+        book = Book.objects.get(pk=self.books[0].pk)
+        Book.objects.filter(pk=book.pk).update(pages=10)
+        book.refresh_from_db()
+        self.assertGreater(book.updated_at, book.created_at)
+
+    def test_changes_invalid_cursor(self):
+        """Test that an invalid cursor is rejected."""
+        response = self.client.get(self.url, {"since": "invalid"})
+        self.assertEqual(response.status_code, 404)
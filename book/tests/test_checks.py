@@ -0,0 +1,64 @@
+from django.test import SimpleTestCase, override_settings
+
+from ..checks import (
+    check_filter_indexes,
+    check_shared_cache,
+    get_unindexed_filters,
+)
+from ..filters import BookFilterSet
+from ..models import Book
+
+
+class FilterIndexesCheckTestCase(SimpleTestCase):
+    """Test cases for the BookFilterSet indexes check."""
+
+    def test_book_filter_set_is_indexed(self):
+        """Test that every BookFilterSet lookup has a matching index."""
+        self.assertEqual(check_filter_indexes(), [])
+
+    def test_unindexed_filter(self):
+        """Test that a filter without a matching index is reported."""
+
+        class UnindexedBookFilterSet(BookFilterSet):
+            class Meta(BookFilterSet.Meta):
+                fields = {
+                    **BookFilterSet.Meta.fields,
+                    "title": ["exact", "icontains"],
+                    "isbn": ["exact", "icontains"],
+                }
+
+        self.assertEqual(
+            get_unindexed_filters(UnindexedBookFilterSet, Book),
+            ["isbn__icontains", "title", "title__icontains"],
+        )
+
+
+class SharedCacheCheckTestCase(SimpleTestCase):
+    """Test cases for the shared cache check."""
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://localhost:6379",
+            }
+        }
+    )
+    def test_shared_cache(self):
+        """Test that a shared cache backend passes the check."""
+        self.assertEqual(check_shared_cache(), [])
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased."
+                "FileBasedCache",
+                "LOCATION": "/tmp/book_cache",
+            }
+        }
+    )
+    def test_per_host_cache(self):
+        """Test that a per-host cache backend is reported."""
+        self.assertEqual(
+            [warning.id for warning in check_shared_cache()], ["book.W001"]
+        )
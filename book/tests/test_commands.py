@@ -0,0 +1,179 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..filters import BookFilterSet
+from ..models import Book
+from ..synthetic import generate_books
+from .utils import create_book
+
+
+class ImportBooksCommandTestCase(TestCase):
+    """Test cases for the import_books management command."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Creates a book to be updated by the import."""
+        create_book(
+            title="Old title",
+            author="Author",
+            isbn="9783161484100",
+            language="English",
+        )
+
+    def setUp(self):
+        """Creates a temporary directory for the input files."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_import_csv(self):
+        """Test that the command creates and updates books from CSV."""
+        path = self._write(
+            "books.csv",
+            "title,author,published_date,isbn,pages,cover,language\n"
+            "New title,Author,2020-01-01,9783161484100,100,,English\n"
+            "Book,Author,,9783161484101,,,French\n",
+        )
+        output = self._call(path)
+        self.assertIn("1 created, 1 updated, 0 invalid", output)
+        self.assertEqual(Book.objects.count(), 2)
+        book = Book.objects.get(isbn="9783161484100")
+        self.assertEqual(book.title, "New title")
+        self.assertEqual(book.pages, 100)
+
+    def test_import_jsonl(self):
+        """Test that the command imports books from JSONL."""
+        path = self._write(
+            "books.jsonl",
+            "\n".join(
+                json.dumps(
+                    {
+                        "title": f"Book {count}",
+                        "author": "Author",
+                        "isbn": f"978316148420{count}",
+                        "language": "English",
+                    }
+                )
+                for count in range(5)
+            ),
+        )
+        output = self._call(path, "--chunk-size", "2")
+        self.assertIn("5 created, 0 updated, 0 invalid", output)
+        self.assertEqual(Book.objects.count(), 6)
+
+    def test_import_invalid_rows(self):
+        """Test that the command skips the rows breaking the constraints."""
+        path = self._write(
+            "books.csv",
+            "title,author,published_date,isbn,pages,cover,language\n"
+            ",Author,,9783161484101,,,English\n"
+            "Book,Author,,97831614841011,,,English\n"
+            "Book,Author,,9783161484102,-1,not-a-url,English\n"
+            "Book,Author,,9783161484103,,,English\n",
+        )
+        output = self._call(path)
+        self.assertIn("1 created, 0 updated, 3 invalid", output)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_import_jsonl_non_object_rows(self):
+        """Test that the command counts the non-object JSON rows invalid."""
+        row = {
+            "title": "Book",
+            "author": "Author",
+            "isbn": "9783161484101",
+            "language": "English",
+        }
+        path = self._write(
+            "books.jsonl",
+            "\n".join(map(json.dumps, [[1], "x", 1, None, row])),
+        )
+        output = self._call(path)
+        self.assertIn("1 created, 0 updated, 4 invalid", output)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def _write(self, name: str, content: str) -> str:
+        """Returns the path of the written temporary input file."""
+        path = Path(self.directory.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    @staticmethod
+    def _call(*args) -> str:
+        """Returns the output of the import_books command."""
+        stdout = StringIO()
+        call_command("import_books", *args, stdout=stdout, stderr=StringIO())
+        return stdout.getvalue()
+
+
+class GenerateBooksCommandTestCase(TestCase):
+    """Test cases for the generate_books management command."""
+
+    def test_generate_books(self):
+        """Test that the command creates the requested synthetic books."""
+        call_command(
+            "generate_books",
+            "--rows",
+            "50",
+            "--authors",
+            "3",
+            "--languages",
+            "2",
+            "--batch-size",
+            "20",
+            stdout=StringIO(),
+        )
+        self.assertEqual(Book.objects.count(), 50)
+        self.assertLessEqual(
+            Book.objects.values("author").distinct().count(), 3
+        )
+        self.assertLessEqual(
+            Book.objects.values("language").distinct().count(), 2
+        )
+
+    def test_generate_books_reproducible(self):
+        """Test that the same options generate the same books."""
+        books = [
+            (book.title, book.author.name, book.published_date, book.isbn)
+            for book in generate_books(20, seed=7)
+        ]
+        self.assertEqual(
+            books,
+            [
+                (book.title, book.author.name, book.published_date, book.isbn)
+                for book in generate_books(20, seed=7)
+            ],
+        )
+
+
+class BenchmarkAPICommandTestCase(TestCase):
+    """Test cases for the benchmark_api management command."""
+
+    def test_benchmark_api_report(self):
+        """Test that the command reports every scenario and rolls back."""
+        stdout = StringIO()
+        call_command(
+            "benchmark_api",
+            "--rows",
+            "30",
+            "--iterations",
+            "2",
+            "--warmup",
+            "0",
+            stdout=stdout,
+        )
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(Book.objects.count(), 0)
+        self.assertEqual(report["meta"]["synthetic"]["rows"], 30)
+        self.assertIn("list_deep_keyset", report["scenarios"])
+        for name in BookFilterSet.base_filters:
+            self.assertIn(f"filter_{name}", report["scenarios"])
+        for name, result in report["scenarios"].items():
+            self.assertEqual(result["errors"], 0, name)
+            self.assertGreater(result["queries"]["max"], 0, name)
+            self.assertLessEqual(
+                result["latency_ms"]["p50"], result["latency_ms"]["p99"]
+            )
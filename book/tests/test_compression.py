@@ -0,0 +1,124 @@
+import gzip
+import json
+from unittest import mock
+
+import brotli
+import zstandard
+from django.core.cache import cache
+from django.test import RequestFactory
+from rest_framework.test import APITestCase
+
+from .. import compression
+from ..compression import get_accepted_encoding
+from .utils import create_book
+
+
+class CompressionTestCase(APITestCase):
+    """Test cases for the compression of the API responses."""
+
+    url = "/api/v1/books/"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Creates test books."""
+        for count in range(20):
+            create_book(
+                title=f"Book {count}",
+                author=f"Author {count % 3}",
+                isbn=f"97831614847{count:02}",
+                language="English",
+            )
+
+    def setUp(self):
+        """Clears the cache so no test sees another test's cached data."""
+        cache.clear()
+
+    def test_list_compressed(self):
+        """Test that the list is compressed in the accepted encoding."""
+        plain = self.client.get(self.url, {"limit": 20})
+        cache.clear()
+        for encoding, decompress in (
+            ("gzip", gzip.decompress),
+            ("br", brotli.decompress),
+            (
+                "zstd",
+                lambda data: zstandard.ZstdDecompressor()
+                .decompressobj()
+                .decompress(data),
+            ),
+        ):
+            response = self.client.get(
+                self.url, {"limit": 20}, HTTP_ACCEPT_ENCODING=encoding
+            )
+            self.assertEqual(response["Content-Encoding"], encoding)
+            self.assertIn("Accept-Encoding", response["Vary"])
+            self.assertEqual(
+                int(response["Content-Length"]), len(response.content)
+            )
+            self.assertLess(len(response.content), len(plain.content))
+            self.assertEqual(decompress(response.content), plain.content)
+            self.assertEqual(response["ETag"], f"W/{plain['ETag']}")
+
+    def test_small_response_not_compressed(self):
+        """Test that a body under the minimum size is sent as it is."""
+        response = self.client.get(
+            self.url, {"limit": 1, "fields": "id"}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_cached_response_compressed_once(self):
+        """Test that a cache hit is served precompressed."""
+        with mock.patch.object(
+            compression, "compress", wraps=compression.compress
+        ) as compress:
+            first = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            second = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            self.client.get(self.url, HTTP_ACCEPT_ENCODING="br")
+            self.client.get(self.url, HTTP_ACCEPT_ENCODING="br")
+        self.assertEqual(compress.call_count, 2)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second["Content-Encoding"], "gzip")
+        response = self.client.get(
+            self.url,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=second["ETag"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_streaming_response_compressed(self):
+        """Test that a streamed export is compressed chunk by chunk."""
+        plain = b"".join(
+            self.client.get(f"{self.url}export/").streaming_content
+        )
+        response = self.client.get(
+            f"{self.url}export/", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        content = b"".join(response.streaming_content)
+        self.assertEqual(gzip.decompress(content), plain)
+        self.assertEqual(len(plain.splitlines()), 20)
+
+    def test_schema_compressed(self):
+        """Test that the OpenAPI schema is served compressed."""
+        response = self.client.get(
+            "/api/schema/", {"format": "json"}, HTTP_ACCEPT_ENCODING="br"
+        )
+        self.assertEqual(response["Content-Encoding"], "br")
+        schema = json.loads(brotli.decompress(response.content))
+        self.assertIn("/api/v1/books/", schema["paths"])
+
+    def test_accepted_encoding(self):
+        """Test the Accept-Encoding negotiation."""
+        factory = RequestFactory()
+        for header, expected in (
+            ("gzip, deflate, br, zstd", "zstd"),
+            ("gzip;q=1.0, br;q=0.5", "gzip"),
+            ("zstd;q=0, *", "br"),
+            ("identity", None),
+            ("", None),
+            ("gzip;q=invalid, br", "br"),
+        ):
+            request = factory.get("/", HTTP_ACCEPT_ENCODING=header)
+            self.assertEqual(get_accepted_encoding(request), expected, header)
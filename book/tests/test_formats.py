@@ -0,0 +1,147 @@
+import json
+
+import msgpack
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from ..models import Book
+from ..parsers import from_columnar
+from ..renderers import (
+    ColumnarJSONRenderer,
+    MessagePackRenderer,
+    to_columnar,
+)
+from .utils import create_book
+
+
+MSGPACK_TYPE = MessagePackRenderer.media_type
+COLUMNAR_TYPE = ColumnarJSONRenderer.media_type
+
+
+class BookFormatsTestCase(APITestCase):
+    """Test cases for the MessagePack and columnar JSON formats."""
+
+    url = "/api/v1/books/"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Creates test books."""
+        cls.books = [
+            create_book(
+                title=f"Book {count}",
+                author="Author",
+                isbn=f"978316148460{count}",
+                language="English",
+            )
+            for count in range(3)
+        ]
+
+    def setUp(self):
+        """Clears the cache so no test sees another test's cached data."""
+        cache.clear()
+
+    def test_list_msgpack(self):
+        """Test that the list in MessagePack has the JSON data."""
+        expected = self.client.get(self.url).json()
+        response = self.client.get(self.url, HTTP_ACCEPT=MSGPACK_TYPE)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], MSGPACK_TYPE)
+        self.assertEqual(msgpack.unpackb(response.content), expected)
+        self.assertLess(len(response.content), len(json.dumps(expected)))
+
+    def test_list_columnar(self):
+        """Test that the list in columnar JSON sends the names once."""
+        expected = self.client.get(self.url, {"fields": "id,title"}).json()
+        response = self.client.get(
+            self.url, {"fields": "id,title", "format": "columnar"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            {
+                "fields": ["id", "title"],
+                "rows": [[book.pk, book.title] for book in self.books],
+            },
+        )
+        self.assertEqual(from_columnar(response.json()), expected)
+
+    def test_retrieve_formats(self):
+        """Test that a retrieve in the compact formats is the object."""
+        url = f"{self.url}{self.books[0].pk}/"
+        expected = self.client.get(url).json()
+        response = self.client.get(url, HTTP_ACCEPT=MSGPACK_TYPE)
+        self.assertEqual(msgpack.unpackb(response.content), expected)
+        response = self.client.get(url, HTTP_ACCEPT=COLUMNAR_TYPE)
+        self.assertEqual(response.json(), expected)
+
+    def test_create_msgpack(self):
+        """Test that a book can be created from MessagePack."""
+        response = self.client.post(
+            self.url,
+            msgpack.packb(
+                {
+                    "title": "New",
+                    "author": "Author",
+                    "isbn": "9783161484699",
+                    "language": "English",
+                }
+            ),
+            content_type=MSGPACK_TYPE,
+            HTTP_ACCEPT=MSGPACK_TYPE,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(msgpack.unpackb(response.content)["title"], "New")
+        self.assertTrue(Book.objects.filter(isbn="9783161484699").exists())
+
+    def test_bulk_upsert_columnar(self):
+        """Test that the bulk upsert takes and returns columnar rows."""
+        payload = {
+            "fields": ["title", "author", "isbn", "language"],
+            "rows": [
+                ["Changed", "Author", self.books[0].isbn, "English"],
+                ["New", "Author", "9783161484698", "English"],
+            ],
+        }
+        response = self.client.post(
+            f"{self.url}bulk/",
+            json.dumps(payload),
+            content_type=COLUMNAR_TYPE,
+            HTTP_ACCEPT=COLUMNAR_TYPE,
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["created"], data["updated"]), (1, 1))
+        results = data["results"]
+        self.assertEqual(
+            [row[results["fields"].index("title")] for row in results["rows"]],
+            ["Changed", "New"],
+        )
+
+    def test_invalid_payloads(self):
+        """Test that the malformed compact payloads are rejected."""
+        response = self.client.post(
+            self.url, b"\xc1", content_type=MSGPACK_TYPE
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            f"{self.url}bulk/",
+            json.dumps({"fields": ["title"], "rows": [["A", "B"]]}),
+            content_type=COLUMNAR_TYPE,
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_columnar_round_trip(self):
+        """Test that only the lists of same-keyed objects go columnar."""
+        data = {
+            "results": [{"a": 1, "b": [{"c": 2}]}, {"a": 3, "b": []}],
+            "mixed": [{"a": 1}, {"b": 2}],
+            "empty": [],
+            "object": {"a": 1},
+        }
+        columnar = to_columnar(data)
+        self.assertEqual(
+            columnar["results"],
+            {"fields": ["a", "b"], "rows": [[1, [{"c": 2}]], [3, []]]},
+        )
+        self.assertEqual(columnar["mixed"], [{"a": 1}, {"b": 2}])
+        self.assertEqual(from_columnar(columnar), data)
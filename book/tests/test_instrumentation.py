@@ -0,0 +1,105 @@
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from .utils import create_book
+
+
+class InstrumentationTestCase(APITestCase):
+    """Test cases for the request instrumentation and metrics."""
+
+    url = "/api/v1/books/"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Creates a test book."""
+        cls.book = create_book(
+            title="Book",
+            author="Author",
+            isbn="9783161484100",
+            language="English",
+        )
+
+    def setUp(self):
+        """Clears the cache so the requests run their queries."""
+        cache.clear()
+
+    def test_server_timing(self):
+        """Test that the response carries the request timings."""
+        response = self.client.get(f"{self.url}{self.book.pk}/")
+        timings = {
+            metric.split(";")[0]: metric
+            for metric in response["Server-Timing"].split(", ")
+        }
+        self.assertEqual(
+            list(timings),
+            ["sql", "serialize", "render", "compress", "app", "total"],
+        )
+        self.assertIn('desc="1 queries"', timings["sql"])
+
+    @override_settings(BOOK_METRICS_TOKEN="secret")
+    def test_metrics(self):
+        """Test that the metrics endpoint exposes the request histograms."""
+        self.client.get(self.url)
+        response = self.client.get(
+            "/metrics", headers={"Authorization": "Bearer secret"}
+        )
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn(
+            "# TYPE book_request_duration_seconds histogram", content
+        )
+        self.assertIn(
+            'book_request_queries_bucket{method="GET",view="book-list",'
+            'le="+Inf"}',
+            content,
+        )
+
+    @override_settings(BOOK_METRICS_TOKEN="secret")
+    def test_metrics_unknown_method(self):
+        """Test that an unknown method doesn't add a series of its own."""
+        self.client.generic("FOOBAR", self.url)
+        content = self.client.get(
+            "/metrics", headers={"Authorization": "Bearer secret"}
+        ).content.decode()
+        self.assertNotIn("FOOBAR", content)
+        self.assertIn('method="other"', content)
+
+    @override_settings(BOOK_METRICS_TOKEN="secret")
+    def test_metrics_without_token(self):
+        """Test that the metrics endpoint is only for the token holder."""
+        for headers in ({}, {"Authorization": "Bearer wrong"}):
+            response = self.client.get("/metrics", headers=headers)
+            self.assertEqual(response.status_code, 404)
+
+    def test_metrics_disabled(self):
+        """Test that the metrics endpoint is off without a token set."""
+        response = self.client.get(
+            "/metrics", headers={"Authorization": "Bearer "}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk_upsert_serialize_timing(self):
+        """Test that the list serializers are timed too."""
+        response = self.client.post(
+            f"{self.url}bulk/",
+            [
+                {
+                    "title": "New Book",
+                    "author": "Author",
+                    "isbn": "9783161484101",
+                    "language": "English",
+                }
+            ],
+            format="json",
+        )
+        serialize = response["Server-Timing"].split(", ")[1]
+        self.assertNotEqual(serialize, "serialize;dur=0.00")
+
+    @override_settings(BOOK_SLOW_QUERY_MS=0)
+    def test_slow_query_log(self):
+        """Test that the slow queries are logged with their plan."""
+        with self.assertLogs("book.slow_queries", "WARNING") as logs:
+            self.client.get(f"{self.url}{self.book.pk}/")
+        self.assertIn('WHERE "book_book"."id" = %s', logs.output[0])
+        self.assertIn("Scan", logs.records[0].plan)
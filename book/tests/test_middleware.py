@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.checks import run_checks
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from .utils import create_book
+
+
+class BrowserOnlyMiddlewareTestCase(APITestCase):
+    """Test cases for the browser-only middleware skipping the API."""
+
+    url = "/api/v1/books/"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Creates a test book and an admin user."""
+        cls.book = create_book(
+            title="Book",
+            author="Author",
+            isbn="9783161484700",
+            language="English",
+        )
+        cls.user = get_user_model().objects.create_superuser(
+            "admin", "", "admin"
+        )
+
+    def test_api_skips_session(self):
+        """Test that an API request doesn't load the session or the user."""
+        self.client.force_login(self.user)
+        with self.assertNumQueries(1):
+            response = self.client.get(f"{self.url}{self.book.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Frame-Options", response)
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+
+    def test_api_write_without_csrf_token(self):
+        """Test that the API accepts writes with no CSRF token."""
+        self.client.force_login(self.user)
+        self.client.handler.enforce_csrf_checks = True
+        response = self.client.patch(
+            f"{self.url}{self.book.pk}/", {"pages": 10}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_keeps_full_stack(self):
+        """Test that the admin still gets the sessions, CSRF and headers."""
+        self.client.force_login(self.user)
+        response = self.client.get("/admin/book/book/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+        self.client.handler.enforce_csrf_checks = True
+        response = self.client.post("/admin/logout/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_swagger_keeps_full_stack(self):
+        """Test that the Swagger UI page keeps the clickjacking header."""
+        response = self.client.get("/api/v1/schema/swagger/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+
+    @override_settings(BOOK_API_PATH_PREFIXES=[])
+    def test_full_stack_without_api_prefixes(self):
+        """Test that no prefixes run the full stack for the API too."""
+        response = self.client.get(f"{self.url}{self.book.pk}/")
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+
+    def test_deploy_checks_find_stock_middleware(self):
+        """Test that the CSRF and clickjacking deploy checks pass."""
+        ids = {
+            message.id
+            for message in run_checks(include_deployment_checks=True)
+        }
+        self.assertNotIn("security.W002", ids)
+        self.assertNotIn("security.W003", ids)
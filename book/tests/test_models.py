@@ -1,6 +1,7 @@
 from django.test import TestCase
 
-from ..models import Book
+from ..models import Author, Book, Language
+from .utils import create_book
 
 
 class BookModelTestCase(TestCase):
@@ -9,7 +10,7 @@ class BookModelTestCase(TestCase):
     @classmethod
     def setUpTestData(cls) -> Book:
         """Returns created Organization object for testing."""
-        cls.obj = Book.objects.create(
+        cls.obj = create_book(
             title="The Catcher in the Rye",
             author="J.D. Salinger",
             isbn="9780316769488",
@@ -32,20 +33,23 @@ class BookModelTestCase(TestCase):
         """Test that the title max length is 255."""
         self.assertEqual(Book._meta.get_field("title").max_length, 255)
 
-    def test_author_char_field(self):
-        """Test that the author field is a CharField."""
-        self.assertEqual(
-            Book._meta.get_field("author").__class__.__name__,
-            "CharField",
-        )
+    def test_author_foreign_key(self):
+        """Test that the author field is a ForeignKey to the Author model."""
+        field = Book._meta.get_field("author")
+        self.assertEqual(field.__class__.__name__, "ForeignKey")
+        self.assertIs(field.related_model, Author)
 
     def test_author_required(self):
         """Test that the author field is required."""
         self._test_required_("author")
 
     def test_author_max_length(self):
-        """Test that the author max length is 255."""
-        self.assertEqual(Book._meta.get_field("author").max_length, 255)
+        """Test that the author name max length is 255."""
+        self.assertEqual(Author._meta.get_field("name").max_length, 255)
+
+    def test_author_name_unique(self):
+        """Test that the author names are unique."""
+        self.assertTrue(Author._meta.get_field("name").unique)
 
     def test_published_date_date_field(self):
         """Test that the published_date field is a DateField."""
@@ -99,20 +103,23 @@ class BookModelTestCase(TestCase):
         """Test that the cover field is not required."""
         self._test_not_required_("cover")
 
-    def test_language_char_field(self):
-        """Test that the language field is a CharField."""
-        self.assertEqual(
-            Book._meta.get_field("language").__class__.__name__,
-            "CharField",
-        )
+    def test_language_foreign_key(self):
+        """Test that the language field is a ForeignKey to the Language model."""
+        field = Book._meta.get_field("language")
+        self.assertEqual(field.__class__.__name__, "ForeignKey")
+        self.assertIs(field.related_model, Language)
 
     def test_language_required(self):
         """Test that the language field is required."""
         self._test_required_("language")
 
     def test_language_max_length(self):
-        """Test that the language max length is 50."""
-        self.assertEqual(Book._meta.get_field("language").max_length, 50)
+        """Test that the language name max length is 50."""
+        self.assertEqual(Language._meta.get_field("name").max_length, 50)
+
+    def test_language_name_unique(self):
+        """Test that the language names are unique."""
+        self.assertTrue(Language._meta.get_field("name").unique)
 
     def test_model_string_representation(self):
         """Test the model string representation by __str__."""
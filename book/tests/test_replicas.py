@@ -0,0 +1,128 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..middleware import ReplicaRoutingMiddleware
+from .utils import create_book
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRoutingTestCase(TransactionTestCase):
+    """Test cases for the Book reads routing to the replicas."""
+
+    databases = {"default", "replica_1"}
+    client_class = APIClient
+    url = "/api/v1/books/"
+
+    def setUp(self):
+        """Creates test books (committed, so the replica sees them)."""
+        cache.clear()
+        for count in range(3):
+            create_book(
+                title=f"Book {count}",
+                author="Author",
+                isbn=f"978316148400{count}",
+                language="English",
+            )
+
+    def test_list_books_read_from_replica(self):
+        """Test that the list reads go to the replica."""
+        with CaptureQueriesContext(
+            connections["default"]
+        ) as primary, CaptureQueriesContext(
+            connections["replica_1"]
+        ) as replica:
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["count"], 3)
+        self.assertTrue(replica.captured_queries)
+        self.assertFalse(primary.captured_queries)
+
+    def test_export_books_read_from_replica(self):
+        """Test that the streamed export reads go to the replica."""
+        with CaptureQueriesContext(connections["replica_1"]) as replica:
+            response = self.client.get(f"{self.url}export/")
+            content = b"".join(response.streaming_content)
+        self.assertEqual(len(content.splitlines()), 3)
+        self.assertTrue(replica.captured_queries)
+
+    def test_write_pins_client_to_primary(self):
+        """Test that the client reads its own writes from the primary."""
+        with CaptureQueriesContext(connections["replica_1"]) as replica:
+            response = self.client.post(
+                self.url,
+                {
+                    "title": "New Book",
+                    "author": "Author",
+                    "isbn": "9783161484100",
+                    "language": "English",
+                },
+            )
+            self.assertEqual(response.status_code, 201)
+            self.assertIn(
+                ReplicaRoutingMiddleware.cookie_name, response.cookies
+            )
+            response = self.client.get(f"{self.url}{response.data['id']}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(replica.captured_queries)
+
+    def test_write_pin_header_without_cookies(self):
+        """Test that a client without cookies is pinned by the header."""
+        response = self.client.post(
+            self.url,
+            {
+                "title": "New Book",
+                "author": "Author",
+                "isbn": "9783161484100",
+                "language": "English",
+            },
+        )
+        token = response[ReplicaRoutingMiddleware.header_name]
+        self.client.cookies.clear()
+        with CaptureQueriesContext(connections["replica_1"]) as replica:
+            response = self.client.get(
+                f"{self.url}{response.data['id']}/",
+                headers={ReplicaRoutingMiddleware.header_name: token},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(replica.captured_queries)
+
+    def test_forged_pin_header_ignored(self):
+        """Test that an invalid pin token doesn't pin the client."""
+        with CaptureQueriesContext(connections["replica_1"]) as replica:
+            self.client.get(
+                self.url,
+                headers={ReplicaRoutingMiddleware.header_name: "primary"},
+            )
+        self.assertTrue(replica.captured_queries)
+
+    def test_admin_changelist_read_from_replica(self):
+        """Test that the admin changelist reads the books from the replica."""
+        self.client.force_login(
+            get_user_model().objects.create_superuser("admin", "", "admin")
+        )
+        with CaptureQueriesContext(connections["replica_1"]) as replica:
+            response = self.client.get("/admin/book/book/")
+        self.assertContains(response, "Book 2")
+        self.assertTrue(all("book_book" in query["sql"] for query in replica))
+        self.assertTrue(replica.captured_queries)
+
+    def test_replica_reads_after_write_not_cached(self):
+        """Test that replica reads right after a write aren't cached."""
+        # * setUp's writes just bumped the version.
+        self.client.get(self.url)
+        with CaptureQueriesContext(connections["replica_1"]) as replica:
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["count"], 3)
+        self.assertTrue(replica.captured_queries)
+
+    @override_settings(BOOK_REPLICA_PIN_SECONDS=0)
+    def test_replica_reads_cached_once_caught_up(self):
+        """Test that replica reads are cached after the pin window."""
+        self.client.get(self.url)
+        with CaptureQueriesContext(connections["replica_1"]) as replica:
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()["count"], 3)
+        self.assertFalse(replica.captured_queries)
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.core.cache import cache
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.test import APITestCase
+
+from .. import schema
+
+
+class SchemaViewTestCase(APITestCase):
+    """Test cases for the cached OpenAPI schema view."""
+
+    url = "/api/schema/"
+
+    def setUp(self):
+        """Clears the cached schemas."""
+        cache.clear()
+        schema._schemas.clear()
+
+    def test_schema_generated_once(self):
+        """Test that the schema is generated once and then served cached."""
+        with mock.patch.object(
+            SpectacularAPIView,
+            "get",
+            autospec=True,
+            side_effect=SpectacularAPIView.get,
+        ) as generate:
+            first = self.client.get(self.url)
+            schema._schemas.clear()
+            second = self.client.get(self.url)
+            third = self.client.get(self.url)
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn(b"/api/v1/books/", first.content)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first.content, third.content)
+        self.assertEqual(first["ETag"], third["ETag"])
+
+    def test_schema_formats(self):
+        """Test that the YAML and JSON schemas are cached apart."""
+        yaml = self.client.get(self.url)
+        json = self.client.get(self.url, {"format": "json"})
+        self.assertEqual(
+            yaml["Content-Type"], "application/vnd.oai.openapi; charset=utf-8"
+        )
+        self.assertEqual(
+            json["Content-Type"], "application/vnd.oai.openapi+json"
+        )
+        self.assertEqual(json.json()["info"]["title"], "Book library API")
+        self.assertNotEqual(yaml["ETag"], json["ETag"])
+
+    def test_schema_not_modified(self):
+        """Test that a request with the current ETag gets 304."""
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_schema_regenerated_for_new_code_version(self):
+        """Test that another code version regenerates the schema."""
+        etag = self.client.get(self.url)["ETag"]
+        with mock.patch.object(
+            schema, "get_code_version", return_value="other"
+        ), mock.patch.object(
+            SpectacularAPIView,
+            "get",
+            autospec=True,
+            side_effect=SpectacularAPIView.get,
+        ) as generate:
+            response = self.client.get(self.url)
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(response["ETag"], etag)
@@ -0,0 +1,65 @@
+import datetime
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from ..models import Book
+from ..renderers import FastJSONRenderer
+from ..serializers import BookReadSerializer, BookSerializer
+from .utils import create_book
+
+
+class BookReadSerializerTestCase(TestCase):
+    """Test cases for the BookReadSerializer and FastJSONRenderer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Creates test books with tricky values."""
+        create_book(
+            title='Ünïcödé \u2028\u2029 "quoted"\n\t\x01',
+            author="Автор 😀",
+            published_date=datetime.date(1999, 12, 31),
+            isbn="9783161484100",
+            pages=123,
+            cover="https://example.com/cover.png",
+            language="Українська",
+        )
+        create_book(
+            title="Book", author="Author", isbn="9783161484101", language="En"
+        )
+
+    def test_list_representation_is_byte_compatible(self):
+        """Test that the fast list output matches the default one."""
+        expected = JSONRenderer().render(
+            BookSerializer(Book.objects.order_by("id"), many=True).data
+        )
+        rows = Book.objects.order_by("id").values(
+            *BookReadSerializer.get_value_names(
+                BookReadSerializer.get_field_names()
+            )
+        )
+        actual = FastJSONRenderer().render(
+            BookReadSerializer(rows, many=True).data
+        )
+        self.assertEqual(actual, expected)
+
+    def test_retrieve_representation_is_byte_compatible(self):
+        """Test that the fast retrieve output matches the default one."""
+        book = Book.objects.get(isbn="9783161484100")
+        row = Book.objects.values(
+            *BookReadSerializer.get_value_names(
+                BookReadSerializer.get_field_names()
+            )
+        ).get(pk=book.pk)
+        self.assertEqual(
+            FastJSONRenderer().render(BookReadSerializer(row).data),
+            JSONRenderer().render(BookSerializer(book).data),
+        )
+
+    def test_fast_json_renderer_falls_back_for_indent(self):
+        """Test that the indented output is rendered by the JSONRenderer."""
+        data = {"key": [1, "value", None]}
+        self.assertEqual(
+            FastJSONRenderer().render(data, "application/json; indent=4"),
+            JSONRenderer().render(data, "application/json; indent=4"),
+        )
@@ -0,0 +1,166 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from ..models import Book, Language
+from ..snapshot import BookMirror, book_snapshot, warm_book_mirrors
+from .utils import create_book
+
+
+@override_settings(BOOK_SNAPSHOT=True)
+class BookSnapshotTestCase(APITestCase):
+    """Test cases for the in-process snapshot of the books."""
+
+    url = "/api/v1/books/"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Creates test books."""
+        cls.books = [
+            create_book(
+                title=f"Book {count}",
+                author=f"Author {count % 2}",
+                isbn=f"978316148410{count}",
+                pages=100 + count,
+                language="English",
+            )
+            for count in range(3)
+        ]
+
+    def setUp(self):
+        """Empties the snapshot and clears the cache."""
+        book_snapshot.reset()
+        cache.clear()
+
+    def test_retrieve_book_from_snapshot(self):
+        """Test that a retrieve after the sync runs no queries."""
+        self.client.get(f"{self.url}{self.books[0].pk}/")
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                f"{self.url}{self.books[1].pk}/", {"fields": "title,pages"}
+            )
+        self.assertEqual(response.json(), {"title": "Book 1", "pages": 101})
+
+    def test_snapshot_syncs_changed_books(self):
+        """Test that the changed books are synced."""
+        book_snapshot.sync()
+        response = self.client.patch(
+            f"{self.url}{self.books[0].pk}/",
+            {"title": "Changed", "isbn": "9783161484109"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        book_snapshot.sync()
+        self.assertEqual(
+            book_snapshot.get(self.books[0].pk)["title"], "Changed"
+        )
+        self.assertIsNone(book_snapshot.get(isbn="9783161484100"))
+        self.assertEqual(
+            book_snapshot.get(isbn="9783161484109")["id"], self.books[0].pk
+        )
+
+    @override_settings(BOOK_EXPORT_CHUNK_SIZE=2)
+    def test_snapshot_loads_books_by_chunks(self):
+        """Test that a load over several chunks puts every book."""
+        self.assertEqual(book_snapshot.sync(), 3)
+        self.assertEqual(len(book_snapshot), 3)
+        self.assertEqual(book_snapshot.get(self.books[2].pk)["pages"], 102)
+
+    def test_snapshot_drops_deleted_books(self):
+        """Test that the deleted books are gone after a sync."""
+        book_snapshot.sync()
+        self.client.delete(f"{self.url}{self.books[2].pk}/")
+        response = self.client.get(f"{self.url}{self.books[2].pk}/")
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(book_snapshot.get(isbn="9783161484102"))
+        self.assertEqual(len(book_snapshot), 2)
+
+    def test_snapshot_syncs_renamed_language(self):
+        """Test that renaming a language changes its books."""
+        book_snapshot.sync()
+        Language.objects.filter(name="English").update(name="British")
+        book_snapshot.sync()
+        self.assertEqual(
+            book_snapshot.get(self.books[1].pk)["language__name"], "British"
+        )
+
+    def test_snapshot_interns_names(self):
+        """Test that the books share their author and language strings."""
+        book_snapshot.sync()
+        first, third = self.books[0].pk, self.books[2].pk
+        self.assertIs(
+            book_snapshot.get(first)["author__name"],
+            book_snapshot.get(third)["author__name"],
+        )
+        self.assertGreater(book_snapshot.get_memory_usage(), 0)
+
+    def test_lookup_books_from_snapshot(self):
+        """Test that the batch lookups read the snapshot first."""
+        data = {"isbns": ["9783161484101", "0000000000000"]}
+        self.client.post(f"{self.url}lookup/", data, format="json")
+        # * Only the lookup of the snapshot miss.
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                f"{self.url}lookup/", data, format="json"
+            )
+        self.assertEqual(response.data["results"][0]["title"], "Book 1")
+        self.assertEqual(response.data["not_found"], ["0000000000000"])
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                f"{self.url}lookup/",
+                {"ids": [self.books[2].pk]},
+                format="json",
+            )
+        self.assertEqual(response.data["results"][0]["pages"], 102)
+
+    def test_mirror_requires_clear_and_apply(self):
+        """Test that a mirror without clear/apply can't be created."""
+        with self.assertRaises(TypeError):
+            BookMirror()
+
+    def test_retrieve_with_filters_reads_database(self):
+        """Test that a filtered retrieve still applies the filters."""
+        book_snapshot.sync()
+        Book.objects.filter(pk=self.books[0].pk).update(title="Raw")
+        response = self.client.get(
+            f"{self.url}{self.books[0].pk}/", {"author": "Author 1"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(BOOK_SNAPSHOT=True)
+class BookSnapshotSyncTestCase(TransactionTestCase):
+    """Test cases for the incremental syncs of committed changes."""
+
+    def setUp(self):
+        """Creates test books (committed) and empties the snapshot."""
+        self.books = [
+            create_book(
+                title=f"Book {count}",
+                author="Author",
+                isbn=f"978316148420{count}",
+                language="English",
+            )
+            for count in range(5)
+        ]
+        book_snapshot.reset()
+
+    def test_sync_reads_only_changes(self):
+        """Test that a sync reads only the books changed since the last."""
+        self.assertEqual(book_snapshot.sync(), 5)
+        self.assertEqual(book_snapshot.sync(), 0)
+        Book.objects.filter(pk=self.books[3].pk).update(pages=10)
+        self.books[4].delete()
+        with self.assertNumQueries(3):
+            self.assertEqual(book_snapshot.sync(), 2)
+        self.assertEqual(book_snapshot.get(self.books[3].pk)["pages"], 10)
+        self.assertEqual(len(book_snapshot), 4)
+
+    def test_warm_book_mirrors(self):
+        """Test that the warmup loads the enabled copies."""
+        warm_book_mirrors()
+        self.assertEqual(len(book_snapshot), 5)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                book_snapshot.get(self.books[0].pk)["title"], "Book 0"
+            )
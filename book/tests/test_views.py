@@ -1,7 +1,26 @@
+import csv
+import io
+import json
+from inspect import iscoroutinefunction
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
 from django.utils import timezone
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from ..bloom import book_isbn_filter
+from ..facets import sync_facet_triggers
+from ..models import Author, Book, BookFacetCount, Language
+from ..renderers import NDJSONRenderer
+from ..views import BookViewSet
+from .utils import create_book
+
 
-from ..models import Book
+NDJSON_TYPE = NDJSONRenderer.media_type
 
 
 class BookViewSetAPITestCase(APITestCase):
@@ -14,7 +33,7 @@ class BookViewSetAPITestCase(APITestCase):
         """Creates test books."""
         now = timezone.now()
         for count in range(15):
-            Book.objects.create(
+            create_book(
                 title=f"Book {count}",
                 author=f"Author {count % 2}",
                 published_date=now - timezone.timedelta(days=count),
@@ -22,6 +41,10 @@ class BookViewSetAPITestCase(APITestCase):
                 language="English",
             )
 
+    def setUp(self):
+        """Clears the cache so no test sees another test's cached data."""
+        cache.clear()
+
     def test_list_books(self):
         """Test that the endpoint returns a list of books."""
         response = self.client.get(self.url)
@@ -47,6 +70,76 @@ class BookViewSetAPITestCase(APITestCase):
         self.assertIsNone(response.data["next"])
         self.assertIsNotNone(response.data["previous"])
 
+    def test_list_books_count_exact(self):
+        """Test that the endpoint counts small results exactly."""
+        response = self.client.get(self.url)
+        self.assertTrue(response.data["count_exact"])
+
+    @override_settings(BOOK_EXACT_COUNT_THRESHOLD=0)
+    def test_list_books_count_estimated(self):
+        """Test that the endpoint estimates the count of large results."""
+        response = self.client.get(self.url)
+        self.assertFalse(response.data["count_exact"])
+        self.assertGreaterEqual(response.data["count"], 10)
+        self.assertEqual(len(response.data["results"]), 10)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNone(response.data["next"])
+
+    def test_list_books_count_invalidated_on_write(self):
+        """Test that the memoized count is invalidated by a Book write."""
+        self.assertEqual(self.client.get(self.url).data["count"], 15)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, self._get_valid_data())
+        self.assertEqual(self.client.get(self.url).data["count"], 16)
+
+    def test_list_books_keyset_pagination(self):
+        """Test that the endpoint walks all books by keyset pagination."""
+        response = self.client.get(self.url, {"pagination": "keyset"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertIsNone(response.data["previous"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNone(response.data["next"])
+        response = self.client.get(response.data["previous"])
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertIsNone(response.data["previous"])
+
+    def test_list_books_keyset_pagination_by_published_date(self):
+        """Test that the keyset pagination orders by published date."""
+        create_book(
+            title="Undated",
+            author="Author",
+            isbn="9783161484998",
+            language="English",
+        )
+        titles = []
+        next_url = self.url
+        params = {"pagination": "keyset", "ordering": "-published_date"}
+        while next_url:
+            response = self.client.get(next_url, params)
+            self.assertEqual(response.status_code, 200)
+            titles.extend(book["title"] for book in response.data["results"])
+            next_url, params = response.data["next"], None
+        self.assertEqual(
+            titles, ["Undated"] + [f"Book {count}" for count in range(15)]
+        )
+
+    def test_list_books_keyset_pagination_with_filter(self):
+        """Test that the keyset pagination respects the filters."""
+        response = self.client.get(
+            self.url, {"pagination": "keyset", "author": "Author 0"}
+        )
+        self.assertEqual(len(response.data["results"]), 8)
+        self.assertIsNone(response.data["next"])
+
+    def test_list_books_keyset_pagination_invalid_cursor(self):
+        """Test that the endpoint rejects an invalid cursor."""
+        response = self.client.get(self.url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 404)
+
     def test_filter_books_by_author_exact(self):
         """Test that the endpoint filters books by author exact."""
         response = self.client.get(self.url, {"author": "Author 0"})
@@ -54,6 +147,15 @@ class BookViewSetAPITestCase(APITestCase):
         self.assertEqual(response.data["count"], 8)
         self.assertEqual(len(response.data["results"]), 8)
 
+    def test_filter_books_by_author_joins_by_key(self):
+        """Test that the author filter joins the books by the author key."""
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url, {"author": "Author 0"})
+        self.assertIn(
+            '"book_book"."author_id" = "book_author"."id"',
+            context.captured_queries[-1]["sql"],
+        )
+
     def test_filter_books_by_author_in(self):
         """Test that the endpoint filters books by author in."""
         response = self.client.get(
@@ -111,6 +213,14 @@ class BookViewSetAPITestCase(APITestCase):
         self.assertEqual(response.data["count"], 15)
         self.assertEqual(len(response.data["results"]), 10)
 
+    def test_filter_books_by_isbn_in(self):
+        """Test that the endpoint filters books by ISBN in."""
+        response = self.client.get(
+            self.url, {"isbn__in": "97831614840,97831614841,1"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+
     def test_filter_books_by_language_icontains(self):
         """Test that the endpoint filters books by language icontains."""
         response = self.client.get(
@@ -120,6 +230,160 @@ class BookViewSetAPITestCase(APITestCase):
         self.assertEqual(response.data["count"], 15)
         self.assertEqual(len(response.data["results"]), 10)
 
+    def test_search_books(self):
+        """Test that the endpoint searches books by title and author."""
+        response = self.client.get(self.url, {"search": "author 0"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 8)
+
+    def test_search_books_ranked(self):
+        """Test that the endpoint orders the search results by relevance."""
+        create_book(
+            title="The Hobbit",
+            author="J.R.R. Tolkien",
+            isbn="9780261102217",
+            language="English",
+        )
+        create_book(
+            title="Tolkien: A Biography",
+            author="Humphrey Carpenter",
+            isbn="9780261102224",
+            language="English",
+        )
+        response = self.client.get(self.url, {"search": "tolkien"})
+        self.assertEqual(
+            [book["title"] for book in response.data["results"]],
+            ["Tolkien: A Biography", "The Hobbit"],
+        )
+        self.assertNotIn("search_vector", response.data["results"][0])
+
+    def test_search_books_after_author_rename(self):
+        """Test that the search finds the books by the author's new name."""
+        Author.objects.filter(name="Author 0").update(name="Jane Doe")
+        response = self.client.get(self.url, {"search": "jane"})
+        self.assertEqual(response.data["count"], 8)
+        self.assertEqual(response.data["results"][0]["author"], "Jane Doe")
+
+    def test_list_books_cached(self):
+        """Test that a repeated list request is served from the cache."""
+        response = self.client.get(self.url, {"author": "Author 0"})
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(self.url, {"author": "Author 0"})
+        self.assertEqual(cached_response.status_code, 200)
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(cached_response["ETag"], response["ETag"])
+
+    def test_retrieve_book_not_modified(self):
+        """Test that the endpoint honors If-None-Match with 304."""
+        url = f"{self.url}{Book.objects.first().pk}/"
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_retrieve_book_cache_invalidated_on_write(self):
+        """Test that a Book write invalidates the cached responses."""
+        book = Book.objects.first()
+        url = f"{self.url}{book.pk}/"
+        etag = self.client.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"title": "Updated Book"})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Updated Book")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"{self.url}bulk/",
+                [{**self._get_valid_data(), "isbn": book.isbn}],
+                format="json",
+            )
+        response = self.client.get(url)
+        self.assertEqual(response.json()["title"], "Book")
+
+    def test_read_views_async(self):
+        """Test that the list/detail routes are served by async views."""
+        with override_settings(BOOK_ASYNC_READS=True):
+            self.assertTrue(
+                iscoroutinefunction(BookViewSet.as_view({"get": "list"}))
+            )
+            self.assertTrue(
+                iscoroutinefunction(BookViewSet.as_view({"get": "retrieve"}))
+            )
+            self.assertFalse(
+                iscoroutinefunction(BookViewSet.as_view({"get": "export"}))
+            )
+
+    def test_read_views_sync_by_default(self):
+        """Test that the read views are sync unless served by ASGI."""
+        book = Book.objects.first()
+        self.assertFalse(iscoroutinefunction(resolve(self.url).func))
+        self.assertFalse(
+            iscoroutinefunction(resolve(f"{self.url}{book.pk}/").func)
+        )
+
+    def test_read_views_async_match_sync(self):
+        """Test that the async views respond like the sync ones."""
+        book = Book.objects.first()
+        views = {}
+        for async_reads in (False, True):
+            with override_settings(BOOK_ASYNC_READS=async_reads):
+                views[async_reads] = (
+                    BookViewSet.as_view({"get": "list"}),
+                    BookViewSet.as_view({"get": "retrieve"}),
+                )
+        factory = APIRequestFactory()
+        for url, params, index, kwargs in (
+            (self.url, {"author": "Author 1"}, 0, {}),
+            (self.url, {"pagination": "keyset"}, 0, {}),
+            (f"{self.url}{book.pk}/", {}, 1, {"pk": book.pk}),
+            (f"{self.url}0/", {}, 1, {"pk": 0}),
+        ):
+            cache.clear()
+            expected = views[False][index](factory.get(url, params), **kwargs)
+            cache.clear()
+            response = async_to_sync(views[True][index])(
+                factory.get(url, params), **kwargs
+            )
+            self.assertEqual(response.status_code, expected.status_code)
+            self.assertEqual(
+                response.render().content, expected.render().content
+            )
+
+    def test_list_books_sparse_fields(self):
+        """Test that the endpoint selects only the requested fields."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"fields": "title,id"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data["results"][0]), ["id", "title"])
+        self.assertNotIn('"cover"', queries.captured_queries[-1]["sql"])
+
+    def test_retrieve_book_sparse_exclude(self):
+        """Test that the endpoint leaves out the excluded fields."""
+        book = Book.objects.first()
+        response = self.client.get(
+            f"{self.url}{book.pk}/", {"exclude": "cover,pages"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("cover", response.data)
+        self.assertNotIn("pages", response.data)
+        self.assertEqual(response.data["isbn"], book.isbn)
+
+    def test_list_books_sparse_fields_keyset_pagination(self):
+        """Test that the keyset pagination works with sparse fields."""
+        response = self.client.get(
+            self.url, {"fields": "title", "pagination": "keyset"}
+        )
+        self.assertEqual(list(response.data["results"][0]), ["title"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_list_books_sparse_fields_invalid(self):
+        """Test that the endpoint rejects unknown sparse fields."""
+        response = self.client.get(self.url, {"fields": "title,secret"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("secret", response.data["fields"][0])
+
     def test_create_book_valid(self):
         """Test that the endpoint creates a book with valid data."""
         data = self._get_valid_data()
@@ -127,6 +391,16 @@ class BookViewSetAPITestCase(APITestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(Book.objects.count(), 16)
 
+    def test_create_book_author_by_name(self):
+        """Test that the books of the same author share the Author row."""
+        data = self._get_valid_data()
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.data["author"], "Author")
+        self.client.post(self.url, {**data, "isbn": "9783161484998"})
+        author = Author.objects.get(name="Author")
+        self.assertEqual(author.books.count(), 2)
+        self.assertEqual(Language.objects.count(), 1)
+
     def test_create_book_invalid(self):
         """Test that the endpoint does not create a book with invalid data."""
         data = self._get_invalid_data()
@@ -195,6 +469,270 @@ class BookViewSetAPITestCase(APITestCase):
         self.assertEqual(response.status_code, 404)
         self.assertEqual(Book.objects.count(), 15)
 
+    def test_bulk_upsert_books(self):
+        """Test that the endpoint creates and updates books by ISBN."""
+        data = [
+            {**self._get_valid_data(), "isbn": "97831614840", "title": "New"},
+            {**self._get_valid_data(), "isbn": "9783161484999"},
+        ]
+        response = self.client.post(f"{self.url}bulk/", data, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual(Book.objects.count(), 16)
+        self.assertEqual(Book.objects.get(isbn="97831614840").title, "New")
+
+    def test_bulk_upsert_books_bounded_queries(self):
+        """Test that the bulk upsert query count doesn't grow with size."""
+        for size in (10, 500):
+            data = [
+                {
+                    **self._get_valid_data(),
+                    "isbn": f"978{count:010}",
+                    "author": f"New author {size}",
+                }
+                for count in range(size)
+            ]
+            # * The new author (3) and the known language (1) lookups and
+            # * the upsert in its savepoint.
+            with self.assertNumQueries(7):
+                self.client.post(f"{self.url}bulk/", data, format="json")
+
+    def test_bulk_upsert_books_invalid(self):
+        """Test that the endpoint reports the errors per item."""
+        data = [self._get_valid_data(), self._get_invalid_data()]
+        response = self.client.post(f"{self.url}bulk/", data, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("isbn", response.data[1])
+        self.assertEqual(Book.objects.count(), 15)
+
+    def test_bulk_upsert_books_duplicate_isbn(self):
+        """Test that the endpoint rejects an ISBN repeated in the batch."""
+        data = [self._get_valid_data(), self._get_valid_data()]
+        response = self.client.post(f"{self.url}bulk/", data, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("isbn", response.data[1])
+        self.assertEqual(Book.objects.count(), 15)
+
+    def test_bulk_delete_books(self):
+        """Test that the endpoint deletes books by ids."""
+        book = Book.objects.first()
+        response = self.client.post(
+            f"{self.url}bulk-delete/", {"ids": [book.pk, 999]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["deleted"], [book.pk])
+        self.assertEqual(response.data["not_found"], [999])
+        self.assertEqual(Book.objects.count(), 14)
+
+    def test_lookup_books_by_isbns(self):
+        """Test that the endpoint returns the found and missing ISBNs."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                f"{self.url}lookup/?fields=isbn,title",
+                {"isbns": ["97831614841", "1", "97831614840", "1"]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "results": [
+                    {"title": "Book 1", "isbn": "97831614841"},
+                    {"title": "Book 0", "isbn": "97831614840"},
+                ],
+                "not_found": ["1"],
+            },
+        )
+        self.assertEqual(
+            len([query for query in context if "book_book" in query["sql"]]),
+            1,
+        )
+
+    @override_settings(BOOK_LOOKUP_CHUNK_SIZE=2)
+    def test_lookup_books_by_ids_in_chunks(self):
+        """Test that the endpoint looks the ids up in chunked queries."""
+        ids = list(Book.objects.order_by("id").values_list("id", flat=True))
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                f"{self.url}lookup/",
+                {"ids": [*ids[:4], 999]},
+                format="json",
+            )
+        self.assertEqual(
+            [book["id"] for book in response.data["results"]], ids[:4]
+        )
+        self.assertEqual(response.data["not_found"], [999])
+
+    def test_lookup_books_requires_one_list(self):
+        """Test that the endpoint takes either ISBNs or ids."""
+        response = self.client.post(
+            f"{self.url}lookup/", {"isbns": ["1"], "ids": [1]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(BOOK_ISBN_FILTER=True)
+    def test_lookup_books_skips_database_for_filtered_isbns(self):
+        """Test that the ISBNs the Bloom filter rules out aren't queried."""
+        book_isbn_filter.reset()
+        data = {"isbns": ["97831614840", "0000000000000"]}
+        self.client.post(f"{self.url}lookup/", data, format="json")
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                f"{self.url}lookup/",
+                {"isbns": ["0000000000000"]},
+                format="json",
+            )
+        self.assertEqual(response.data["not_found"], ["0000000000000"])
+        with self.captureOnCommitCallbacks(execute=True):
+            create_book(
+                title="New",
+                author="Author 0",
+                isbn="0000000000000",
+                language="English",
+            )
+        response = self.client.post(f"{self.url}lookup/", data, format="json")
+        self.assertEqual(response.data["not_found"], [])
+
+    def test_export_books_ndjson(self):
+        """Test that the endpoint streams all books as NDJSON."""
+        response = self.client.get(f"{self.url}export/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertTrue(
+            response["Content-Type"].startswith(NDJSONRenderer.media_type)
+        )
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 15)
+        book = Book.objects.order_by("id").first()
+        self.assertEqual(
+            json.loads(lines[0]),
+            self.client.get(f"{self.url}{book.pk}/").json(),
+        )
+
+    def test_export_books_csv_with_filter(self):
+        """Test that the endpoint streams the filtered books as CSV."""
+        response = self.client.get(
+            f"{self.url}export/", {"format": "csv", "author": "Author 0"}
+        )
+        self.assertEqual(response.status_code, 200)
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[0]["author"], "Author 0")
+
+    def test_facets_books(self):
+        """Test that the endpoint counts the books of every facet value."""
+        response = self.client.get(f"{self.url}facets/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["language"], [{"value": "English", "count": 15}]
+        )
+        self.assertEqual(
+            response.data["author"],
+            [
+                {"value": "Author 0", "count": 8},
+                {"value": "Author 1", "count": 7},
+            ],
+        )
+        self.assertEqual(
+            sum(year["count"] for year in response.data["year"]), 15
+        )
+
+    def test_facets_books_other_filters(self):
+        """Test that a facet is filtered by the other facets' filters."""
+        response = self.client.get(
+            f"{self.url}facets/", {"author": "Author 1"}
+        )
+        self.assertEqual(
+            response.data["language"], [{"value": "English", "count": 7}]
+        )
+        self.assertEqual(len(response.data["author"]), 2)
+
+    def test_facets_books_year_alone(self):
+        """Test that a filter group of only the year facet is counted."""
+        response = self.client.get(
+            f"{self.url}facets/",
+            {"language": "English", "published_date__gte": "2000-01-01"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sum(year["count"] for year in response.data["year"]), 15
+        )
+
+    def test_facets_books_summary(self):
+        """Test that the summary table counts like the grouped query."""
+        french = create_book(
+            title="Livre",
+            author="Author 1",
+            isbn="9783161484998",
+            language="French",
+        ).language
+        Book.objects.filter(title="Book 0").update(language=french)
+        with self.assertNumQueries(1):
+            response = self.client.get(f"{self.url}facets/")
+        self.assertEqual(
+            response.data["language"],
+            [
+                {"value": "English", "count": 14},
+                {"value": "French", "count": 2},
+            ],
+        )
+        cache.clear()
+        with override_settings(BOOK_FACET_SUMMARY=False):
+            self.assertEqual(
+                self.client.get(f"{self.url}facets/").data, response.data
+            )
+
+    def test_facets_summary_drops_emptied_counts(self):
+        """Test that the summary drops the counts a write empties."""
+        book = create_book(
+            title="Livre",
+            author="Auteur",
+            isbn="9783161484998",
+            language="French",
+        )
+        book.published_date = None
+        book.save()
+        self.assertTrue(
+            BookFacetCount.objects.filter(facet="year", value=None).exists()
+        )
+        book.delete()
+        self.assertFalse(
+            BookFacetCount.objects.filter(
+                value__in=["Auteur", "French", None]
+            ).exists()
+        )
+        self.assertEqual(
+            BookFacetCount.objects.get(facet="author", value="Author 0").count,
+            8,
+        )
+
+    def test_facets_summary_triggers_follow_setting(self):
+        """Test that the summary is only kept with BOOK_FACET_SUMMARY."""
+        # * The table can't be altered with deferred FK checks pending.
+        connection.check_constraints()
+        with override_settings(BOOK_FACET_SUMMARY=False):
+            self.assertTrue(sync_facet_triggers())
+            self.assertFalse(sync_facet_triggers())
+            self.assertFalse(BookFacetCount.objects.exists())
+            create_book(
+                title="Livre",
+                author="Auteur",
+                isbn="9783161484998",
+                language="French",
+            )
+            self.assertFalse(BookFacetCount.objects.exists())
+        connection.check_constraints()
+        self.assertTrue(sync_facet_triggers())
+        self.assertFalse(sync_facet_triggers())
+        self.assertEqual(
+            BookFacetCount.objects.get(facet="author", value="Auteur").count,
+            1,
+        )
+
     @staticmethod
     def _get_valid_data() -> dict[str, str]:
         """Returns valid data for creating or updating a book."""
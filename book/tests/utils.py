@@ -0,0 +1,9 @@
+from ..models import Author, Book, Language
+
+
+def create_book(**fields) -> Book:
+    """Returns the created book, its author and language given by name."""
+    for name, model in (("author", Author), ("language", Language)):
+        if isinstance(fields.get(name), str):
+            fields[name] = model.objects.get_or_create(name=fields[name])[0]
+    return Book.objects.create(**fields)
@@ -1,15 +1,494 @@
+from django.db import router
+from django.db.models import QuerySet
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    inline_serializer,
+    OpenApiParameter,
+)
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import ModelViewSet
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import Book
-from .filters import BookFilterSet
-from .serializers import BookSerializer
+from .autocomplete import get_autocomplete
+from .bloom import get_isbn_filter
+from .bulk import delete_books, lookup_books, upsert_books
+from .cache import CachedReadMixin, get_books_version
+from .changes import decode_change_cursor, encode_change_cursor, get_changes
+from .export import stream_books
+from .facets import FACET_FIELDS, get_facets
+from .filters import BookFilterSet, BookSearchFilter
+from .instrumentation import expose_metrics
+from .mixins import AsyncReadMixin
+from .pagination import BookPagination
+from .parsers import COMPACT_PARSER_CLASSES
+from .renderers import (
+    COMPACT_RENDERER_CLASSES,
+    CSVRenderer,
+    NDJSONRenderer,
+)
+from .replicas import enable_replica_reads
+from .serializers import (
+    BookSerializer,
+    BookReadSerializer,
+    BookBulkSerializer,
+    BookBulkDeleteSerializer,
+    BookLookupSerializer,
+    parse_sparse_fields,
+)
+from .snapshot import SnapshotReadMixin
 
 
-class BookViewSet(ModelViewSet):
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        name,
+        {
+            "type": "array",
+            "items": {
+                "type": "string",
+                "enum": list(BookReadSerializer.get_field_names()),
+            },
+        },
+        description=description,
+        style="form",
+        explode=False,
+    )
+    for name, description in (
+        ("fields", "Comma-separated fields to return (all by default)."),
+        ("exclude", "Comma-separated fields to leave out."),
+    )
+]
+
+
+@extend_schema_view(
+    list=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+    retrieve=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+)
+class BookViewSet(
+    CachedReadMixin, SnapshotReadMixin, AsyncReadMixin, ModelViewSet
+):
     """ViewSet for the Book model."""
 
     queryset = Book.objects.all()
     serializer_class = BookSerializer
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, BookSearchFilter]
     filterset_class = BookFilterSet
+    pagination_class = BookPagination
+    # * JSON stays the default, the compact formats are negotiated.
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        *COMPACT_RENDERER_CLASSES,
+    ]
+    parser_classes = [
+        *api_settings.DEFAULT_PARSER_CLASSES,
+        *COMPACT_PARSER_CLASSES,
+    ]
+    async_renderer_formats = (
+        "json",
+        *(renderer.format for renderer in COMPACT_RENDERER_CLASSES),
+    )
+    read_actions = ("list", "retrieve")
+    sparse_actions = ("list", "retrieve", "export", "lookup", "changes")
+    replica_actions = (
+        "list",
+        "retrieve",
+        "export",
+        "facets",
+        "changes",
+        "autocomplete",
+    )
+
+    def initial(self, request: Request, *args, **kwargs) -> None:
+        """Runs the initial checks, letting the reads use the replicas."""
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions:
+            enable_replica_reads()
+
+    def get_queryset(self) -> QuerySet:
+        """Returns the queryset, of plain rows for the read actions."""
+        queryset = super().get_queryset()
+        if self._is_fast_read():
+            fields = list(
+                self.get_sparse_fields()
+                or BookReadSerializer.get_field_names()
+            )
+            if self.action == "list" and self.paginator.is_keyset_mode(
+                self.request
+            ):
+                # * The cursors are built from the keyset fields of rows.
+                fields += [
+                    name
+                    for name in self.paginator.keyset_fields
+                    if name not in fields
+                ]
+            return queryset.values(*BookReadSerializer.get_value_names(fields))
+        return queryset.select_related("author", "language")
+
+    def get_serializer_context(self) -> dict:
+        """Returns the serializer context with the sparse fieldset."""
+        context = super().get_serializer_context()
+        if self.action in self.sparse_actions:
+            context["fields"] = self.get_sparse_fields()
+        return context
+
+    def get_sparse_fields(self) -> tuple[str, ...] | None:
+        """Returns the ?fields=/?exclude= field names (None for all)."""
+        return parse_sparse_fields(
+            self.request.query_params.get("fields"),
+            self.request.query_params.get("exclude"),
+        )
+
+    def get_serializer_class(self) -> type:
+        """Returns the serializer class, the read-only one for reads."""
+        if self._is_fast_read():
+            return BookReadSerializer
+        return super().get_serializer_class()
+
+    @extend_schema(
+        request=BookBulkSerializer(many=True),
+        responses=inline_serializer(
+            "BookBulkUpsertResponse",
+            {
+                "created": serializers.IntegerField(),
+                "updated": serializers.IntegerField(),
+                "results": BookSerializer(many=True),
+            },
+        ),
+    )
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_upsert(self, request: Request) -> Response:
+        """Creates or updates (by ISBN) a batch of books."""
+        serializer = BookBulkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        upserted = upsert_books(serializer.validated_data)
+        created = sum(1 for _, is_created in upserted if is_created)
+        return Response(
+            {
+                "created": created,
+                "updated": len(upserted) - created,
+                "results": BookSerializer(
+                    [book for book, _ in upserted], many=True
+                ).data,
+            }
+        )
+
+    @extend_schema(
+        request=BookBulkDeleteSerializer,
+        responses=inline_serializer(
+            "BookBulkDeleteResponse",
+            {
+                "deleted": serializers.ListField(
+                    child=serializers.IntegerField()
+                ),
+                "not_found": serializers.ListField(
+                    child=serializers.IntegerField()
+                ),
+            },
+        ),
+    )
+    @action(detail=False, methods=["post"], url_path="bulk-delete")
+    def bulk_delete(self, request: Request) -> Response:
+        """Deletes a batch of books by ids."""
+        serializer = BookBulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        deleted = set(delete_books(ids))
+        return Response(
+            {
+                "deleted": [pk for pk in ids if pk in deleted],
+                "not_found": [pk for pk in ids if pk not in deleted],
+            }
+        )
+
+    @extend_schema(
+        request=BookLookupSerializer,
+        responses=inline_serializer(
+            "BookLookupResponse",
+            {
+                "results": BookSerializer(many=True),
+                "not_found": serializers.ListField(),
+            },
+        ),
+        parameters=SPARSE_FIELDS_PARAMETERS,
+    )
+    @action(detail=False, methods=["post"])
+    def lookup(self, request: Request) -> Response:
+        """Returns the books of a batch of ISBNs or ids (and the missing)."""
+        serializer = BookLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ((key, values),) = serializer.validated_data.items()
+        field = "isbn" if key == "isbns" else "id"
+        values = list(dict.fromkeys(values))
+        candidates = values
+        if field == "isbn" and settings.BOOK_ISBN_FILTER:
+            # * The ISBNs the filter rules out are missing (as of its sync,
+            # * BOOK_ISBN_FILTER_MAX_AGE seconds ago at most).
+            isbn_filter = get_isbn_filter(get_books_version())
+            candidates = [
+                isbn for isbn in values if isbn_filter.may_contain(isbn)
+            ]
+        fields = (
+            self.get_sparse_fields() or BookReadSerializer.get_field_names()
+        )
+        queryset = Book.objects.values(
+            *dict.fromkeys(
+                [*BookReadSerializer.get_value_names(fields), field]
+            )
+        )
+        rows = self._get_snapshot_rows(field, candidates)
+        missing = [value for value in candidates if value not in rows]
+        if missing:
+            rows.update(lookup_books(queryset, field, missing))
+        return Response(
+            {
+                "results": BookReadSerializer(
+                    [rows[value] for value in values if value in rows],
+                    many=True,
+                    context=self.get_serializer_context(),
+                ).data,
+                "not_found": [value for value in values if value not in rows],
+            }
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "since",
+                str,
+                description=(
+                    "Cursor of the last synced change (from the start if "
+                    "none)."
+                ),
+            ),
+            OpenApiParameter(
+                "limit",
+                int,
+                description="Changes per page "
+                f"(at most {settings.BOOK_CHANGES_MAX_PAGE_SIZE}).",
+            ),
+            *SPARSE_FIELDS_PARAMETERS,
+        ],
+        responses=inline_serializer(
+            "BookChanges",
+            {
+                "results": inline_serializer(
+                    "BookChange",
+                    {
+                        "id": serializers.IntegerField(),
+                        "change": serializers.ChoiceField(
+                            ["created", "updated", "deleted"]
+                        ),
+                        "changed_at": serializers.DateTimeField(),
+                        "book": BookSerializer(allow_null=True),
+                    },
+                    many=True,
+                ),
+                "cursor": serializers.CharField(),
+                "has_more": serializers.BooleanField(),
+            },
+        ),
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def changes(self, request: Request) -> Response:
+        """Returns the books created, updated or deleted since ?since=."""
+        since = request.query_params.get("since")
+        try:
+            position = decode_change_cursor(since) if since else None
+        except ValueError:
+            raise NotFound("Invalid cursor.")
+        try:
+            limit = min(
+                int(
+                    request.query_params.get(
+                        "limit", settings.BOOK_CHANGES_PAGE_SIZE
+                    )
+                ),
+                settings.BOOK_CHANGES_MAX_PAGE_SIZE,
+            )
+        except ValueError:
+            limit = settings.BOOK_CHANGES_PAGE_SIZE
+        results, position, has_more = get_changes(
+            router.db_for_read(Book),
+            position,
+            max(limit, 1),
+            self.get_sparse_fields() or BookReadSerializer.get_field_names(),
+        )
+        return Response(
+            {
+                "results": results,
+                "cursor": encode_change_cursor(position),
+                "has_more": has_more,
+            }
+        )
+
+    @extend_schema(
+        responses={
+            (200, NDJSONRenderer.media_type): OpenApiTypes.STR,
+            (200, CSVRenderer.media_type): OpenApiTypes.STR,
+        },
+        parameters=SPARSE_FIELDS_PARAMETERS,
+        filters=True,
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+        pagination_class=None,
+    )
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """Streams all the (filtered) books as NDJSON (default) or CSV."""
+        renderer = request.accepted_renderer
+        # * The rows are streamed after the request's routing scope ends.
+        queryset = self.filter_queryset(self.get_queryset()).using(
+            router.db_for_read(Book)
+        )
+        response = StreamingHttpResponse(
+            stream_books(
+                queryset,
+                renderer,
+                self.get_sparse_fields(),
+            ),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="books.{renderer.format}"'
+        )
+        return response
+
+    @extend_schema(
+        responses=inline_serializer(
+            "BookFacets",
+            {
+                facet: inline_serializer(
+                    f"BookFacet{facet.capitalize()}",
+                    {
+                        "value": (
+                            serializers.IntegerField(allow_null=True)
+                            if facet == "year"
+                            else serializers.CharField()
+                        ),
+                        "count": serializers.IntegerField(),
+                    },
+                    many=True,
+                )
+                for facet in FACET_FIELDS
+            },
+        ),
+        filters=True,
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def facets(self, request: Request) -> HttpResponse:
+        """Returns the book counts by language, author and year."""
+        return self.get_cached_response(self._get_facets, request)
+
+    def _get_facets(self, request: Request) -> Response:
+        """Returns the facet counts of the (filtered) books."""
+        return Response(
+            get_facets(self.get_queryset(), request.query_params, request)
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                str,
+                required=True,
+                description="Prefix of the titles and author names.",
+            ),
+            OpenApiParameter(
+                "limit",
+                int,
+                description="Matches per list "
+                f"(at most {settings.BOOK_AUTOCOMPLETE_MAX_LIMIT}).",
+            ),
+        ],
+        responses=inline_serializer(
+            "BookAutocomplete",
+            {
+                "titles": inline_serializer(
+                    "BookAutocompleteTitle",
+                    {
+                        "id": serializers.IntegerField(),
+                        "title": serializers.CharField(),
+                        "author": serializers.CharField(),
+                    },
+                    many=True,
+                ),
+                "authors": inline_serializer(
+                    "BookAutocompleteAuthor",
+                    {
+                        "id": serializers.IntegerField(),
+                        "name": serializers.CharField(),
+                    },
+                    many=True,
+                ),
+            },
+        ),
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def autocomplete(self, request: Request) -> HttpResponse:
+        """Returns the first titles and authors starting with ?q=."""
+        return self.get_cached_response(self._get_autocomplete, request)
+
+    def _get_autocomplete(self, request: Request) -> Response:
+        """Returns the title and author prefix matches of ?q=."""
+        prefix = request.query_params.get("q", "").strip()
+        try:
+            limit = min(
+                int(
+                    request.query_params.get(
+                        "limit", settings.BOOK_AUTOCOMPLETE_LIMIT
+                    )
+                ),
+                settings.BOOK_AUTOCOMPLETE_MAX_LIMIT,
+            )
+        except ValueError:
+            limit = settings.BOOK_AUTOCOMPLETE_LIMIT
+        if not prefix or limit < 1:
+            return Response({"titles": [], "authors": []})
+        return Response(
+            get_autocomplete(
+                router.db_for_read(Book),
+                prefix[: Book._meta.get_field("title").max_length],
+                limit,
+            )
+        )
+
+    def _is_fast_read(self) -> bool:
+        """Returns whether the action is served by the read-only path."""
+        # * The schema generation still introspects the BookSerializer.
+        return self.action in self.read_actions and not getattr(
+            self, "swagger_fake_view", False
+        )
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Returns the request metrics in the Prometheus text format."""
+    # * Only for the scraper holding the token (the client address is the
+    # * proxy's behind a reverse proxy), the endpoint doesn't exist for
+    # * others or when no token is set.
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if (
+        not settings.BOOK_METRICS_TOKEN
+        or scheme.lower() != "bearer"
+        or not constant_time_compare(token, settings.BOOK_METRICS_TOKEN)
+    ):
+        raise Http404
+    return HttpResponse(
+        expose_metrics(), content_type="text/plain; version=0.0.4"
+    )
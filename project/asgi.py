@@ -4,5 +4,13 @@ from django.core.asgi import get_asgi_application
 
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+# * The native async reads pay off only when served by ASGI.
+os.environ.setdefault("BOOK_ASYNC_READS", "1")
 
 application = get_asgi_application()
+
+# * Imported once the apps are loaded: the enabled in-process copies load
+# * at startup instead of in the first request.
+from book.snapshot import warm_book_mirrors  # noqa: E402
+
+warm_book_mirrors()
@@ -1,5 +1,6 @@
 import os
 import sys
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -25,6 +26,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Third-party apps
     "rest_framework",
     "django_filters",
@@ -34,13 +36,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "book.middleware.InstrumentationMiddleware",
+    "book.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    # * The browser-only middleware skips the API paths (see below).
+    "book.middleware.BrowserSessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "book.middleware.BrowserAuthenticationMiddleware",
+    "book.middleware.BrowserMessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "book.middleware.ApiFrameOptionsExemptMiddleware",
+    "book.middleware.ReplicaRoutingMiddleware",
 ]
 
 ROOT_URLCONF = "project.urls"
@@ -71,9 +78,55 @@ DATABASES = {
         "NAME": os.getenv("DB_NAME"),
         "USER": os.getenv("DB_USER"),
         "PASSWORD": os.getenv("DB_PASSWORD"),
+        # * Persistent connections, checked before reuse by each request.
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE") or 60),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# * Read replicas share the primary settings ("host[:port]" entries).
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    host, _, port = replica.strip().partition(":")
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": int(port) if port else DATABASES["default"]["PORT"],
+        "NAME": os.getenv("DB_REPLICA_NAME") or DATABASES["default"]["NAME"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{number}")
+
+if TESTING:
+    # * A test replica mirrors the test database, tests opt in to it.
+    DATABASES.setdefault(
+        "replica_1", {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+    )
+    DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ["book.replicas.ReplicaRouter"]
+
+# * Holds the Book data version too: several hosts need a shared backend
+# * (e.g. Redis), the file-based default is per host (see book.W001).
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.getenv(
+            "CACHE_LOCATION", os.path.join(tempfile.gettempdir(), "book_cache")
+        ),
+    }
+}
+
+if TESTING:
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -104,13 +157,93 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
-    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+    "DEFAULT_RENDERER_CLASSES": ["book.renderers.FastJSONRenderer"],
+    # * No SessionAuthentication: the API paths skip the session middleware.
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.BasicAuthentication"
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend"
     ],
 }
 
+BOOK_EXACT_COUNT_THRESHOLD = int(
+    os.getenv("BOOK_EXACT_COUNT_THRESHOLD", "10000")
+)
+BOOK_COUNT_CACHE_TIMEOUT = 60 * 5
+BOOK_RESPONSE_CACHE_TIMEOUT = 60 * 10
+# * Keeps a bulk upsert within one INSERT (PostgreSQL allows 65535 params).
+BOOK_BULK_MAX_ITEMS = 5000
+BOOK_EXPORT_CHUNK_SIZE = 2000
+BOOK_LOOKUP_MAX_ITEMS = 10000
+# * Changes per page of the change feed (by default and at most).
+BOOK_CHANGES_PAGE_SIZE = 100
+BOOK_CHANGES_MAX_PAGE_SIZE = 1000
+# * Values per IN (...) query of the batch lookups.
+BOOK_LOOKUP_CHUNK_SIZE = 1000
+# * Values per facet of the facets endpoint.
+BOOK_FACET_LIMIT = 50
+# * Matches per list of the autocomplete (by default and at most) and its
+# * time budget per request.
+BOOK_AUTOCOMPLETE_LIMIT = 10
+BOOK_AUTOCOMPLETE_MAX_LIMIT = 25
+BOOK_AUTOCOMPLETE_TIMEOUT_MS = 100
+# * Choices of the admin summary filters and the author autocomplete.
+BOOK_ADMIN_FILTER_CHOICES = 20
+# * Unfiltered facets are read from the trigger-maintained summary table.
+BOOK_FACET_SUMMARY = os.getenv("BOOK_FACET_SUMMARY", "1").lower() in [
+    "true",
+    "t",
+    "1",
+]
+# * Queries at least this slow are logged with their EXPLAIN plan.
+BOOK_SLOW_QUERY_MS = int(os.getenv("BOOK_SLOW_QUERY_MS") or 200)
+# * Bearer token of the /metrics scraper (the endpoint is off without one).
+BOOK_METRICS_TOKEN = os.getenv("BOOK_METRICS_TOKEN", "")
+# * How long a client reads from the primary after its write (the pin
+# * token of the write response, sent back by cookie or header).
+BOOK_REPLICA_PIN_SECONDS = int(os.getenv("BOOK_REPLICA_PIN_SECONDS", "10"))
+# * Paths skipping the sessions, auth and messages middleware and the
+# * clickjacking header: the JSON API and schema, authenticated per request
+# * (no session), while the Swagger UI page keeps the browser stack.
+BOOK_API_PATH_PREFIXES = ["/api/v1/books/", "/api/schema/"]
+# * API response encodings (the preferred first, when installed) and the
+# * smallest body worth compressing.
+BOOK_COMPRESSION_ENCODINGS = ["zstd", "br", "gzip"]
+BOOK_COMPRESSION_MIN_SIZE = 1024
+# * Serves the book list/retrieve reads with async views. Only worth it
+# * under ASGI (project/asgi.py turns it on), under WSGI every async view
+# * pays for async_to_sync.
+BOOK_ASYNC_READS = os.getenv("BOOK_ASYNC_READS", "0").lower() in [
+    "true",
+    "t",
+    "1",
+]
+# * Serves the book retrieves from an in-process snapshot of the catalog.
+BOOK_SNAPSHOT = os.getenv("BOOK_SNAPSHOT", "0").lower() in [
+    "true",
+    "t",
+    "1",
+]
+# * Seconds a snapshot sync is trusted, without a Book write in between.
+BOOK_SNAPSHOT_MAX_AGE = int(os.getenv("BOOK_SNAPSHOT_MAX_AGE") or 60)
+# * Skips the database for the ISBN lookups the Bloom filter rules out.
+BOOK_ISBN_FILTER = os.getenv("BOOK_ISBN_FILTER", "0").lower() in [
+    "true",
+    "t",
+    "1",
+]
+BOOK_ISBN_FILTER_ERROR_RATE = 0.01
+BOOK_ISBN_FILTER_MIN_CAPACITY = 100000
+# * Seconds the filter negatives are trusted without a Book write in
+# * between: bounds how long a book whose version bump is late (or lost)
+# * can be reported missing.
+BOOK_ISBN_FILTER_MAX_AGE = int(os.getenv("BOOK_ISBN_FILTER_MAX_AGE") or 5)
+# * The OpenAPI schema is regenerated when it changes (e.g. the commit
+# * hash; by default, a digest of the sources).
+BOOK_CODE_VERSION = os.getenv("BOOK_CODE_VERSION", "")
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Book library API",
     "VERSION": "1.0.0",
@@ -120,6 +253,11 @@ SPECTACULAR_SETTINGS = {
 
 if DEBUG and DEVELOPMENT and not TESTING:
     del REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"]
+    # * The browsable API logs in through the session, on the full stack.
+    REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"].append(
+        "rest_framework.authentication.SessionAuthentication"
+    )
+    BOOK_API_PATH_PREFIXES = []
     REST_FRAMEWORK["DEFAULT_PERMISSION_CLASSES"] = [
         "rest_framework.permissions.AllowAny"
     ]
@@ -1,6 +1,9 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularSwaggerView, SpectacularAPIView
+from drf_spectacular.views import SpectacularSwaggerView
+
+from book.schema import CachedSpectacularAPIView
+from book.views import metrics_view
 
 
 urlpatterns = [
@@ -8,10 +11,12 @@ urlpatterns = [
     # Local apps
     path("api/v1/", include("book.router")),
     # Swagger
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/schema/", CachedSpectacularAPIView.as_view(), name="schema"),
     path(
         "api/v1/schema/swagger/",
         SpectacularSwaggerView.as_view(url_name="schema"),
         name="swagger-ui",
     ),
+    # Metrics
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -6,3 +6,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
 
 application = get_wsgi_application()
+
+# * Imported once the apps are loaded: the enabled in-process copies load
+# * at startup instead of in the first request.
+from book.snapshot import warm_book_mirrors  # noqa: E402
+
+warm_book_mirrors()